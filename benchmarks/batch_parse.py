@@ -0,0 +1,48 @@
+"""
+Measures how parsing in BatchFetcher scales with the number of worker processes.
+
+The pages are read from the test fixtures, so no network access is needed.
+
+    python -m benchmarks.batch_parse --pages 64
+"""
+
+import argparse
+import os
+import time
+from yahoofinance import BatchFetcher, CashFlow
+
+
+def run(pages, workers):
+    with BatchFetcher(parse_workers=workers) as fetcher:
+        # Warm up the worker processes before timing
+        fetcher.parse(CashFlow, dict(list(pages.items())[:workers]))
+        start = time.perf_counter()
+        results, errors = fetcher.parse(CashFlow, pages)
+        elapsed = time.perf_counter() - start
+    assert not errors, errors
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=64, help='Number of pages to parse')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count(), help='Largest pool to try')
+    args = parser.parse_args()
+
+    with open(os.path.join('test', 'resources', 'Cashflow.html')) as file:
+        html = file.read()
+    pages = {'STOCK{}'.format(i): html for i in range(args.pages)}
+
+    workers = 1
+    baseline = None
+    print('{:>8} {:>10} {:>12} {:>8}'.format('workers', 'seconds', 'pages/sec', 'speedup'))
+    while workers <= args.max_workers:
+        elapsed = run(pages, workers)
+        baseline = baseline or elapsed
+        print('{:>8} {:>10.3f} {:>12.1f} {:>8.2f}'.format(
+            workers, elapsed, args.pages / elapsed, baseline / elapsed))
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares the pandas and Polars `to_dfs` engines on batch outputs.
+
+Statements are parsed once from the test fixture and repeated for each stock. Prices are a
+synthetic daily download of the given number of years. No network access is needed.
+
+    python -m benchmarks.engines --stocks 500 --years 40
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+from yahoofinance import CashFlow, HistoricalPrices
+from yahoofinance.interfaces import IYahooData
+
+
+def load_statements(stocks):
+    with open('test/resources/Cashflow.html') as file:
+        fin_data = IYahooData._parse_quote_summary(file.read())
+    return [CashFlow._from_quote_summary('S{}'.format(i), fin_data) for i in range(stocks)]
+
+
+def synthetic_prices(years):
+    rows = ['Date,Open,High,Low,Close,Adj Close,Volume']
+    day = date(1970, 1, 1)
+    for i in range(years * 365):
+        price = 100.0 + (i % 97) / 7.0
+        rows.append('{},{:.6f},{:.6f},{:.6f},{:.6f},{:.6f},{}'.format(
+            day + timedelta(days=i), price, price + 1, price - 1, price, price, 1000000 + i))
+
+    prices = object.__new__(HistoricalPrices)
+    prices.frequency = '1d'
+    prices.compression = None
+    prices._columns = None
+    prices._compressed = None
+    prices.prices = '\n'.join(rows) + '\n'
+    return prices
+
+
+def measure(case):
+    start = time.perf_counter()
+    case()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--stocks', type=int, default=500, help='Number of statements in the batch')
+    parser.add_argument('--years', type=int, default=40, help='Years of daily prices')
+    args = parser.parse_args()
+
+    statements = load_statements(args.stocks)
+    text = synthetic_prices(args.years).prices
+
+    def prices_case(engine):
+        # A fresh object each time, so the CSV text is parsed by the engine being measured
+        def run():
+            prices = synthetic_prices(0)
+            prices.prices = text
+            prices.to_dfs(engine=engine)
+        return run
+
+    cases = (
+        ('statements', 'pandas', lambda: [x.to_dfs() for x in statements]),
+        ('statements', 'polars', lambda: [x.to_dfs(engine='polars') for x in statements]),
+        ('prices', 'pandas', prices_case('pandas')),
+        ('prices', 'polars', prices_case('polars')),
+    )
+    print('{:<12} {:<8} {:>10}'.format('output', 'engine', 'seconds'))
+    for output, engine, case in cases:
+        print('{:<12} {:<8} {:>10.3f}'.format(output, engine, min(measure(case) for _ in range(3))))
+
+
+if __name__ == '__main__':
+    main()
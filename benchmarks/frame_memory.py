@@ -0,0 +1,60 @@
+"""
+Reports the memory used by `to_dfs` frames with the default and the lean dtype options.
+
+The statements and prices are read from the test fixtures and repeated to build a panel,
+so no network access is needed.
+
+    python -m benchmarks.frame_memory --stocks 500
+"""
+
+import argparse
+import pandas as pd
+from yahoofinance import CashFlow, HistoricalPrices
+from yahoofinance.interfaces import IYahooData
+
+
+def load_cashflow():
+    with open('test/resources/Cashflow.html') as file:
+        fin_data = IYahooData._parse_quote_summary(file.read())
+    return CashFlow._from_quote_summary('AAPL', fin_data)
+
+
+def load_prices():
+    prices = object.__new__(HistoricalPrices)
+    prices.frequency = '1d'
+    prices.compression = None
+    prices._columns = None
+    prices._compressed = None
+    with open('test/resources/HistoricalData.csv') as file:
+        prices.prices = file.read()
+    return prices
+
+
+def panel_size(frames):
+    return pd.concat(frames).memory_usage(deep=True, index=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--stocks', type=int, default=500, help='Number of copies in the panel')
+    args = parser.parse_args()
+
+    cashflow = load_cashflow()
+    prices = load_prices()
+    cases = (
+        ('statements (default)', lambda: cashflow.to_dfs()['Cash Flow']),
+        ('statements (categorical)', lambda: cashflow.to_dfs(float_dtype='float64', categorical=True)['Cash Flow']),
+        ('statements (nullable)', lambda: cashflow.to_dfs(dtype_backend='numpy_nullable', categorical=True)['Cash Flow']),
+        ('prices (default)', lambda: prices.to_dfs()['Historical Prices']),
+        ('prices (float32)', lambda: prices.to_dfs(float_dtype='float32', parse_dates=True)['Historical Prices']),
+        ('prices (float32, nullable)', lambda: prices.to_dfs(
+            float_dtype='float32', dtype_backend='numpy_nullable', parse_dates=True)['Historical Prices']),
+    )
+    print('{:<28} {:>14} {:>12}'.format('case', 'bytes', 'bytes/stock'))
+    for name, case in cases:
+        size = panel_size([case() for _ in range(args.stocks)])
+        print('{:<28} {:>14} {:>12.0f}'.format(name, size, size / args.stocks))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Micro benchmark of statement exports over the test fixtures.
+
+Compares the compiled statement layout against rebuilding the mapping on every call,
+as the statement classes did before the layout was compiled.
+
+    python -m benchmarks.statement_export --repeat 200
+"""
+
+import argparse
+import timeit
+import pandas as pd
+from yahoofinance import CashFlow
+from yahoofinance.interfaces import IYahooData
+
+
+def load_cashflow():
+    with open('test/resources/Cashflow.html') as file:
+        fin_data = IYahooData._parse_quote_summary(file.read())
+    return CashFlow._from_quote_summary('AAPL', fin_data)
+
+
+def rebuilt_frame(statement, data_format):
+    cols = [i['endDate']['fmt'] for i in statement.cashflow]
+    multiindex = []
+    data = []
+    for k, v in statement._df_mapping.items():
+        for name, key in v:
+            multiindex.append((k, name))
+            data.append(statement._df_row(statement.cashflow, key, data_format))
+
+    idx = pd.MultiIndex.from_tuples(multiindex, names=('Subject', 'Item'))
+    return pd.DataFrame(data, idx, cols)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200, help='Calls per measurement')
+    args = parser.parse_args()
+
+    statement = load_cashflow()
+    cases = (
+        ('frame (rebuilt mapping)', lambda: rebuilt_frame(statement, 'raw')),
+        ('frame (compiled layout)', lambda: statement._frame('raw')),
+        ('to_dfs', lambda: statement.to_dfs()),
+        ('to_csv', lambda: statement.to_csv()),
+    )
+    print('{:<26} {:>12}'.format('case', 'usec/call'))
+    for name, case in cases:
+        seconds = min(timeit.repeat(case, number=args.repeat, repeat=3))
+        print('{:<26} {:>12.1f}'.format(name, seconds / args.repeat * 1e6))
+
+
+if __name__ == '__main__':
+    main()
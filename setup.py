@@ -24,7 +24,7 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/mqtran01/python-yahoo-finance",
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=['benchmarks']),
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -41,6 +41,14 @@ setuptools.setup(
         "pandas>=0.23.4",
         "beautifulsoup4>=4.6.3",
         "requests>=2.20.1"
-    ]
+    ],
+    extras_require={
+        "polars": ["polars>=0.20"]
+    },
+    entry_points={
+        "console_scripts": [
+            "yahoofinance=yahoofinance.cli:main"
+        ]
+    }
 
 )
\ No newline at end of file
@@ -1,10 +1,15 @@
 class MockResponse:
-    def __init__(self, text):
+    def __init__(self, text, json_data=None):
         self.text = text
+        self.json_data = json_data
 
     def json(self):
         return self.json_data
 
+    @property
+    def content(self):
+        return self.text.encode()
+
     @property
     def cookies(self):
-        return {'B': '1234'}
\ No newline at end of file
+        return {'B': '1234'}
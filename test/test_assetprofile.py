@@ -0,0 +1,45 @@
+import json
+from unittest import TestCase, mock, main
+from yahoofinance import AssetProfile, ProfileTable
+from test.mock_framework import MockResponse
+
+PROFILES = {
+    'AAPL': {'sector': 'Technology', 'industry': 'Consumer Electronics', 'country': 'United States',
+        'fullTimeEmployees': 132000},
+    'AMD': {'sector': 'Technology', 'industry': 'Semiconductors', 'country': 'United States'},
+    'ASML': {'sector': 'Technology', 'industry': 'Semiconductors', 'country': 'Netherlands'},
+    'INTC': {'sector': 'Technology', 'industry': 'Semiconductors', 'country': 'United States'},
+    'JPM': {'sector': 'Financial Services', 'industry': 'Banks', 'country': 'United States'},
+}
+
+
+def mock_requests_get(*args, **kwargs):
+    stock = args[0].split('/')[-2]
+    if stock not in PROFILES:
+        raise ValueError('Not found')
+    store = {'context': {'dispatcher': {'stores': {'QuoteSummaryStore': {'assetProfile': PROFILES[stock]}}}}}
+    return MockResponse('<html><script>root.App.main = {};</script></html>'.format(json.dumps(store)))
+
+
+class TestProfileTable(TestCase):
+
+    @mock.patch('yahoofinance.batch.requests.get', side_effect=mock_requests_get)
+    def test_fetch(self, mock_get):
+        table, errors = ProfileTable.fetch(['AAPL', 'AMD', 'MISSING', 'INTC'], parse_workers=1)
+        self.assertEqual(['MISSING'], list(errors))
+        self.assertEqual(['AAPL', 'AMD', 'INTC'], list(table.frame.index))
+        self.assertEqual('category', str(table.frame['Industry'].dtype))
+        self.assertEqual(132000, table.frame.loc['AAPL', 'Full Time Employees'])
+
+    def test_filter(self):
+        table = ProfileTable(AssetProfile._from_quote_summary(x, {'assetProfile': y}) for x, y in PROFILES.items())
+        self.assertEqual(['AMD', 'INTC'], table.filter(industry='Semiconductors', country='United States'))
+        self.assertEqual(['ASML'], table.filter(country='Netherlands'))
+        self.assertEqual([], table.filter(sector='Technology', industry='Banks'))
+        self.assertEqual([], table.filter(industry='Unknown'))
+        self.assertEqual(5, len(table.filter()))
+        self.assertEqual(4, table.values('Sector')['Technology'])
+
+
+if __name__ == '__main__':
+    main()
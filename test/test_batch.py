@@ -0,0 +1,53 @@
+from unittest import TestCase, mock, main
+from yahoofinance import BatchFetcher, CashFlow
+from yahoofinance.interfaces import ITransport
+from test.mock_framework import MockResponse
+from test.test_cashflow import mock_requests_get
+
+
+def mock_requests_get_missing(*args, **kwargs):
+    if 'MISSING' in args[0]:
+        raise ValueError('Not found')
+    return mock_requests_get(*args, **kwargs)
+
+
+class TestBatchFetcher(TestCase):
+
+    @mock.patch('yahoofinance.batch.requests.get', side_effect=mock_requests_get_missing)
+    def test_fetch(self, mock_get):
+        with BatchFetcher(download_workers=2, parse_workers=2) as fetcher:
+            results, errors = fetcher.fetch(CashFlow, ['AAPL', 'MSFT', 'MISSING'])
+
+        self.assertEqual({'AAPL', 'MSFT'}, set(results))
+        self.assertEqual(['MISSING'], list(errors))
+        self.assertEqual('MSFT', results['MSFT'].stock)
+        self.assertEqual(CashFlow('AAPL').to_csv(), results['AAPL'].to_csv())
+
+    def test_fetch_transport(self):
+        with open('test/resources/Cashflow.html') as file:
+            page = file.read()
+        transport = mock.Mock(spec=ITransport)
+        transport.get.return_value = MockResponse(page)
+
+        with BatchFetcher(download_workers=1, parse_workers=1) as fetcher:
+            results, errors = fetcher.fetch(CashFlow, ['AAPL'], locale=transport)
+
+        self.assertEqual({}, errors)
+        # Later requests go through the transport, with paths rather than urls
+        self.assertIs(transport, results['AAPL']._locale)
+        self.assertEqual('', results['AAPL']._base_url)
+        transport.get.assert_called_once_with('/AAPL/financials')
+
+    def test_parse(self):
+        with open('test/resources/Cashflow.html') as file:
+            pages = {'AAPL': file.read(), 'BAD': '<html></html>'}
+
+        with BatchFetcher(parse_workers=1) as fetcher:
+            results, errors = fetcher.parse(CashFlow, pages)
+
+        self.assertEqual(['AAPL'], list(results))
+        self.assertEqual(['BAD'], list(errors))
+
+
+if __name__ == '__main__':
+    main()
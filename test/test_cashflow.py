@@ -1,6 +1,11 @@
+import gzip
+import io
 import unittest
 from unittest import TestCase, mock, main
-from yahoofinance import CashFlow
+from yahoofinance.interfaces import IYahooData, pl
+from yahoofinance import (
+    BalanceSheet, CashFlow, CashFlowQuarterly, IncomeStatement, write_csv, trailing_twelve_months
+)
 from test.mock_framework import MockResponse
 
 
@@ -70,6 +75,127 @@ class TestCashFlow(TestCase):
         assert(dfs['Cash Flow'].loc['Financing activities'].equals(dfs['Financing activities']))
         assert(dfs['Cash Flow'].loc['Changes in Cash'].equals(dfs['Changes in Cash']))
 
+    @mock.patch('yahoofinance.cashflow.requests.get', side_effect=mock_requests_get)
+    def test_to_csv_stream(self, mock_get):
+        cashflow = CashFlow('AAPL')
+        stream = io.StringIO()
+        self.assertIsNone(cashflow.to_csv(stream))
+        self.assertEqual(cashflow.to_csv(), stream.getvalue())
+
+    @mock.patch('yahoofinance.cashflow.requests.get', side_effect=mock_requests_get)
+    def test_write_csv(self, mock_get):
+        buffer = io.BytesIO()
+        with gzip.open(buffer, 'wt', newline='') as file_handle:
+            write_csv((CashFlow(x) for x in ['AAPL', 'MSFT']), file_handle)
+
+        expected = CashFlow('AAPL').to_csv()
+        self.assertEqual(
+            'AAPL\r\n' + expected + '\r\nMSFT\r\n' + expected + '\r\n',
+            gzip.decompress(buffer.getvalue()).decode())
+
+    @mock.patch('yahoofinance.cashflow.requests.get', side_effect=mock_requests_get)
+    def test_projection(self, mock_get):
+        fields = ['totalCashFromOperatingActivities', 'capitalExpenditures']
+        cashflow = CashFlow('AAPL', fields=fields)
+        self.assertEqual(set(fields + ['endDate']), set(cashflow.cashflow[0]))
+        dfs = cashflow.to_dfs()
+        self.assertEqual({'Cash Flow', 'Operating activities', 'Investment activities'}, set(dfs))
+        self.assertEqual([77434000000, -13313000000], list(dfs['Cash Flow']['2018-09-29']))
+        self.assertEqual(
+            'Period ending,,2018-09-29,2017-09-30,2016-09-24,2015-09-26\r\n\r\n'
+            'Investment activities\r\nCapital expenditure,,-13313000000,-12451000000,-12734000000,-11247000000\r\n',
+            cashflow.to_csv(fields=['capitalExpenditures']))
+
+        full = CashFlow('AAPL')
+        self.assertEqual(
+            full.to_dfs()['Overall'].values.tolist(),
+            full.to_dfs(sections=['Overall'])['Overall'].values.tolist())
+        with self.assertRaises(ValueError):
+            full.to_dfs(fields=['unknownField'])
+
+    @mock.patch('yahoofinance.cashflow.requests.get', side_effect=mock_requests_get)
+    def test_ttm(self, mock_get):
+        quarterly = CashFlowQuarterly('AAPL')
+        annual = CashFlow('AAPL')
+        ttm = quarterly.ttm()
+        self.assertEqual(['2018-09-29', '2018-06-30', '2018-03-31', '2017-12-30'], list(ttm.columns))
+        # The fiscal year ends on the last quarter, so its sums are the annual figures
+        self.assertEqual(
+            [x for x in annual.to_dfs()['Cash Flow']['2018-09-29'] if x != '-'],
+            ttm['2018-09-29'].dropna().astype('int64').tolist())
+        self.assertTrue(ttm.iloc[:, 1:].isna().all().all())
+        self.assertIs(quarterly._ttm_table(), quarterly._ttm_table())
+
+        df = trailing_twelve_months([quarterly], ['netIncome', 'changeInCash'])
+        self.assertEqual([('AAPL', 59531000000.0, 5624000000.0)],
+            [(stock, *values) for (stock, _), values in zip(df.index, df.values.tolist())])
+
+    def test_ttm_gaps(self):
+        def period(end, value):
+            return {'endDate': {'raw': end * 86400, 'fmt': str(end)}, 'netIncome': {'raw': value, 'fmt': str(value)}}
+
+        fin_data = {'cashflowStatementHistoryQuarterly': {'cashflowStatements': [
+            period(day, value) for day, value in [(0, 1.0), (91, 2.0), (182, 3.0), (273, 4.0), (364, 5.0), (600, 6.0)]
+        ]}}
+        quarterly = CashFlowQuarterly._from_quote_summary('TEST', fin_data)
+        net_income = quarterly.ttm().loc[('Overall', 'Net Income')].tolist()
+        # Newest first, the quarter after a missing quarter starts a new window
+        self.assertEqual([14.0, 10.0], net_income[1:3])
+        self.assertTrue(all(x != x for x in net_income[:1] + net_income[3:]))
+
+    @mock.patch('yahoofinance.cashflow.requests.get', side_effect=mock_requests_get)
+    def test_to_dfs_dtypes(self, mock_get):
+        cashflow = CashFlow('AAPL')
+        df = cashflow.to_dfs(float_dtype='float32', categorical=True)['Cash Flow']
+        self.assertEqual({'float32'}, {str(x) for x in df.dtypes})
+        self.assertEqual('category', str(df.index.levels[1].dtype))
+        # Missing items are NaN instead of '-'
+        self.assertTrue(df.loc[('Financing activities', 'Sale purchase of stock')].isna().all())
+
+        nullable = cashflow.to_dfs(dtype_backend='numpy_nullable')
+        self.assertEqual({'Int64'}, {str(x) for x in nullable['Cash Flow'].dtypes})
+        self.assertEqual(
+            [10903000000, 10157000000, 10505000000, 11257000000],
+            nullable['Operating activities'].loc['Depreciation'].tolist())
+        with self.assertRaises(ValueError):
+            cashflow.to_dfs(dtype_backend='unknown')
+
+    @unittest.skipIf(pl is None, 'polars is not installed')
+    @mock.patch('yahoofinance.cashflow.requests.get', side_effect=mock_requests_get)
+    def test_to_dfs_polars(self, mock_get):
+        cashflow = CashFlow('AAPL')
+        dfs = cashflow.to_dfs(engine='polars')
+        pandas_dfs = cashflow.to_dfs()
+        self.assertEqual(set(pandas_dfs), set(dfs))
+        self.assertEqual(['Subject', 'Item'] + list(pandas_dfs['Cash Flow'].columns), dfs['Cash Flow'].columns)
+        self.assertEqual(
+            [None if x == '-' else x for x in pandas_dfs['Financing activities']['2018-09-29']],
+            dfs['Financing activities']['2018-09-29'].to_list())
+        self.assertEqual(
+            ['Depreciation', 'Changes in inventory'],
+            cashflow.to_polars(fields=['depreciation', 'changeToInventory'])['Item'].cast(str).to_list())
+        with self.assertRaises(ValueError):
+            cashflow.to_dfs(engine='arrow')
+
+    @unittest.skipIf(pl is None, 'polars is not installed')
+    def test_statement_keys(self):
+        with open('test/resources/Cashflow.html') as file:
+            fin_data = IYahooData._parse_quote_summary(file.read())
+        for cls, name in ((BalanceSheet, 'Balance Sheet'), (IncomeStatement, 'Income Statement')):
+            statement = cls._from_quote_summary('AAPL', fin_data)
+            self.assertNotIn('Cash Flow', statement.to_dfs(engine='polars'))
+            self.assertEqual(statement.to_polars().shape, statement.to_dfs(engine='polars')[name].shape)
+            dfs = statement.to_dfs()
+            self.assertIs(dfs[name], dfs['Cash Flow'])
+
+    def test_layout(self):
+        layout = CashFlow._layout
+        self.assertIs(layout, CashFlowQuarterly._layout)
+        self.assertEqual(19, len(layout.index))
+        self.assertEqual(2, (~layout.known).sum())
+        self.assertIsNone(layout.keys[list(layout.index).index(('Financing activities', 'Sale purchase of stock'))])
+        self.assertFalse(layout.known.flags.writeable)
+
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
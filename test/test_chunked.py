@@ -0,0 +1,100 @@
+import threading
+import time
+from datetime import date, timedelta
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qs
+from unittest import TestCase, mock, main
+from yahoofinance import HistoricalPrices, LocalePool
+
+with open('test/resources/Cookie.html', 'rb') as file:
+    COOKIE = file.read()
+
+DELAY = 0.2
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def csv_between(period1, period2):
+    # One row for every day from period1 to period2, both included
+    first = date(1970, 1, 1) + timedelta(seconds=period1)
+    days = (period2 - period1) // 86400 + 1
+    rows = ['Date,Open,High,Low,Close,Adj Close,Volume']
+    for i in range(days):
+        rows.append('{},{}.0,{}.0,{}.0,{}.0,{}.0,{}'.format(first + timedelta(days=i), *([i] * 6)))
+    return '\n'.join(rows) + '\n'
+
+
+class Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        Handler.requests.append(url.path)
+        if url.path.endswith('/history'):
+            body = COOKIE
+        else:
+            time.sleep(DELAY)
+            params = parse_qs(url.query)
+            body = csv_between(int(params['period1'][0]), int(params['period2'][0])).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Set-Cookie', 'B=1234')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestChunkedDownload(TestCase):
+
+    def setUp(self):
+        self.server = StubServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        self.pool = LocalePool(urls={'stub': base + '/quote'})
+        self.patch = mock.patch.object(HistoricalPrices, '_download_url', base + '/download/{i}')
+        self.patch.start()
+        Handler.requests = []
+
+    def tearDown(self):
+        self.patch.stop()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def fetch(self, **kwargs):
+        start = time.perf_counter()
+        prices = HistoricalPrices('AAPL', '2000-01-01', '2000-12-31', locale=self.pool, **kwargs)
+        return prices, time.perf_counter() - start
+
+    def test_chunks_match_single_download(self):
+        single, single_elapsed = self.fetch()
+        Handler.requests = []
+        chunked, chunked_elapsed = self.fetch(chunk_days=60, download_workers=7)
+
+        # One crumb for the 7 chunks, downloaded concurrently
+        self.assertEqual(1, sum(path.endswith('/history') for path in Handler.requests))
+        self.assertEqual(7, sum('/download/' in path for path in Handler.requests))
+        self.assertLess(chunked_elapsed, 3 * DELAY)
+
+        dates = chunked.columns['Date']
+        self.assertEqual(366, len(dates))
+        self.assertTrue((dates[1:] > dates[:-1]).all())
+        self.assertEqual(list(single.columns['Date']), list(dates))
+
+    def test_latency_scales_with_workers(self):
+        _, serial = self.fetch(chunk_days=60, download_workers=1)
+        _, parallel = self.fetch(chunk_days=60, download_workers=7)
+        self.assertGreater(serial, 7 * DELAY)
+        self.assertLess(parallel, serial / 2)
+
+    def test_invalid_chunk_days(self):
+        with self.assertRaises(ValueError):
+            self.fetch(chunk_days=0)
+
+
+if __name__ == '__main__':
+    main()
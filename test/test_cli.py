@@ -0,0 +1,85 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase, mock, main
+import pandas as pd
+from yahoofinance import cli
+from test.test_cashflow import mock_requests_get as mock_cashflow_get
+from test.test_historicaldata import mock_requests_get as mock_prices_get
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def mock_requests_get(*args, **kwargs):
+    if 'FAIL' in args[0]:
+        raise ConnectionError('Connection reset')
+    if 'financials' in args[0]:
+        return mock_cashflow_get(*args, **kwargs)
+    return mock_prices_get(*args, **kwargs)
+
+
+class TestCli(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.tickers = os.path.join(self.path, 'tickers.txt')
+        with open(self.tickers, 'w') as file_handle:
+            file_handle.write('AAPL\n# Comment\nMSFT\n\nFAIL\n')
+        self.output = os.path.join(self.path, 'out')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _run(self, *argv):
+        stream = io.StringIO()
+        args = cli.build_parser().parse_args([self.tickers, '-o', self.output] + list(argv))
+        return cli.run(args, stream), stream.getvalue()
+
+    @mock.patch('yahoofinance.cli.HistoricalPrices._find_cookie_crumb_pair', return_value=('1234', 'crumb'))
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_export_and_resume(self, mock_get, mock_crumb):
+        failed, report = self._run('-d', 'prices', 'cashflow', '-w', '4')
+        self.assertEqual(2, failed)
+        self.assertIn('6 total, 0 skipped, 4 completed, 2 failed', report)
+        self.assertIn('ConnectionError: 2', report)
+        self.assertTrue(os.path.exists(os.path.join(self.output, 'prices', 'MSFT.csv')))
+        self.assertTrue(os.path.exists(os.path.join(self.output, 'cashflow', 'AAPL.csv')))
+
+        # Only the failed jobs are retried
+        mock_get.reset_mock()
+        failed, report = self._run('-d', 'prices', 'cashflow')
+        self.assertIn('6 total, 4 skipped, 0 completed, 2 failed', report)
+        self.assertTrue(all('FAIL' in call[0][0] for call in mock_get.call_args_list))
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    @mock.patch('yahoofinance.cli.HistoricalPrices._find_cookie_crumb_pair', return_value=('1234', 'crumb'))
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_export_parquet(self, mock_get, mock_crumb):
+        failed, report = self._run('-d', 'prices', 'cashflow', '-f', 'parquet')
+        self.assertEqual(2, failed)
+
+        cashflow = pd.read_parquet(os.path.join(self.output, 'cashflow', 'AAPL.parquet'))
+        self.assertEqual('float64', str(cashflow.dtypes.iloc[0]))
+        self.assertTrue(cashflow.isna().any().any())
+        prices = pd.read_parquet(os.path.join(self.output, 'prices', 'MSFT.parquet'))
+        self.assertEqual(6, len(prices))
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    @mock.patch('yahoofinance.cli.run', return_value=0)
+    def test_default_datasets(self, mock_run):
+        self.assertEqual(0, cli.main([self.tickers, '-f', 'parquet']))
+        self.assertNotIn('profile', mock_run.call_args[0][0].datasets)
+        cli.main([self.tickers])
+        self.assertEqual(sorted(cli.DATASETS), mock_run.call_args[0][0].datasets)
+
+    def test_read_tickers(self):
+        self.assertEqual(['AAPL', 'MSFT', 'FAIL'], cli.read_tickers(self.tickers))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase, mock, main
+from yahoofinance import YahooFinanceClient, CashFlowQuarterly, BalanceSheet
+from test.mock_framework import MockResponse
+from test.test_historicaldata import mock_requests_get as mock_history_get
+
+
+def mock_session_get(url, **kwargs):
+    # Slow enough for concurrent requests of the same page to overlap
+    time.sleep(0.05)
+    if '/financials' in url:
+        with open('test/resources/Cashflow.html') as file:
+            return MockResponse(file.read())
+    return mock_history_get(url, **kwargs)
+
+
+class TestYahooFinanceClient(TestCase):
+
+    @mock.patch('yahoofinance.client.requests.Session.get', side_effect=mock_session_get)
+    def test_shared_between_threads(self, mock_get):
+        client = YahooFinanceClient()
+
+        def fetch(i):
+            return [
+                client.cash_flow('AAPL', quarterly=i % 2 == 0),
+                client.balance_sheet('AAPL'),
+                client.historical_prices('AAPL', '2018-10-10', '2018-10-16'),
+            ]
+
+        with client, ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(fetch, range(32)))
+
+        # One financials page, one cookie and crumb pair and one download per thread
+        urls = [call[0][0] for call in mock_get.call_args_list]
+        self.assertEqual(1, sum('/financials' in url for url in urls))
+        self.assertEqual(1, sum('/history' in url for url in urls))
+        self.assertEqual(32, sum('download' in url for url in urls))
+
+        self.assertEqual(4, len(results[0][0].cashflow))
+        self.assertIsInstance(results[0][0], CashFlowQuarterly)
+        self.assertIsInstance(results[1][1], BalanceSheet)
+        self.assertTrue(all(x[2].prices == results[0][2].prices for x in results))
+        self.assertEqual(2, client.stats()['cache_misses'])
+
+    @mock.patch('yahoofinance.client.requests.Session.get', side_effect=mock_session_get)
+    def test_cache_expiry_and_errors(self, mock_get):
+        client = YahooFinanceClient(cache_ttl=0)
+        client.cash_flow('AAPL')
+        client.cash_flow('AAPL')
+        self.assertEqual(2, mock_get.call_count)
+
+        with self.assertRaises(KeyError):
+            client.cached('key', lambda: {}['missing'])
+        self.assertEqual(1, client.cached('key', lambda: 1))
+
+    def test_rate_limit(self):
+        client = YahooFinanceClient(rate_limit=20)
+        start = time.monotonic()
+        threads = [threading.Thread(target=client._acquire) for _ in range(11)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # The first request is sent at once, the other 10 are spaced at 20 per second
+        self.assertGreaterEqual(time.monotonic() - start, 0.45)
+        self.assertEqual(11, client.stats()['requests'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import date
+from unittest import TestCase, mock, main
+from yahoofinance import AssetProfile, CashFlow, HistoricalPrices, PriceStore
+from yahoofinance.distributed import (
+    Coordinator, FetchWorker, Job, MemoryResultStore, MemoryWorkQueue, SQLiteResultStore, SQLiteWorkQueue
+)
+from test import test_assetprofile, test_cashflow, test_historicaldata
+
+
+def mock_requests_get(*args, **kwargs):
+    if 'MISSING' in args[0]:
+        raise ValueError('Not found')
+    if 'profile' in args[0]:
+        return test_assetprofile.mock_requests_get(*args, **kwargs)
+    if 'history' in args[0] or 'query1' in args[0]:
+        return test_historicaldata.mock_requests_get(*args, **kwargs)
+    return test_cashflow.mock_requests_get(*args, **kwargs)
+
+
+class DistributedTests:
+    """Runs against each queue and store implementation."""
+
+    def make(self, max_attempts=3):
+        raise NotImplementedError
+
+    @mock.patch('requests.get', side_effect=mock_requests_get)
+    def test_run(self, mock_get):
+        queue, store = self.make(max_attempts=2)
+        coordinator = Coordinator(queue)
+        self.assertEqual(2, coordinator.enqueue(CashFlow, ['AAPL', 'MISSING']))
+        self.assertEqual(1, coordinator.enqueue(
+            HistoricalPrices, ['AAPL'], start_date='2018-11-09', end_date='2018-11-16'))
+        self.assertRaises(ValueError, coordinator.enqueue, PriceStore, ['AAPL'])
+        self.assertRaises(ValueError, coordinator.enqueue, HistoricalPrices, ['AAPL'], start_date=date(2018, 1, 1))
+
+        stats = FetchWorker(queue, store, name='w1').run(poll=0)
+        self.assertEqual({'done': 2, 'retried': 1, 'failed': 1, 'lost': 0}, stats)
+        self.assertEqual({'queued': 0, 'leased': 0, 'done': 2, 'failed': 1}, coordinator.counts())
+        [(job, error)] = coordinator.failures()
+        self.assertEqual(('CashFlow', 'MISSING', 2), (job.kind, job.stock, job.attempts))
+        self.assertEqual("ValueError('Not found')", error)
+
+        self.assertEqual(2, len(store.keys()))
+        frames = store.read(Job('CashFlow', 'AAPL').key)
+        self.assertEqual(CashFlow('AAPL').to_dfs()['Cash Flow'].to_csv(), frames['Cash Flow'].to_csv())
+        prices = store.read(Job('HistoricalPrices', 'AAPL', {'start_date': '2018-11-09', 'end_date': '2018-11-16'}).key)
+        self.assertEqual(6, len(prices['Historical Prices']))
+        self.assertIsNone(store.read(Job('CashFlow', 'MISSING').key))
+
+    @mock.patch('requests.get', side_effect=mock_requests_get)
+    def test_profile(self, mock_get):
+        queue, store = self.make()
+        Coordinator(queue).enqueue(AssetProfile, ['AAPL'])
+        self.assertEqual({'done': 1, 'retried': 0, 'failed': 0, 'lost': 0}, FetchWorker(queue, store).run(poll=0))
+
+        profiles = store.read(Job('AssetProfile', 'AAPL').key)['Profiles']
+        self.assertEqual(['AAPL'], list(profiles.index))
+        self.assertEqual('Technology', profiles['Sector'].iloc[0])
+
+    def test_error_without_message(self):
+        queue, store = self.make(max_attempts=1)
+        Coordinator(queue).enqueue(CashFlow, ['AAPL'])
+        with mock.patch('requests.get', side_effect=NotImplementedError):
+            FetchWorker(queue, store).run(poll=0)
+        self.assertEqual('NotImplementedError()', queue.failures()[0][1])
+
+    @mock.patch('requests.get', side_effect=mock_requests_get)
+    def test_expired_lease(self, mock_get):
+        queue, store = self.make()
+        Coordinator(queue).enqueue(CashFlow, ['AAPL'])
+
+        # The first worker dies after claiming the job, so its lease runs out
+        lost = queue.claim('w1', lease=0)
+        job = queue.claim('w2', lease=60)
+        self.assertEqual((lost.id, 2), (job.id, job.attempts))
+        self.assertIsNone(queue.claim('w3', lease=60))
+
+        # The first worker no longer holds the lease, so it cannot finish the job
+        self.assertFalse(queue.ack(lost))
+        self.assertEqual('lost', queue.fail(lost, ValueError('late')))
+        self.assertEqual(1, queue.counts()['leased'])
+        # The same worker name does not hold the lease of another attempt either
+        self.assertFalse(queue.ack(Job(job.kind, job.stock, job.params, job.id, 1, 'w2')))
+
+        # Delivered again, the result is replaced rather than duplicated
+        self.assertEqual('lost', FetchWorker(queue, store, name='w1').process(lost))
+        self.assertEqual('done', FetchWorker(queue, store, name='w2').process(job))
+        self.assertEqual(1, len(store.keys()))
+        self.assertEqual('lost', queue.fail(lost, ValueError('late')))
+        self.assertEqual({'queued': 0, 'leased': 0, 'done': 1, 'failed': 0}, queue.counts())
+
+    def test_lease_runs_out_of_attempts(self):
+        queue, _ = self.make(max_attempts=2)
+        Coordinator(queue).enqueue(CashFlow, ['AAPL'])
+        self.assertEqual(1, queue.claim('w1', lease=0).attempts)
+        self.assertEqual(2, queue.claim('w2', lease=0).attempts)
+
+        # The last lease ran out too, so the job is not leased a third time
+        self.assertIsNone(queue.claim('w3', lease=60))
+        self.assertEqual({'queued': 0, 'leased': 0, 'done': 0, 'failed': 1}, queue.counts())
+        [(job, error)] = queue.failures()
+        self.assertEqual(2, job.attempts)
+        self.assertEqual('Lease expired after 2 attempts', error)
+
+    @mock.patch('requests.get', side_effect=mock_requests_get)
+    def test_concurrent_workers(self, mock_get):
+        queue, store = self.make()
+        Coordinator(queue).enqueue(CashFlow, ['S{}'.format(i) for i in range(20)])
+        results = []
+        threads = [
+            threading.Thread(target=lambda name: results.append(FetchWorker(queue, store, name=name).run(poll=0)),
+                args=('w{}'.format(i),))
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(20, sum(x['done'] for x in results))
+        self.assertEqual(20, len(store.keys()))
+
+
+class TestMemory(DistributedTests, TestCase):
+
+    def make(self, max_attempts=3):
+        return MemoryWorkQueue(max_attempts), MemoryResultStore()
+
+
+class TestSQLite(DistributedTests, TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make(self, max_attempts=3):
+        return (SQLiteWorkQueue(os.path.join(self.directory.name, 'jobs.db'), max_attempts),
+            SQLiteResultStore(os.path.join(self.directory.name, 'results.db')))
+
+    @mock.patch('requests.get', side_effect=mock_requests_get)
+    def test_results_are_data(self, mock_get):
+        _, store = self.make()
+        frames = CashFlow('AAPL').to_dfs()
+        frames.update(HistoricalPrices('AAPL', '2018-11-09', '2018-11-16').to_dfs())
+        store.write('key', frames)
+
+        read = store.read('key')
+        self.assertEqual(list(frames), list(read))
+        for name, frame in frames.items():
+            self.assertTrue(frame.equals(read[name]), name)
+            self.assertTrue(frame.index.equals(read[name].index), name)
+        with sqlite3.connect(store.path) as connection:
+            self.assertIn('Cash Flow', json.loads(connection.execute('SELECT frames FROM results').fetchone()[0]))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,13 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import date
 import unittest
 from unittest import TestCase, mock, main
-from yahoofinance import HistoricalPrices
+from yahoofinance.interfaces import pl
+from yahoofinance import HistoricalPrices, HistoricalEvents, DataEvent, DataFrequency, DataSource, PriceStore
 from test.mock_framework import MockResponse
 
 
@@ -11,9 +18,22 @@ def mock_requests_get(*args, **kwargs):
     elif 'download' in args[0]:
         with open('test/resources/HistoricalData.csv') as file:
             return MockResponse(file.read())
+    elif 'chart' in args[0]:
+        with open('test/resources/Chart.json') as file:
+            return MockResponse('', json.load(file))
     raise NotImplementedError('How did you even reach here?')
 
 
+def mock_requests_get_events(*args, **kwargs):
+    if 'download' in args[0]:
+        event = kwargs['params']['event']
+        if event == DataEvent.DIVIDENDS:
+            return MockResponse('Date,Dividends\n2018-11-12,2.0\n')
+        elif event == DataEvent.SPLITS:
+            return MockResponse('Date,Stock Splits\n2018-11-15,2/1\n')
+    return mock_requests_get(*args, **kwargs)
+
+
 class TestHistoricalPrices(TestCase):
 
     @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
@@ -51,6 +71,197 @@ class TestHistoricalPrices(TestCase):
         dfs = prices.to_dfs()
         self.assertIn('Historical Prices', dfs.keys())
 
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_chart_source(self, mock_get):
+        download = HistoricalPrices('AAPL', '2018-10-10', '2018-10-16')
+        chart = HistoricalPrices('AAPL', '2018-10-10', '2018-10-16', source=DataSource.CHART)
+        self.assertEqual(download.to_csv(), chart.to_csv())
+        self.assertTrue(download.to_dfs()['Historical Prices'].equals(chart.to_dfs()['Historical Prices']))
+        # No cookie and crumb round trip for the chart endpoint
+        self.assertNotIn('history', mock_get.call_args_list[-1][0][0])
+        self.assertEqual(3, mock_get.call_count)
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_chart_source_events(self, mock_get):
+        dividends = HistoricalPrices('AAPL', '2018-10-10', '2018-11-16',
+            event=DataEvent.DIVIDENDS, source=DataSource.CHART)
+        self.assertEqual('div', mock_get.call_args[1]['params']['events'])
+        self.assertEqual('Date,Dividends\n2018-11-08,0.730000\n', dividends.to_csv())
+
+        splits = HistoricalPrices('AAPL', '2014-06-01', '2014-06-30',
+            event=DataEvent.SPLITS, source=DataSource.CHART)
+        self.assertEqual('Date,Stock Splits\n2014-06-09,7/1\n', splits.to_csv())
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_intraday_requires_chart(self, mock_get):
+        with self.assertRaises(ValueError):
+            HistoricalPrices('AAPL', '2018-10-10', '2018-10-16', frequency=DataFrequency.FIVE_MINUTES)
+        mock_get.assert_not_called()
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_columns(self, mock_get):
+        prices = HistoricalPrices('AAPL', '2018-10-10', '2018-10-16')
+        columns = prices.columns
+        self.assertEqual('datetime64[s]', str(columns['Date'].dtype))
+        self.assertEqual(6, len(columns['Close']))
+        self.assertAlmostEqual(204.470001, columns['Close'][0])
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_between_local(self, mock_get):
+        prices = HistoricalPrices('AAPL', '2018-11-01', '2018-11-30')
+        mock_get.reset_mock()
+        window = prices.between('2018-11-12', '2018-11-14')
+        mock_get.assert_not_called()
+        self.assertEqual(prices.prices.splitlines()[2:5], window.prices.splitlines()[1:])
+        self.assertEqual('2018-11-12', str(window.start_date))
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_between_partial(self, mock_get):
+        prices = HistoricalPrices('AAPL', '2018-11-13', '2018-11-30')
+        mock_get.reset_mock()
+        window = prices.between('2018-11-01', '2018-11-16')
+        # Only 2018-11-01 to 2018-11-12 is downloaded
+        params = mock_get.call_args[1]['params']
+        self.assertEqual(prices._period(date(2018, 11, 1)), params['period1'])
+        self.assertEqual(prices._period(date(2018, 11, 12)), params['period2'])
+        self.assertEqual(prices.prices, window.prices)
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_compression(self, mock_get):
+        plain = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16')
+        prices = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16', compression='gzip')
+        self.assertIsNone(prices._text)
+        self.assertEqual(plain.prices, prices.prices)
+        self.assertEqual(plain.prices, gzip.decompress(prices.to_csv(compression='gzip')).decode())
+        self.assertTrue(plain.to_dfs()['Historical Prices'].equals(prices.to_dfs()['Historical Prices']))
+        self.assertEqual({'Accept-Encoding': 'gzip, deflate'}, mock_get.call_args[1]['headers'])
+
+        with tempfile.TemporaryDirectory() as path:
+            prices.to_csv(os.path.join(path, 'prices.csv.gz'), compression='gzip')
+            with gzip.open(os.path.join(path, 'prices.csv.gz'), 'rt') as file_handle:
+                self.assertEqual(plain.prices, file_handle.read())
+
+            # Data held uncompressed is compressed as it is written, in chunks
+            with mock.patch('yahoofinance.historicaldata._WRITE_CHUNK', 100):
+                plain.to_csv(os.path.join(path, 'plain.csv.gz'), compression='gzip')
+            with gzip.open(os.path.join(path, 'plain.csv.gz'), 'rt') as file_handle:
+                self.assertEqual(plain.prices, file_handle.read())
+
+            # Decoded columns are rendered a few rows at a time, never as the whole text
+            chart = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16', source=DataSource.CHART)
+            expected = chart.prices
+            chart._text = None
+            with mock.patch('yahoofinance.historicaldata._WRITE_ROWS', 4), \
+                    mock.patch('yahoofinance.historicaldata._columns_to_csv', side_effect=AssertionError):
+                chart.to_csv(os.path.join(path, 'chart.csv.gz'), compression='gzip')
+            with gzip.open(os.path.join(path, 'chart.csv.gz'), 'rt') as file_handle:
+                self.assertEqual(expected, file_handle.read())
+
+            # A store is read into compressed data too
+            stored = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16', store=PriceStore(path), compression='gzip')
+            self.assertIsNotNone(stored._compressed)
+            self.assertEqual(6, len(stored.columns['Date']))
+
+    @mock.patch('yahoofinance.historicaldata.requests.get')
+    def test_compression_transfer_encoding(self, mock_get):
+        with open('test/resources/HistoricalData.csv', 'rb') as file:
+            body = gzip.compress(file.read())
+        response = MockResponse(None)
+        response.headers = {'Content-Encoding': 'gzip'}
+        response.raw = io.BytesIO(body)
+        response.raw.read = lambda decode_content=True, read=response.raw.read: read()
+        mock_get.side_effect = lambda *args, **kwargs: (
+            mock_requests_get(*args, **kwargs) if 'history' in args[0] else response)
+
+        prices = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16', compression='gzip')
+        # The body is kept as it was transferred
+        self.assertIs(body, prices._compressed)
+        self.assertEqual(6, len(prices.columns['Date']))
+
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_to_dfs_dtypes(self, mock_get):
+        prices = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16')
+        default = prices.to_dfs()['Historical Prices']
+        df = prices.to_dfs(float_dtype='float32', dtype_backend='numpy_nullable', parse_dates=True)['Historical Prices']
+        self.assertEqual(['Float32'] * 5 + ['Int64'], [str(x) for x in df.dtypes])
+        self.assertEqual('datetime64[s]', str(df.index.dtype))
+        self.assertEqual(default['Volume'].tolist(), df['Volume'].tolist())
+        self.assertLess(df.memory_usage(deep=True).sum(), default.memory_usage(deep=True).sum())
+
+    @unittest.skipIf(pl is None, 'polars is not installed')
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_to_polars(self, mock_get):
+        prices = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16')
+        chart = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16', source=DataSource.CHART)
+        df = prices.to_dfs(engine='polars')['Historical Prices']
+        self.assertEqual(df.schema, chart.to_polars().schema)
+        self.assertEqual(prices.to_dfs()['Historical Prices']['Volume'].tolist(), df['Volume'].to_list())
+        self.assertEqual(date(2018, 11, 9), df['Date'][0])
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_resample(self, mock_get):
+        prices = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16')
+        mock_get.reset_mock()
+        weekly = prices.resample(DataFrequency.WEEKLY)
+        monthly = prices.resample(DataFrequency.MONTHLY)
+        mock_get.assert_not_called()
+
+        self.assertEqual(DataFrequency.WEEKLY, weekly.frequency)
+        self.assertEqual(
+            'Date,Open,High,Low,Close,Adj Close,Volume\n'
+            '2018-11-05,205.550003,206.009995,202.250000,204.470001,204.470001,34365800\n'
+            '2018-11-12,199.000000,199.850006,185.929993,193.529999,193.529999,241506700\n',
+            weekly.prices)
+        self.assertEqual(['2018-11-01'], list(monthly.to_dfs()['Historical Prices'].index))
+        self.assertEqual(275872500, monthly.columns['Volume'][0])
+
+        with self.assertRaises(ValueError):
+            weekly.resample(DataFrequency.MONTHLY)
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_resample_from_store(self, mock_get):
+        with tempfile.TemporaryDirectory() as path:
+            store = PriceStore(path)
+            daily = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16', store=store)
+            mock_get.reset_mock()
+            weekly = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16', frequency=DataFrequency.WEEKLY, store=store)
+            mock_get.assert_not_called()
+            self.assertEqual(daily.resample(DataFrequency.WEEKLY).prices, weekly.prices)
+
+
+class TestHistoricalEvents(TestCase):
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get_events)
+    def test_aligned_download(self, mock_get):
+        events = HistoricalEvents('AAPL', '2018-11-09', '2018-11-16')
+        urls = [call[0][0] for call in mock_get.call_args_list]
+        # A single cookie and crumb pair is shared by the three downloads
+        self.assertEqual(1, sum('history' in url for url in urls))
+        self.assertEqual(3, sum('download' in url for url in urls))
+
+        df = events.to_dfs()['Historical Events']
+        self.assertEqual(6, len(df))
+        self.assertEqual([0, 2, 0, 0, 0, 0], list(df['Dividends']))
+        self.assertEqual([1, 1, 1, 1, 2, 1], list(df['Stock Splits']))
+        self.assertEqual([0.5, 0.5, 0.5, 0.5, 1, 1], list(df['Split Factor']))
+        factor = 1 - 2.0 / 204.470001
+        self.assertAlmostEqual(factor, df['Dividend Factor'].iloc[0])
+        self.assertEqual([1, 1, 1, 1, 1], list(df['Dividend Factor'].iloc[1:]))
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_aligned_chart(self, mock_get):
+        events = HistoricalEvents('AAPL', '2014-06-01', '2018-11-16', source=DataSource.CHART)
+        self.assertEqual(1, mock_get.call_count)
+        self.assertEqual('div,split', mock_get.call_args[1]['params']['events'])
+        columns = events.columns
+        # The split and dividend fall on dates without prices
+        self.assertEqual(8, len(columns['Date']))
+        self.assertEqual(7, columns['Stock Splits'][0])
+        self.assertEqual(0.73, columns['Dividends'][1])
+        self.assertTrue(all(x != x for x in columns['Close'][:2]))
+        self.assertTrue(all(columns['Dividend Factor'] == 1))
+
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,86 @@
+import threading
+import time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from unittest import TestCase, main
+from yahoofinance import CashFlow, HistoricalPrices, LocalePool
+
+with open('test/resources/Cashflow.html', 'rb') as file:
+    CASHFLOW = file.read()
+with open('test/resources/Cookie.html', 'rb') as file:
+    COOKIE = file.read()
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def start_stub(delay=0.0, status=200):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = COOKIE if self.path.endswith('/history') else CASHFLOW
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Set-Cookie', 'B=1234')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = StubServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TestLocalePool(TestCase):
+
+    def setUp(self):
+        self.servers = {
+            'fast': start_stub(),
+            'slow': start_stub(delay=0.2),
+            'broken': start_stub(status=503),
+        }
+        urls = {
+            name: 'http://127.0.0.1:{}/quote'.format(server.server_address[1])
+            for name, server in self.servers.items()
+        }
+        self.pool = LocalePool(urls=urls, timeout=5, max_failures=2, cooldown=60)
+
+    def tearDown(self):
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+
+    def test_routing_and_failover(self):
+        for _ in range(6):
+            cashflow = CashFlow('AAPL', locale=self.pool)
+        self.assertEqual(4, len(cashflow.cashflow))
+
+        stats = self.pool.stats()
+        # Each domain is measured once, then the fast one takes the rest
+        self.assertEqual(1, stats['slow']['requests'])
+        self.assertEqual(5, stats['fast']['requests'])
+        self.assertGreater(stats['slow']['latency'], stats['fast']['latency'])
+        # The request sent to the broken domain failed over
+        self.assertEqual(1, stats['broken']['failures'])
+        self.assertEqual(1.0, round(stats['broken']['error_rate'] / self.pool.smoothing, 6))
+
+    def test_cooldown(self):
+        for _ in range(2):
+            self.pool._record(self.pool._mirrors[0], 0.001, False)
+        self.assertEqual('fast', self.pool._ranked()[-1].name)
+
+    def test_crumb_request(self):
+        prices = HistoricalPrices.__new__(HistoricalPrices)
+        self.assertEqual(('1234', '6/DxjLoIfA8'), prices._find_cookie_crumb_pair(self.pool))
+
+    def test_all_failing(self):
+        pool = LocalePool(urls={'broken': self.pool._mirrors[2].url})
+        with self.assertRaises(Exception):
+            pool.get('/AAPL/financials')
+
+
+if __name__ == '__main__':
+    main()
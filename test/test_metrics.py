@@ -0,0 +1,64 @@
+from unittest import TestCase, mock, main
+from yahoofinance import CashFlow, IncomeStatement, MetricsEngine
+
+
+def period(end, **items):
+    data = {'endDate': {'raw': end, 'fmt': str(end)}}
+    data.update({k: {'raw': v, 'fmt': str(v)} for k, v in items.items()})
+    return data
+
+
+class TestMetricsEngine(TestCase):
+
+    def setUp(self):
+        self.statements = [
+            CashFlow._from_quote_summary('AAPL', {'cashflowStatementHistory': {'cashflowStatements': [
+                period(200, totalCashFromOperatingActivities=100.0, capitalExpenditures=-30.0, netIncome=50.0),
+                period(100, totalCashFromOperatingActivities=80.0, capitalExpenditures=-20.0),
+            ]}}),
+            IncomeStatement._from_quote_summary('AAPL', {'incomeStatementHistory': {'incomeStatementHistory': [
+                period(200, totalRevenue=400.0, netIncome=60.0),
+                period(300, totalRevenue=0.0),
+            ]}}),
+            CashFlow._from_quote_summary('MSFT', {'cashflowStatementHistory': {'cashflowStatements': [
+                period(200, totalCashFromOperatingActivities=10.0, capitalExpenditures=-1.0),
+            ]}}),
+        ]
+
+    def test_alignment(self):
+        engine = MetricsEngine(self.statements)
+        self.assertEqual(
+            [('AAPL', 100), ('AAPL', 200), ('AAPL', 300), ('MSFT', 200)],
+            [(x, y.value // 10 ** 9) for x, y in engine.index])
+        self.assertEqual([60.0, 9.0], list(engine['freeCashFlow'][[0, 3]]))
+        # The first statement holding an item wins
+        self.assertEqual(50.0, engine['netIncome'][1])
+
+    def test_formulas(self):
+        engine = MetricsEngine(self.statements, {'fcfPerRevenue': 'freeCashFlow / totalRevenue * 100'})
+        df = engine.to_df(['freeCashFlow', 'fcfPerRevenue'])
+        self.assertEqual(17.5, df['fcfPerRevenue'].iloc[1])
+        # Missing inputs and division by zero give NaN
+        self.assertTrue(df['fcfPerRevenue'].isna().iloc[[0, 2, 3]].all())
+
+    def test_cache(self):
+        engine = MetricsEngine(self.statements, {'twiceFcf': 'freeCashFlow * 2', 'fcfMargin': 'freeCashFlow / totalRevenue'})
+        with mock.patch.object(engine, '_eval_node', wraps=engine._eval_node) as mock_eval:
+            engine['twiceFcf']
+            calls = mock_eval.call_count
+            engine['fcfMargin']
+            engine['twiceFcf']
+        # fcfMargin only evaluates its own division and names, freeCashFlow is cached
+        self.assertEqual(3, mock_eval.call_count - calls)
+
+    def test_invalid_formulas(self):
+        engine = MetricsEngine(self.statements, {
+            'a': 'b + 1', 'b': 'a * 2', 'c': '__import__("os")', 'd': '10 ** 10 ** 10', 'e': 'True + 1',
+        })
+        for name in 'acde':
+            with self.assertRaises(ValueError):
+                engine[name]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from unittest import TestCase, mock, main
+from yahoofinance import CashFlow, StatementStore, pipeline
+from test.test_cashflow import mock_requests_get
+
+
+def mock_requests_get_missing(*args, **kwargs):
+    if 'MISSING' in args[0]:
+        raise ValueError('Not found')
+    return mock_requests_get(*args, **kwargs)
+
+
+class TestPipeline(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @mock.patch('requests.get', side_effect=mock_requests_get_missing)
+    def test_fetch_to_sinks(self, mock_get):
+        path = os.path.join(self.directory.name, 'statements.db')
+        run = (pipeline.Pipeline(['AAPL', 'MISSING', 'MSFT'], queue_size=1)
+            .stage(pipeline.download(CashFlow), workers=2)
+            .stage(pipeline.extract(CashFlow), workers=2)
+            .stage(pipeline.sqlite_sink(path)))
+        completed, errors = run.run()
+
+        self.assertEqual(2, completed)
+        self.assertEqual(['MISSING'], list(errors))
+        self.assertEqual(['AAPL', 'MSFT'], StatementStore(path).stocks())
+        self.assertEqual(2, run.processed['sqlite_stage'])
+
+        directory = os.path.join(self.directory.name, 'csv')
+        frames = (pipeline.Pipeline(['AAPL'])
+            .stage(pipeline.fetch(CashFlow))
+            .stage(pipeline.transform(lambda x: x.to_dfs()['Cash Flow'])))
+        stock, frame = next(iter(frames))
+        self.assertEqual('AAPL', stock)
+        pipeline.csv_sink(directory)(stock, frame)
+        self.assertTrue(os.path.exists(os.path.join(directory, 'AAPL.csv')))
+
+        pipeline.sqlite_sink(path, table='cashflow')(stock, frame)
+        with sqlite3.connect(path) as connection:
+            self.assertEqual(len(frame), connection.execute('SELECT COUNT(*) FROM cashflow').fetchone()[0])
+
+    def test_backpressure(self):
+        read = []
+        written = []
+        ahead = []
+        lock = threading.Lock()
+
+        def stocks():
+            for i in range(60):
+                with lock:
+                    ahead.append(len(read) - len(written))
+                read.append(i)
+                yield 'S{}'.format(i)
+
+        def slow_sink(stock, value):
+            time.sleep(0.002)
+            with lock:
+                written.append(stock)
+
+        run = (pipeline.Pipeline(stocks(), queue_size=2)
+            .stage(pipeline.transform(str.lower), workers=3)
+            .stage(slow_sink))
+        self.assertEqual((60, {}), run.run())
+        self.assertEqual(60, len(written))
+        # Two queues in front of the stages, four stocks in the stages and one waiting to be queued
+        self.assertLessEqual(max(ahead), 2 * 2 + 4 + 1)
+
+    def test_early_exit(self):
+        run = pipeline.Pipeline(iter(range(1000)), queue_size=1).stage(lambda stock, value: value * 2, workers=2)
+        for stock, value in run:
+            self.assertEqual(stock * 2, value)
+            break
+        self.assertLess(threading.active_count(), 5)
+        self.assertRaises(ValueError, run.stage, str, workers=0)
+
+    def test_source_error(self):
+        def stocks():
+            yield 'A'
+            yield 'B'
+            raise OSError('Read failed')
+
+        def check(stock, value):
+            if stock == 'B':
+                raise ValueError('Bad stock')
+            return value
+
+        run = pipeline.Pipeline(stocks()).stage(check, workers=2)
+        results = []
+        with self.assertRaises(OSError):
+            for item in run:
+                results.append(item)
+        # The stocks read before the error still run
+        self.assertEqual([('A', 'A')], results)
+        self.assertEqual(['B'], list(run.errors))
+
+        # Each run starts with its own errors and counts
+        run.stocks = ['A']
+        self.assertEqual((1, {}), run.run())
+        self.assertEqual({'check': 1}, run.processed)
+
+    def test_stage_exit(self):
+        def exit_stage(stock, value):
+            if stock == 5:
+                raise SystemExit(1)
+            return value
+
+        run = (pipeline.Pipeline(iter(range(1000)), queue_size=2)
+            .stage(exit_stage, workers=2)
+            .stage(lambda stock, value: value, workers=2))
+        # The run stops rather than waiting for the stage forever
+        with self.assertRaises(SystemExit):
+            run.run()
+        self.assertLess(run.processed['exit_stage'], 1000)
+
+
+if __name__ == '__main__':
+    main()
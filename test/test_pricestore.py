@@ -0,0 +1,70 @@
+import shutil
+import tempfile
+import numpy as np
+from datetime import date
+from unittest import TestCase, mock, main
+from yahoofinance import HistoricalPrices, PriceStore
+from test.test_historicaldata import mock_requests_get
+
+
+class TestPriceStore(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.store = PriceStore(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_read_from_store(self, mock_get):
+        downloaded = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16', store=self.store)
+        self.assertTrue(self.store.covers('AAPL', date(2018, 11, 10), date(2018, 11, 14)))
+        mock_get.reset_mock()
+
+        stored = HistoricalPrices('AAPL', '2018-11-12', '2018-11-14', store=self.store)
+        mock_get.assert_not_called()
+        self.assertIsInstance(stored.columns['Close'].base, np.memmap)
+        self.assertEqual(downloaded.prices.splitlines()[2:5], stored.prices.splitlines()[1:])
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_append_and_compact(self, mock_get):
+        HistoricalPrices('AAPL', '2018-11-09', '2018-11-16', store=self.store)
+        HistoricalPrices('AAPL', '2018-11-20', '2018-11-30', store=self.store)
+        self.assertEqual(
+            [(date(2018, 11, 9), date(2018, 11, 16)), (date(2018, 11, 20), date(2018, 11, 30))],
+            self.store.ranges('AAPL'))
+
+        # The mock returns the same rows, so these overlap the stored ones
+        columns = self.store.read('AAPL', date(2018, 1, 1), date(2018, 12, 31))
+        self.assertEqual(6, len(columns['Date']))
+        self.store.compact('AAPL')
+        compacted = self.store.read('AAPL', date(2018, 1, 1), date(2018, 12, 31))
+        self.assertIsInstance(compacted['Date'].base, np.memmap)
+        self.assertTrue(np.array_equal(columns['Close'], compacted['Close']))
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_failed_append(self, mock_get):
+        first = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16', store=self.store)
+        # An append which wrote part of a column and failed before committing its rows
+        dataset = self.store._dataset_path('AAPL', 'history', '1d')
+        with open(self.store._column_path(dataset, 'Close'), 'ab') as file_handle:
+            file_handle.write(b'\0' * 20)
+
+        HistoricalPrices('AAPL', '2018-11-20', '2018-11-30', store=self.store)
+        self.store.compact('AAPL')
+        columns = self.store.read('AAPL', date(2018, 1, 1), date(2018, 12, 31))
+        self.assertTrue(np.array_equal(first.columns['Close'], columns['Close']))
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_fetch_missing_ranges(self, mock_get):
+        HistoricalPrices('AAPL', '2018-11-09', '2018-11-16', store=self.store)
+        mock_get.reset_mock()
+        HistoricalPrices('AAPL', '2018-11-01', '2018-11-20', store=self.store)
+        downloads = [call[1]['params'] for call in mock_get.call_args_list if 'download' in call[0][0]]
+        self.assertEqual(2, len(downloads))
+        self.assertEqual([(date(2018, 11, 1), date(2018, 11, 20))], self.store.ranges('AAPL'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import threading
+import time
+from unittest import TestCase, mock, main
+from yahoofinance import AssetProfile, Priority, RequestScheduler
+from yahoofinance.scheduler import RequestExpired
+from test.mock_framework import MockResponse
+from test.test_assetprofile import mock_requests_get
+
+
+class TestRequestScheduler(TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.sent = []
+
+        def blocking_get(url, **kwargs):
+            self.sent.append(url)
+            if url.endswith('/BLOCK'):
+                self.release.wait(5)
+            return MockResponse('')
+
+        patcher = mock.patch('requests.get', side_effect=blocking_get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def wait_queued(self, scheduler, count):
+        for _ in range(500):
+            if sum(x['queued'] for x in scheduler.stats().values()) == count:
+                return
+            time.sleep(0.01)
+        self.fail('Requests were not queued')
+
+    def test_priority(self):
+        scheduler = RequestScheduler(max_concurrent=1)
+        batch = scheduler.priority(Priority.BATCH)
+        interactive = scheduler.priority(Priority.INTERACTIVE)
+
+        threads = [threading.Thread(target=scheduler.get, args=('/BLOCK',))]
+        threads[0].start()
+        while not self.sent:
+            time.sleep(0.01)
+        for i in range(3):
+            threads.append(threading.Thread(target=batch.get, args=('/B{}'.format(i),)))
+            threads[-1].start()
+            self.wait_queued(scheduler, i + 1)
+        threads.append(threading.Thread(target=interactive.request, args=('https://query1/I',)))
+        threads[-1].start()
+        self.wait_queued(scheduler, 4)
+
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(['/BLOCK', 'https://query1/I', '/B0', '/B1', '/B2'],
+            [x.replace('https://finance.yahoo.com/quote', '') for x in self.sent])
+        stats = scheduler.stats()
+        self.assertEqual([Priority.INTERACTIVE, Priority.NORMAL, Priority.BATCH], list(stats))
+        self.assertEqual(3, stats[Priority.BATCH]['requests'])
+        self.assertLess(stats[Priority.INTERACTIVE]['max_wait'], stats[Priority.BATCH]['max_wait'])
+
+    def test_deadline(self):
+        scheduler = RequestScheduler(max_concurrent=1, deadlines={Priority.BATCH: 0.05})
+        blocker = threading.Thread(target=scheduler.get, args=('/BLOCK',))
+        blocker.start()
+        while not self.sent:
+            time.sleep(0.01)
+
+        self.assertRaises(RequestExpired, scheduler.priority(Priority.BATCH).get, '/B')
+        self.assertRaises(ValueError, scheduler.priority(Priority.INTERACTIVE, deadline=0.01).get, '/I')
+        self.release.set()
+        blocker.join()
+
+        stats = scheduler.stats()
+        self.assertEqual(1, stats[Priority.BATCH]['dropped'])
+        self.assertEqual(0, stats[Priority.BATCH]['requests'])
+        self.assertEqual(1, stats[Priority.INTERACTIVE]['dropped'])
+        # Requests after the expired ones are still served
+        scheduler.priority(Priority.BATCH).get('/B')
+        self.assertEqual(1, scheduler.stats()[Priority.BATCH]['requests'])
+
+    def test_interrupted(self):
+        scheduler = RequestScheduler(max_concurrent=1)
+        blocker = threading.Thread(target=scheduler.get, args=('/BLOCK',))
+        blocker.start()
+        while not self.sent:
+            time.sleep(0.01)
+
+        # An interrupt while waiting takes the request out of the queue
+        with mock.patch.object(scheduler._condition, 'wait', side_effect=KeyboardInterrupt):
+            self.assertRaises(KeyboardInterrupt, scheduler.get, '/I')
+        self.assertEqual(0, sum(x['queued'] for x in scheduler.stats().values()))
+        self.release.set()
+        blocker.join()
+        scheduler.get('/B')
+        self.assertEqual(2, scheduler.stats()[Priority.NORMAL]['requests'])
+
+    def test_data_objects(self):
+        with mock.patch('requests.get', side_effect=mock_requests_get):
+            scheduler = RequestScheduler()
+            profile = AssetProfile('AAPL', locale=scheduler.priority(Priority.INTERACTIVE))
+        self.assertEqual('AAPL', profile.stock)
+        self.assertEqual(1, scheduler.stats()[Priority.INTERACTIVE]['requests'])
+        self.assertRaises(ValueError, RequestScheduler, max_concurrent=0)
+
+
+if __name__ == '__main__':
+    main()
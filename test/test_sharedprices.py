@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+import tempfile
+from unittest import TestCase, mock, main
+import numpy as np
+from yahoofinance import HistoricalPrices, HistoricalEvents, SharedPriceRegistry
+from test.test_historicaldata import mock_requests_get, mock_requests_get_events
+
+
+def read_close(path, start_date, end_date):
+    # Runs in another process
+    registry = SharedPriceRegistry(path)
+    prices = registry.attach(HistoricalPrices, 'AAPL', start_date, end_date)
+    closes = list(prices.columns['Close'])
+    del prices
+    registry.close()
+    return closes
+
+
+class TestSharedPriceRegistry(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'registry.db')
+        self.registry = SharedPriceRegistry(self.path)
+
+    def tearDown(self):
+        self.registry.close()
+        self.directory.cleanup()
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get)
+    def test_publish_and_attach(self, mock_get):
+        prices = HistoricalPrices('AAPL', '2018-11-09', '2018-11-16')
+        self.registry.publish(prices)
+
+        reader = SharedPriceRegistry(self.path)
+        attached = reader.attach(HistoricalPrices, 'AAPL', '2018-11-12', '2018-11-15')
+        self.assertEqual(prices.between('2018-11-12', '2018-11-15').prices, attached.prices)
+        self.assertFalse(attached.columns['Close'].flags.writeable)
+        self.assertIsNone(reader.attach(HistoricalPrices, 'AAPL', '2018-11-01', '2018-11-15'))
+        self.assertIsNone(reader.attach(HistoricalPrices, 'MSFT', '2018-11-12', '2018-11-15'))
+        self.assertIsNone(reader.attach(HistoricalEvents, 'AAPL', '2018-11-12', '2018-11-15'))
+
+        frame = reader.frame(HistoricalPrices, 'AAPL', '2018-11-12', '2018-11-16')
+        self.assertEqual(5, len(frame))
+        self.assertEqual(['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume'], list(frame.columns))
+        self.assertTrue(np.shares_memory(frame.values, attached.columns['Close']))
+
+        with multiprocessing.get_context('spawn').Pool(1) as pool:
+            closes = pool.apply(read_close, (self.path, '2018-11-09', '2018-11-16'))
+        self.assertEqual(list(prices.columns['Close']), closes)
+
+        published = reader.published()
+        self.assertEqual(['AAPL'], list(published['Instrument']))
+        self.assertEqual(6, published['Rows'][0])
+
+        # The blocks stay attached while their arrays are in use
+        self.assertRaises(ValueError, reader.close)
+        del attached, frame
+        reader.close()
+
+    @mock.patch('yahoofinance.historicaldata.requests.get', side_effect=mock_requests_get_events)
+    def test_unpublish(self, mock_get):
+        events = HistoricalEvents('AAPL', '2018-11-09', '2018-11-16')
+        self.registry.publish(events)
+        self.registry.publish(events)
+        self.assertEqual(1, len(self.registry.published()))
+
+        attached = self.registry.attach(HistoricalEvents, 'AAPL', '2018-11-09', '2018-11-16')
+        self.assertEqual(events.to_csv(), attached.to_csv())
+        self.assertEqual(1, self.registry.unpublish('AAPL'))
+        self.assertTrue(self.registry.published().empty)
+        # Views taken before the block was removed stay readable
+        self.assertEqual(list(events.columns['Split Factor']), list(attached.columns['Split Factor']))
+
+        # Entries of blocks which have gone are dropped
+        other = SharedPriceRegistry(self.path)
+        other.publish(events)
+        other._owned.popitem()[1].unlink()
+        self.assertIsNone(self.registry.attach(HistoricalEvents, 'AAPL', '2018-11-09', '2018-11-16'))
+        self.assertTrue(self.registry.published().empty)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+from unittest import TestCase, main
+from yahoofinance import CashFlow, CashFlowQuarterly, BalanceSheet, IncomeStatement, StatementStore
+from yahoofinance.interfaces import IYahooData
+
+
+def period(end, **items):
+    data = {'endDate': {'raw': end, 'fmt': str(end)}}
+    data.update({k: {'raw': v, 'fmt': str(v)} for k, v in items.items()})
+    return data
+
+
+class TestStatementStore(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = StatementStore(os.path.join(self.directory.name, 'statements.db'))
+        with open('test/resources/Cashflow.html') as file:
+            self.fin_data = IYahooData._parse_quote_summary(file.read())
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_and_history(self):
+        written = self.store.write([
+            CashFlow._from_quote_summary('AAPL', self.fin_data),
+            CashFlowQuarterly._from_quote_summary('AAPL', self.fin_data),
+        ])
+        self.assertGreater(written, 0)
+
+        history = self.store.history('AAPL', items=['netIncome', 'capitalExpenditures'])
+        self.assertEqual(['2018-09-29', '2017-09-30', '2016-09-24', '2015-09-26'],
+            [str(x.date()) for x in history.columns])
+        self.assertEqual(59531000000, history.loc['netIncome'].iloc[0])
+        self.assertEqual(4, len(self.store.history('AAPL', frequency='quarterly').columns))
+
+        # Writing the same periods again replaces them
+        self.assertEqual(written, self.store.write([
+            CashFlow._from_quote_summary('AAPL', self.fin_data),
+            CashFlowQuarterly._from_quote_summary('AAPL', self.fin_data),
+        ]))
+        self.assertEqual(4, len(self.store.history('AAPL').columns))
+
+    def test_latest(self):
+        self.store.write(
+            BalanceSheet._from_quote_summary(stock, {'balanceSheetHistory': {'balanceSheetStatements': periods}})
+            for stock, periods in [
+                ('AAPL', [period(100, totalAssets=1.0), period(200, totalAssets=2.0)]),
+                ('MSFT', [period(300, totalAssets=3.0, cash=5.0)]),
+                ('GOOG', [period(400, cash=4.0)]),
+            ]
+        )
+        latest = self.store.latest('totalAssets')
+        self.assertEqual(['AAPL', 'MSFT'], list(latest.index))
+        self.assertEqual([2.0, 3.0], list(latest['Value']))
+        self.assertEqual(['MSFT'], list(self.store.latest('totalAssets', stocks=['MSFT', 'GOOG']).index))
+        self.assertEqual(['AAPL', 'GOOG', 'MSFT'], self.store.stocks())
+        self.assertTrue(self.store.latest('totalAssets', frequency='quarterly').empty)
+
+    def test_statement(self):
+        self.store.write([
+            CashFlow._from_quote_summary('AAPL', {'cashflowStatementHistory': {'cashflowStatements': [
+                period(100, netIncome=1.0, depreciation=5.0), period(300, netIncome=3.0)]}}),
+            IncomeStatement._from_quote_summary('AAPL', {'incomeStatementHistory': {'incomeStatementHistory': [
+                period(100, netIncome=1.5), period(200, netIncome=2.0)]}}),
+        ])
+        # An item in several statements needs the statement
+        self.assertRaises(ValueError, self.store.latest, 'netIncome')
+        self.assertRaises(ValueError, self.store.history, 'AAPL')
+
+        latest = self.store.latest('netIncome', statement='incomestatement')
+        self.assertEqual([(200, 2.0)], [(x.timestamp(), y) for x, y in zip(latest['End Date'], latest['Value'])])
+        self.assertEqual([3.0], list(self.store.latest('netIncome', statement='cashflow')['Value']))
+        self.assertEqual([5.0], list(self.store.latest('depreciation')['Value']))
+
+        history = self.store.history('AAPL', statement='cashflow')
+        self.assertEqual([3.0, 1.0], list(history.loc['netIncome']))
+        self.assertEqual([1.5], list(self.store.history('AAPL', statement='incomestatement').iloc[:, -1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+from unittest import TestCase, mock, main
+from yahoofinance import CashFlowQuarterly, FilingWatcher
+from test.mock_framework import MockResponse
+
+with open('test/resources/Cashflow.html') as file:
+    PAGE = file.read()
+
+# The oldest quarter replaced by a newer one
+NEW_PAGE = PAGE.replace('1514592000', '1546041600')
+
+# The page before its last quarterly cash flow, which ends on the date of the last annual one
+EARLIER, _, LATER = PAGE.rpartition('"endDate":{"raw":1538179200')
+EARLIER_PAGE = EARLIER + '"endDate":{"raw":1506729600' + LATER
+
+
+class TestFilingWatcher(TestCase):
+
+    def setUp(self):
+        self.pages = {'AAPL': PAGE, 'MSFT': PAGE}
+        self.requests = []
+
+    def mock_requests_get(self, url, headers=None, **kwargs):
+        stock = url.split('/')[-2]
+        self.requests.append((stock, headers))
+        if headers and headers.get('If-None-Match') == 'same' and stock == 'MSFT':
+            return mock.Mock(status_code=304)
+        response = MockResponse(self.pages[stock])
+        response.status_code = 200
+        response.headers = {'ETag': 'same'} if stock == 'MSFT' else {}
+        return response
+
+    def test_poll(self):
+        changes = []
+        watcher = FilingWatcher(['AAPL', 'MSFT'], callback=lambda *x: changes.append(x))
+        with mock.patch('yahoofinance.interfaces.requests.get', side_effect=self.mock_requests_get):
+            # The first poll only records the fingerprints
+            self.assertEqual([], watcher.poll())
+            self.assertEqual(2, watcher.stats['parsed'])
+
+            with mock.patch('yahoofinance.interfaces.IYahooData._parse_quote_summary') as mock_parse:
+                self.assertEqual([], watcher.poll())
+                mock_parse.assert_not_called()
+            self.assertEqual(1, watcher.stats['unchanged'])
+            self.assertEqual(1, watcher.stats['not_modified'])
+            self.assertIn(('MSFT', {'If-None-Match': 'same'}), self.requests[2:])
+
+            self.pages['AAPL'] = NEW_PAGE
+            result = watcher.poll()
+
+        self.assertEqual(3, len(result))
+        self.assertEqual(result, changes)
+        self.assertEqual(
+            ['CashFlowQuarterly', 'BalanceSheetQuarterly', 'IncomeStatementQuarterly'],
+            [type(statement).__name__ for _, statement, _ in result])
+        self.assertTrue(all(stock == 'AAPL' and end_dates == [1546041600] for stock, _, end_dates in result))
+
+    def test_budget(self):
+        stocks = ['AAPL', 'MSFT']
+        watcher = FilingWatcher(stocks, budget=1)
+        with mock.patch('yahoofinance.interfaces.requests.get', side_effect=self.mock_requests_get):
+            watcher.poll()
+            watcher.poll()
+            watcher.poll()
+        self.assertEqual(['AAPL', 'MSFT', 'AAPL'], [stock for stock, _ in self.requests])
+
+        # Fingerprints carry over to a new watcher
+        resumed = FilingWatcher(stocks, fingerprints=watcher.fingerprints, budget=1)
+        with mock.patch('yahoofinance.interfaces.requests.get', side_effect=self.mock_requests_get):
+            resumed.poll()
+        self.assertEqual('MSFT', self.requests[-1][0])
+        self.assertEqual(0, resumed.stats['parsed'])
+
+    def test_errors(self):
+        self.pages['AAPL'] = '<html></html>'
+        watcher = FilingWatcher(['AAPL', 'MSFT'], callback=mock.Mock(side_effect=KeyError('callback')))
+        with mock.patch('yahoofinance.interfaces.requests.get', side_effect=self.mock_requests_get):
+            watcher.poll()
+            self.assertEqual(['AAPL'], list(watcher.errors))
+            self.assertIsInstance(watcher.errors['AAPL'], AttributeError)
+            self.assertEqual(1, watcher.stats['errors'])
+
+            # The error is cleared once the stock is checked, callback exceptions propagate
+            self.pages['AAPL'] = PAGE
+            watcher.poll()
+            self.assertEqual({}, watcher.errors)
+            # Every change reaches the callback before the first error is raised
+            self.pages['AAPL'] = NEW_PAGE
+            self.assertRaises(KeyError, watcher.poll)
+            self.assertEqual(3, watcher.callback.call_count)
+            self.assertEqual([], watcher.poll())
+
+    def test_period_on_seen_date(self):
+        self.pages['AAPL'] = EARLIER_PAGE
+        watcher = FilingWatcher(['AAPL'], statements=(CashFlowQuarterly,))
+        with mock.patch('yahoofinance.interfaces.requests.get', side_effect=self.mock_requests_get):
+            watcher.poll()
+            self.pages['AAPL'] = PAGE
+            [(stock, statement, end_dates)] = watcher.poll()
+        self.assertEqual(('AAPL', [1538179200]), (stock, end_dates))
+        self.assertIsInstance(statement, CashFlowQuarterly)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,9 +2,21 @@ name = "yahoofinance"
 
 __author__ = "Michael Tran"
 
-from .dataconfigs import Locale, DataEvent, DataFormat, DataFrequency
+from .dataconfigs import Locale, DataEvent, DataFormat, DataFrequency, DataSource, Priority
 from .cashflow import CashFlow, CashFlowQuarterly
-from .assetprofile import AssetProfile
-from .historicaldata import HistoricalPrices
+from .assetprofile import AssetProfile, ProfileTable
+from .historicaldata import HistoricalPrices, HistoricalEvents
 from .balancesheet import BalanceSheet, BalanceSheetQuarterly
 from .incomestatement import IncomeStatement, IncomeStatementQuarterly
+from .pricestore import PriceStore
+from .batch import BatchFetcher
+from .localepool import LocalePool
+from .interfaces import write_csv, trailing_twelve_months
+from .metrics import MetricsEngine
+from .watcher import FilingWatcher
+from .client import YahooFinanceClient
+from .statementstore import StatementStore
+from .pipeline import Pipeline
+from .scheduler import RequestScheduler, RequestExpired
+from .sharedprices import SharedPriceRegistry
+from .distributed import Coordinator, FetchWorker
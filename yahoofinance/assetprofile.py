@@ -4,12 +4,14 @@ import json
 import csv
 import requests
 import re
+import numpy as np
 import pandas as pd
 from io import StringIO
 from datetime import date, datetime
 
 from .dataconfigs import DataFormat, Locale, DataEvent, DataFrequency
 from .interfaces import IYahooData
+from .batch import BatchFetcher
 
 class AssetProfile(IYahooData):
     """Retrieves the asset profile from Yahoo Finance.
@@ -53,12 +55,17 @@ class AssetProfile(IYahooData):
         ('Year Born', 'yearBorn'),
     )
 
+    _page = 'profile'
+
     def __init__(self, stock, locale=Locale.US):
         super().__init__(locale)
+        self.stock = stock
 
-        url = self._base_url + '/{}/profile'.format(stock)
+        url = self._base_url + '/{}/{}'.format(stock, self._page)
         fin_data = self._fetch_quote_summary(url)
+        self._load(fin_data)
 
+    def _load(self, fin_data):
         self.profile = fin_data['assetProfile']
 
     def to_csv(self, path, sep=',', data_format=DataFormat.RAW, csv_dialect='excel'):
@@ -99,4 +106,134 @@ class AssetProfile(IYahooData):
                     ])
 
     def to_dfs(self, data_format=DataFormat.RAW):
-        raise NotImplementedError()
\ No newline at end of file
+        raise NotImplementedError()
+
+
+class ProfileTable:
+    """A columnar table of asset profiles for many stocks.
+
+    Text columns are stored as :class:`pandas.Categorical`. `Sector`, `Industry` and `Country`
+    have inverted indexes from each value to the rows holding it, so :meth:`filter` only
+    touches the matching rows instead of scanning the table.
+
+    :param profiles: An iterable of :class:`AssetProfile` objects.
+
+    :return: :class:`ProfileTable` object
+    :rtype: `ProfileTable`
+
+    Usage::
+
+      >>> from yahoofinance import ProfileTable
+      >>> table, errors = ProfileTable.fetch(['AAPL', 'AMD', 'INTC', 'MSFT'])
+      >>> table.filter(industry='Semiconductors', country='United States')
+      ['AMD', 'INTC']
+    """
+
+    _columns = (
+        ('Sector', 'sector'),
+        ('Industry', 'industry'),
+        ('Country', 'country'),
+        ('State', 'state'),
+        ('City', 'city'),
+        ('Website', 'website'),
+        ('Full Time Employees', 'fullTimeEmployees'),
+    )
+
+    _indexed = ('Sector', 'Industry', 'Country')
+
+    def __init__(self, profiles):
+        profiles = list(profiles)
+        data = {}
+        for name, key in self._columns:
+            values = [x.profile.get(key) for x in profiles]
+            if name == 'Full Time Employees':
+                data[name] = np.array([np.nan if x is None else x for x in values], dtype=np.float64)
+            else:
+                data[name] = pd.Categorical(values)
+        self.frame = pd.DataFrame(data, index=pd.Index([x.stock for x in profiles], name='Stock'))
+
+        self._stocks = self.frame.index.values
+        self._postings = {name: _postings(self.frame[name].values) for name in self._indexed}
+        self._codes = {name: self.frame[name].values.codes for name in self._indexed}
+
+    @classmethod
+    def fetch(cls, stocks, locale=Locale.US, download_workers=8, parse_workers=None):
+        """Fetches the profiles of many stocks concurrently with a :class:`BatchFetcher`.
+
+        :param stocks: An iterable of stock codes.
+        :param locale: A `Locale` constant to determine which domain to query from. Default: `Locale.US`.
+        :param download_workers: The number of threads downloading pages. Default: `8`.
+        :param parse_workers: The number of processes parsing pages. Default: the number of CPUs.
+
+        :return: The table and a dictionary of stock code to the exception raised for the
+            stocks that failed.
+        :rtype: `tuple`
+        """
+        stocks = list(stocks)
+        with BatchFetcher(download_workers, parse_workers) as fetcher:
+            results, errors = fetcher.fetch(AssetProfile, stocks, locale)
+        # Keep the order the stocks were given in
+        return cls(results[x] for x in stocks if x in results), errors
+
+    def filter(self, sector=None, industry=None, country=None):
+        """Finds the stocks matching all of the given values.
+
+        :param sector: The sector, e.g. `Technology`.
+        :param industry: The industry, e.g. `Semiconductors`.
+        :param country: The country, e.g. `United States`.
+
+        :return: The matching stock codes, in table order.
+        :rtype: `list`
+        """
+        criteria = [
+            (name, value) for name, value in zip(self._indexed, (sector, industry, country))
+            if value is not None
+        ]
+        if not criteria:
+            return list(self._stocks)
+
+        # Starts from the shortest posting list and checks the other values at those rows only,
+        # so the cost follows the smallest match rather than the size of the table
+        criteria.sort(key=lambda x: len(self._postings[x[0]].get(x[1], _EMPTY)))
+        name, value = criteria[0]
+        matched = self._postings[name].get(value, _EMPTY)
+        for name, value in criteria[1:]:
+            if not len(matched):
+                break
+            categories = self.frame[name].cat.categories
+            if value not in categories:
+                return []
+            matched = matched[self._codes[name][matched] == categories.get_loc(value)]
+        return list(self._stocks[matched])
+
+    def values(self, column):
+        """Lists the distinct values of an indexed column with the number of stocks for each.
+
+        :param column: One of `Sector`, `Industry` or `Country`.
+
+        :rtype: `dict`
+        """
+        return {value: len(rows) for value, rows in self._postings[column].items()}
+
+    def to_dfs(self):
+        """Generates a dictionary containing :class:`pandas.DataFrame`.
+
+        Dictionary keys ::
+
+            Profiles
+        """
+        return {'Profiles': self.frame}
+
+
+_EMPTY = np.empty(0, dtype=np.intp)
+
+
+def _postings(categorical):
+    """Maps each category to the sorted row positions holding it."""
+    codes = categorical.codes
+    order = np.argsort(codes, kind='mergesort')
+    bounds = np.searchsorted(codes[order], np.arange(len(categorical.categories) + 1))
+    return {
+        value: order[bounds[i]:bounds[i + 1]]
+        for i, value in enumerate(categorical.categories)
+    }
@@ -0,0 +1,126 @@
+import os
+import requests
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from .dataconfigs import Locale
+from .interfaces import IYahooData, ITransport
+
+
+class BatchFetcher:
+    """Fetches an :class:`IYahooData` implementation for many stocks at once.
+
+    Pages are downloaded by a pool of threads. As each download completes, the page is handed
+    to a pool of processes which parses the HTML and extracts the data, so parsing is not held
+    back by the GIL. Only the extracted data is sent back from the worker processes.
+
+    The fetcher owns both pools, close it when done or use it as a context manager.
+
+    :param download_workers: The number of threads downloading pages. Default: `8`.
+    :param parse_workers: The number of processes parsing pages. Default: the number of CPUs.
+
+    :return: :class:`BatchFetcher` object
+    :rtype: `BatchFetcher`
+
+    Usage::
+
+      >>> from yahoofinance import BatchFetcher, CashFlow
+      >>> with BatchFetcher(download_workers=16, parse_workers=4) as fetcher:
+      ...     results, errors = fetcher.fetch(CashFlow, ['AAPL', 'MSFT', 'GOOG'])
+      >>> results['AAPL']
+      Object<CashFlow>
+    """
+
+    def __init__(self, download_workers=8, parse_workers=None):
+        self.download_workers = download_workers
+        self.parse_workers = parse_workers or os.cpu_count()
+        self._downloads = ThreadPoolExecutor(max_workers=self.download_workers)
+        self._parsers = ProcessPoolExecutor(max_workers=self.parse_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Shuts down the download threads and parsing processes."""
+        self._downloads.shutdown()
+        self._parsers.shutdown()
+
+    def fetch(self, cls, stocks, locale=Locale.US):
+        """Downloads and parses the data for each stock.
+
+        :param cls: The :class:`IYahooData` implementation to fetch, e.g. :class:`CashFlow`.
+        :param stocks: An iterable of stock codes.
+        :param locale: A `Locale` constant to determine which domain to query from. Default: `Locale.US`.
+
+        :return: A dictionary of stock code to object and a dictionary of stock code to the
+            exception raised for the stocks that failed.
+        :rtype: `tuple`
+        """
+        downloads = {
+            self._downloads.submit(_download_page, cls, stock, locale): stock for stock in stocks
+        }
+
+        errors = {}
+        parsing = {}
+        for future in as_completed(downloads):
+            stock = downloads[future]
+            try:
+                html = future.result()
+            except Exception as e:
+                errors[stock] = e
+                continue
+            parsing[self._parsers.submit(_parse_page, cls, stock, html, _process_locale(locale))] = stock
+
+        results, errors = self._collect(parsing, errors)
+        for obj in results.values():
+            # Objects are parsed with a locale usable in another process, the urls follow the real one
+            IYahooData.__init__(obj, locale)
+        return results, errors
+
+    def parse(self, cls, pages, locale=Locale.US):
+        """Parses pages that have already been downloaded.
+
+        :param cls: The :class:`IYahooData` implementation to parse, e.g. :class:`CashFlow`.
+        :param pages: A dictionary of stock code to the page HTML.
+        :param locale: A `Locale` constant recorded on the objects. Default: `Locale.US`.
+
+        :return: A dictionary of stock code to object and a dictionary of stock code to the
+            exception raised for the stocks that failed.
+        :rtype: `tuple`
+        """
+        parsing = {
+            self._parsers.submit(_parse_page, cls, stock, html, locale): stock
+            for stock, html in pages.items()
+        }
+        return self._collect(parsing, {})
+
+    @staticmethod
+    def _collect(parsing, errors):
+        results = {}
+        for future in as_completed(parsing):
+            stock = parsing[future]
+            try:
+                results[stock] = future.result()
+            except Exception as e:
+                errors[stock] = e
+        return results, errors
+
+
+def _download_page(cls, stock, locale):
+    path = '/{}/{}'.format(stock, cls._page)
+    if isinstance(locale, ITransport):
+        return locale.get(path).content
+    return requests.get(Locale.locale_url(locale) + path).content
+
+
+def _process_locale(locale):
+    # A transport holds locks and its state is only tracked in this process
+    return Locale.US if isinstance(locale, ITransport) else locale
+
+
+def _parse_page(cls, stock, html, locale):
+    # Runs in a worker process, the returned object only holds the extracted data
+    fin_data = IYahooData._parse_quote_summary(html)
+    return cls._from_quote_summary(stock, fin_data, locale)
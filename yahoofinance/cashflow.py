@@ -9,16 +9,19 @@ from io import StringIO
 from datetime import date, datetime
 
 from .dataconfigs import DataFormat, Locale, DataEvent, DataFrequency
-from .interfaces import IYahooData
+from .interfaces import IYahooData, IFinancialStatement, ITrailingTwelveMonths, _check_engine
 
 
-class CashFlow(IYahooData):
+class CashFlow(IFinancialStatement):
     """Retrieves annual cash flow information from Yahoo Finance.
 
     **EXPERIMENTAL**
 
     :param stock: The a stock code to query.
     :param locale: A `Locale` constant to determine which domain to query from. Default: `Locale.US`.
+    :param fields: Only keep these items, given as Yahoo keys. Default: `None`.
+    :param sections: Only keep the items of these sections. Default: `None`, all items are kept
+        when neither `fields` nor `sections` is given.
 
     :return: :class:`CashFlow` object
     :rtype: `CashFlow`
@@ -66,44 +69,40 @@ class CashFlow(IYahooData):
         ]
     }
 
-    def __init__(self, stock, locale=Locale.US):
+    _statement_attr = 'cashflow'
+
+    def __init__(self, stock, locale=Locale.US, fields=None, sections=None):
         super().__init__(locale)
-        url = self._base_url + '/{}/financials'.format(stock)
+        self.stock = stock
+        self._layout = self._project(fields, sections)
+        url = self._base_url + '/{}/{}'.format(stock, self._page)
         fin_data = self._fetch_quote_summary(url)
+        self._load(fin_data)
 
-        self.cashflow = self._extract_cashflow(fin_data)
+    def _load(self, fin_data):
+        self.cashflow = self._retain(self._extract_cashflow(fin_data))
         self.cashflow.sort(key=lambda x: x['endDate']['raw'], reverse=True)
 
-    def to_csv(self, path=None, sep=',', data_format=DataFormat.RAW, csv_dialect='excel'):
-        """Generates a CSV file.
-
-        :param path: The path to a file location. If it is `None`, this method returns the
-            CSV as a string.
-        :param sep: The separator between elements in the new line.
-        :param data_format: A :class:`DataFormat` constant to determine how the data is
-            exported.
-        :param csv_dialect: The dialect to write the CSV file. See Python in-built :class:`csv`.
-
-        :return: `None` or :class:`string`
-        :rtype: `None` or `string`
-        """
-
-        if path is None:
-            file_handle = StringIO()
-            self._write_csv(file_handle, csv_dialect, sep, data_format)
-            return file_handle.getvalue()
-
-        # Path provided
-        with open(path, 'w') as file_handle:
-            self._write_csv(file_handle, csv_dialect, sep, data_format)
-
-    def to_dfs(self, data_format=DataFormat.RAW):
+    def to_dfs(self, data_format=DataFormat.RAW, fields=None, sections=None, float_dtype=None,
+            dtype_backend=None, categorical=False, engine='pandas'):
         """Generates a dictionary containing :class:`pandas.DataFrame`.
 
         :param data_format: A :class:`DataFormat` constant to determine how the data is exported.
-
-        :return: :class:`pandas.DataFrame`
-        :rtype: `pandas.DataFrame`
+        :param fields: The Yahoo keys of the items to export. Default: `None`.
+        :param sections: The sections to export. Default: `None`, all items are exported when
+            neither `fields` nor `sections` is given. Only the sections with a selected item
+            are in the dictionary.
+        :param float_dtype: The dtype of float columns, e.g. `'float32'`. Default: `None`.
+        :param dtype_backend: `'numpy_nullable'` or `'pyarrow'` to use pandas nullable dtypes.
+            Default: `None`.
+        :param categorical: Use categorical levels for the `Subject` and `Item` index.
+            Default: `False`.
+        :param engine: `'pandas'` or `'polars'`. Polars frames hold `Subject` and `Item` as
+            categorical columns, missing items are null and the dtype options are not used.
+            Default: `'pandas'`.
+
+        :return: :class:`pandas.DataFrame` or :class:`polars.DataFrame`
+        :rtype: `pandas.DataFrame` or `polars.DataFrame`
 
         Dictionary keys ::
 
@@ -115,19 +114,12 @@ class CashFlow(IYahooData):
             Changes in Cash
         """
 
-        cols = [i['endDate']['fmt'] for i in self.cashflow]
-        multiindex = []
-        data = []
-        for k, v in self._df_mapping.items():
-            for name, key in v:
-                index = (k, name)
-                multiindex.append(index)
-                data.append(self._df_row(self.cashflow, key, data_format))
-
-        idx = pd.MultiIndex.from_tuples(multiindex, names=('Subject', 'Item'))
-        df = pd.DataFrame(data, idx, cols)
+        if _check_engine(engine) == 'polars':
+            return self._polars_dfs('Cash Flow', data_format, fields, sections)
+
+        df = self._frame(data_format, fields, sections, float_dtype, dtype_backend, categorical)
         df_dict = {
-            x: df.xs(x) for x in self._df_mapping.keys()
+            x: df.xs(x) for x in df.index.unique('Subject')
         }
         df_dict['Cash Flow'] = df
         return df_dict
@@ -138,25 +130,19 @@ class CashFlow(IYahooData):
     def _extract_cashflow(self, fin_data):
         return fin_data['cashflowStatementHistory']['cashflowStatements']
 
-    def _write_csv(self, file_handle, dialect, sep, data_format):
-        csv_handle = csv.writer(file_handle, dialect=dialect, delimiter=sep)
-
-        csv_rows = [self._csv_row(self.cashflow, 'Period ending', 'endDate', 'fmt')]
-        for k, v in self._df_mapping.items():
-            csv_rows.append([])
-            csv_rows.append([k])
-            for name, key in v:
-                csv_rows.append(self._csv_row(self.cashflow, name, key, data_format))
-        csv_handle.writerows(csv_rows)
 
-
-class CashFlowQuarterly(CashFlow):
+class CashFlowQuarterly(ITrailingTwelveMonths, CashFlow):
     """Retrieves quarterly cash flow information from Yahoo Finance.
 
     **EXPERIMENTAL**
 
     :param stock: The a stock code to query.
     :param locale: A `Locale` constant to determine which domain to query from. Default: `Locale.US`.
+    :param fields: Only keep these items, given as Yahoo keys. Default: `None`.
+    :param sections: Only keep the items of these sections. Default: `None`, all items are kept
+        when neither `fields` nor `sections` is given.
+
+    Trailing twelve month sums are given by :meth:`ttm`.
 
     :return: :class:`CashFlowQuarterly` object
     :rtype: `CashFlowQuarterly`
@@ -170,6 +156,8 @@ class CashFlowQuarterly(CashFlow):
       Object<CashFlowQuarterly>
     """
 
+    _frequency = 'quarterly'
+
     def _header_text(self):
         return 'Cash Flow (Quarterly)'
 
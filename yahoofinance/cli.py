@@ -0,0 +1,197 @@
+"""
+Command line bulk exporter.
+
+Usage::
+
+    $ yahoofinance tickers.txt --datasets prices cashflow profile --output export --workers 16
+
+Each line of the ticker file holds one stock code. Files are written to
+`<output>/<dataset>/<stock>.<format>`. Completed (dataset, stock) pairs are recorded in a
+checkpoint file so an interrupted run picks up where it stopped when run again.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+
+from .dataconfigs import DataEvent, DataFrequency, Locale
+from .historicaldata import HistoricalPrices
+from .cashflow import CashFlow, CashFlowQuarterly
+from .balancesheet import BalanceSheet, BalanceSheetQuarterly
+from .incomestatement import IncomeStatement, IncomeStatementQuarterly
+from .assetprofile import AssetProfile
+
+
+def _prices(event):
+    def fetch(stock, args):
+        return HistoricalPrices(
+            stock, args.start, args.end, event=event, frequency=args.frequency, locale=args.locale)
+    return fetch
+
+
+def _statement(cls):
+    def fetch(stock, args):
+        return cls(stock, locale=args.locale)
+    return fetch
+
+
+DATASETS = {
+    'prices': _prices(DataEvent.HISTORICAL_PRICES),
+    'dividends': _prices(DataEvent.DIVIDENDS),
+    'splits': _prices(DataEvent.SPLITS),
+    'cashflow': _statement(CashFlow),
+    'cashflow-quarterly': _statement(CashFlowQuarterly),
+    'balancesheet': _statement(BalanceSheet),
+    'balancesheet-quarterly': _statement(BalanceSheetQuarterly),
+    'incomestatement': _statement(IncomeStatement),
+    'incomestatement-quarterly': _statement(IncomeStatementQuarterly),
+    'profile': _statement(AssetProfile),
+}
+
+FORMATS = ('csv', 'parquet')
+
+# Data sets without a numeric frame to write as parquet
+CSV_ONLY = {'profile'}
+
+
+class Checkpoint:
+    """An append only record of the (dataset, stock) pairs that have been exported.
+
+    :param path: The checkpoint file. It is created if it does not exist.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._done = set()
+        if os.path.exists(path):
+            with open(path) as file_handle:
+                self._done.update(tuple(line.rstrip('\n').split('\t')) for line in file_handle if line.strip())
+
+    def __contains__(self, job):
+        return job in self._done
+
+    def add(self, job):
+        with self._lock:
+            with open(self.path, 'a') as file_handle:
+                file_handle.write('\t'.join(job) + '\n')
+            self._done.add(job)
+
+
+def read_tickers(path):
+    """Reads stock codes from a file, one per line. Blank lines and `#` comments are ignored."""
+    with open(path) as file_handle:
+        tickers = [line.split('#')[0].strip() for line in file_handle]
+    return [x for x in tickers if x]
+
+
+def export(dataset, stock, args):
+    """Fetches one data set for one stock and writes it to the output directory."""
+    obj = DATASETS[dataset](stock, args)
+    directory = os.path.join(args.output, dataset)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, '{}.{}'.format(stock, args.format))
+
+    if args.format == 'csv':
+        obj.to_csv(path)
+    else:
+        # Missing values as NaN, the '-' placeholders would make the columns mixed objects
+        _main_frame(obj.to_dfs(float_dtype='float64')).to_parquet(path)
+
+
+def _main_frame(dfs):
+    # Statements hold one frame per section plus the full statement with a MultiIndex
+    for frame in dfs.values():
+        if frame.index.nlevels > 1:
+            return frame
+    return next(iter(dfs.values()))
+
+
+def run(args, stream=sys.stderr):
+    """Runs an export and reports the throughput and errors.
+
+    :return: The number of failed jobs.
+    :rtype: `int`
+    """
+    tickers = read_tickers(args.tickers)
+    os.makedirs(args.output, exist_ok=True)
+    checkpoint = Checkpoint(args.checkpoint or os.path.join(args.output, 'checkpoint.tsv'))
+
+    jobs = [(dataset, stock) for stock in tickers for dataset in args.datasets]
+    pending = [job for job in jobs if job not in checkpoint]
+
+    errors = Counter()
+    completed = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(export, dataset, stock, args): (dataset, stock) for dataset, stock in pending}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                errors[type(e).__name__] += 1
+                print('Failed {} {}: {!r}'.format(job[0], job[1], e), file=stream)
+                continue
+            checkpoint.add(job)
+            completed += 1
+    elapsed = time.perf_counter() - start
+
+    failed = sum(errors.values())
+    print('Jobs: {} total, {} skipped, {} completed, {} failed'.format(
+        len(jobs), len(jobs) - len(pending), completed, failed), file=stream)
+    print('Time: {:.1f}s, {:.2f} jobs/s'.format(
+        elapsed, completed / elapsed if elapsed else 0.0), file=stream)
+    for name, count in errors.most_common():
+        print('  {}: {}'.format(name, count), file=stream)
+    return failed
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='yahoofinance', description='Bulk export data sets from Yahoo Finance.')
+    parser.add_argument('tickers', help='File with one stock code per line')
+    parser.add_argument(
+        '-d', '--datasets', nargs='+', choices=sorted(DATASETS), metavar='DATASET',
+        help='Data sets to export, any of: {}. Default: all, except profile for parquet'.format(
+            ', '.join(sorted(DATASETS))))
+    parser.add_argument('-o', '--output', default='.', help='Output directory. Default: current directory')
+    parser.add_argument('-f', '--format', choices=FORMATS, default='csv', help='Output format. Default: csv')
+    parser.add_argument('-w', '--workers', type=int, default=8, help='Number of concurrent workers. Default: 8')
+    parser.add_argument('-c', '--checkpoint', help='Checkpoint file. Default: <output>/checkpoint.tsv')
+    parser.add_argument('--start', default='1970-01-01', help='Start date for prices (YYYY-MM-DD). Default: 1970-01-01')
+    parser.add_argument('--end', default=date.today().isoformat(), help='End date for prices (YYYY-MM-DD). Default: today')
+    parser.add_argument('--frequency', default=DataFrequency.DAILY,
+        choices=DataFrequency._DOWNLOADABLE, help='Price interval. Default: 1d')
+    parser.add_argument('--locale', default=Locale.US, help='Two letter Yahoo domain, e.g. au. Default: US')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.datasets is None:
+        args.datasets = [x for x in sorted(DATASETS) if args.format == 'csv' or x not in CSV_ONLY]
+
+    if args.format == 'parquet':
+        csv_only = sorted(CSV_ONLY.intersection(args.datasets))
+        if csv_only:
+            parser.error('{} can only be exported as csv'.format(', '.join(csv_only)))
+        try:
+            import pyarrow
+        except ImportError:
+            try:
+                import fastparquet
+            except ImportError:
+                parser.error('parquet output requires pyarrow or fastparquet')
+
+    return 1 if run(args) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import threading
+import time
+import weakref
+import requests
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from .dataconfigs import Locale
+from .interfaces import ITransport
+from .cashflow import CashFlow, CashFlowQuarterly
+from .balancesheet import BalanceSheet, BalanceSheetQuarterly
+from .incomestatement import IncomeStatement, IncomeStatementQuarterly
+from .assetprofile import AssetProfile
+from .historicaldata import HistoricalPrices, HistoricalEvents
+
+
+class YahooFinanceClient(ITransport):
+    """A client owning the connections, caches and rate limit shared by every data object it creates.
+
+    A single client is safe to share between any number of threads:
+
+    * Connections are pooled in one :class:`requests.Session` per thread.
+    * Requests wait for the rate limit, which is shared by all threads.
+    * Parsed quote pages and the cookie and crumb pair are cached for `cache_ttl` seconds. When
+      several threads ask for the same page at once, it is downloaded and parsed only once and
+      every thread gets the same result. Statements of a stock on the same page, e.g. the cash
+      flow and balance sheet, share one request.
+    * Data objects are fully built before they are returned and their data is not changed
+      afterwards, so they can be read from any thread. The data may be shared with the cache and
+      other objects, so treat it as read only.
+
+    :param locale: A `Locale` constant to determine which domain to query from, or a
+        :class:`LocalePool` to spread requests over several domains. Default: `Locale.US`.
+    :param rate_limit: The most requests per second over all threads. Default: `None`, no limit.
+    :param burst: The number of requests that can be sent at once before the rate limit
+        applies. Default: `1`.
+    :param cache_ttl: Seconds to keep parsed pages and the cookie and crumb pair. `0` disables
+        the cache. Default: `300`.
+    :param cache_size: The most pages to keep. Default: `1024`.
+    :param timeout: Seconds to wait for a response. Default: `10`.
+    :param pool_size: The connections kept open per host for each thread. Default: `10`.
+
+    :return: :class:`YahooFinanceClient` object
+    :rtype: `YahooFinanceClient`
+
+    Usage::
+
+      >>> from yahoofinance import YahooFinanceClient
+      >>> client = YahooFinanceClient(rate_limit=5)
+      >>> cashflow = client.cash_flow('AAPL', quarterly=True)
+      >>> prices = client.historical_prices('AAPL', '2018-01-01', '2018-12-31')
+    """
+
+    def __init__(self, locale=Locale.US, rate_limit=None, burst=1, cache_ttl=300, cache_size=1024,
+            timeout=10, pool_size=10):
+        self.locale = locale
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Sessions of finished threads are dropped with the thread
+        self._sessions = weakref.WeakSet()
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._stats = {'requests': 0, 'cache_hits': 0, 'cache_misses': 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Closes the connections of every thread."""
+        with self._lock:
+            sessions, self._sessions = list(self._sessions), weakref.WeakSet()
+        for session in sessions:
+            session.close()
+
+    def cash_flow(self, stock, quarterly=False, fields=None, sections=None):
+        """Fetches a :class:`CashFlow`, or a :class:`CashFlowQuarterly` if `quarterly`."""
+        cls = CashFlowQuarterly if quarterly else CashFlow
+        return cls(stock, locale=self, fields=fields, sections=sections)
+
+    def balance_sheet(self, stock, quarterly=False, fields=None, sections=None):
+        """Fetches a :class:`BalanceSheet`, or a :class:`BalanceSheetQuarterly` if `quarterly`."""
+        cls = BalanceSheetQuarterly if quarterly else BalanceSheet
+        return cls(stock, locale=self, fields=fields, sections=sections)
+
+    def income_statement(self, stock, quarterly=False, fields=None, sections=None):
+        """Fetches an :class:`IncomeStatement`, or an :class:`IncomeStatementQuarterly` if `quarterly`."""
+        cls = IncomeStatementQuarterly if quarterly else IncomeStatement
+        return cls(stock, locale=self, fields=fields, sections=sections)
+
+    def asset_profile(self, stock):
+        """Fetches an :class:`AssetProfile`."""
+        return AssetProfile(stock, locale=self)
+
+    def historical_prices(self, instrument, start_date, end_date, **kwargs):
+        """Fetches :class:`HistoricalPrices`. Other arguments are passed on, except `locale`."""
+        return HistoricalPrices(instrument, start_date, end_date, locale=self, **kwargs)
+
+    def historical_events(self, instrument, start_date, end_date, **kwargs):
+        """Fetches :class:`HistoricalEvents`. Other arguments are passed on, except `locale`."""
+        return HistoricalEvents(instrument, start_date, end_date, locale=self, **kwargs)
+
+    def get(self, path, **kwargs):
+        """Requests a path after the quote url of the client's domain.
+
+        :return: :class:`requests.Response` object
+        :rtype: `requests.Response`
+        """
+        if isinstance(self.locale, ITransport):
+            self._acquire()
+            return self.locale.get(path, **kwargs)
+        return self.request(Locale.locale_url(self.locale) + path, **kwargs)
+
+    def request(self, url, **kwargs):
+        """Requests a full url over the calling thread's connections.
+
+        :return: :class:`requests.Response` object
+        :rtype: `requests.Response`
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        self._acquire()
+        return self._session().get(url, **kwargs)
+
+    def cached(self, key, load):
+        """Returns the cached value for `key`, or calls `load` once for all threads waiting on it."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self._stats['cache_hits'] += 1
+                return entry[1]
+            future = self._pending.get(key)
+            loading = future is None
+            if loading:
+                future = self._pending[key] = Future()
+                self._stats['cache_misses'] += 1
+            else:
+                self._stats['cache_hits'] += 1
+
+        if not loading:
+            return future.result()
+
+        try:
+            value = load()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if self.cache_ttl > 0:
+                self._cache[key] = (time.monotonic() + self.cache_ttl, value)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            del self._pending[key]
+        future.set_result(value)
+        return value
+
+    def clear_cache(self):
+        """Drops every cached page and the cookie and crumb pair."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        """Reports the requests sent and the cache use.
+
+        :return: A dictionary with `requests`, `cache_hits` and `cache_misses`.
+        :rtype: `dict`
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.add(session)
+        return session
+
+    def _acquire(self):
+        # Token bucket, each thread reserves a token and sleeps outside of the lock until it is due
+        with self._lock:
+            self._stats['requests'] += 1
+            if not self.rate_limit:
+                return
+            now = time.monotonic()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate_limit if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
@@ -60,6 +60,48 @@ class DataFrequency:
     #: Retrieve data at montly intervals.
     MONTHLY = "1mo"
 
+    #: Retrieve data at quarterly intervals. Only available with :attr:`DataSource.CHART`.
+    QUARTERLY = "3mo"
+
+    #: Retrieve data at 1 minute intervals. Only available with :attr:`DataSource.CHART`.
+    ONE_MINUTE = "1m"
+
+    #: Retrieve data at 2 minute intervals. Only available with :attr:`DataSource.CHART`.
+    TWO_MINUTES = "2m"
+
+    #: Retrieve data at 5 minute intervals. Only available with :attr:`DataSource.CHART`.
+    FIVE_MINUTES = "5m"
+
+    #: Retrieve data at 15 minute intervals. Only available with :attr:`DataSource.CHART`.
+    FIFTEEN_MINUTES = "15m"
+
+    #: Retrieve data at 30 minute intervals. Only available with :attr:`DataSource.CHART`.
+    THIRTY_MINUTES = "30m"
+
+    #: Retrieve data at 60 minute intervals. Only available with :attr:`DataSource.CHART`.
+    SIXTY_MINUTES = "60m"
+
+    #: Retrieve data at 90 minute intervals. Only available with :attr:`DataSource.CHART`.
+    NINETY_MINUTES = "90m"
+
+    _INTRADAY = (
+        ONE_MINUTE, TWO_MINUTES, FIVE_MINUTES, FIFTEEN_MINUTES,
+        THIRTY_MINUTES, SIXTY_MINUTES, NINETY_MINUTES
+    )
+
+    _DOWNLOADABLE = (DAILY, WEEKLY, MONTHLY)
+
+class DataSource:
+    """Selects the Yahoo endpoint used by :class:`HistoricalPrices`."""
+
+    #: The CSV download endpoint. Requires a cookie and crumb pair to be fetched first.
+    # E.g. https://query1.finance.yahoo.com/v7/finance/download/AAPL
+    DOWNLOAD = "download"
+
+    #: The JSON chart endpoint. Supports intraday frequencies and does not need a crumb.
+    # E.g. https://query1.finance.yahoo.com/v8/finance/chart/AAPL
+    CHART = "chart"
+
 class DataFormat:
     """Selects the way data is formatted for :class:`IYahooData` implementations."""
 
@@ -72,4 +114,20 @@ class DataFormat:
     #: Provides a longer formatted value. E.g. 1,000,000.0
     LONG = 'longFmt'
 
-    _FORMATS = (RAW, SHORT, LONG)
\ No newline at end of file
+    _FORMATS = (RAW, SHORT, LONG)
+
+
+class Priority:
+    """Selects the priority class of requests sent through a :class:`RequestScheduler`.
+
+    Lower values are served first.
+    """
+
+    #: Latency sensitive lookups, e.g. a user waiting on a page. Served before everything else.
+    INTERACTIVE = 0
+
+    #: Requests sent through the scheduler directly.
+    NORMAL = 1
+
+    #: Background refreshes, served when nothing else is waiting.
+    BATCH = 2
@@ -0,0 +1,562 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import closing
+import pandas as pd
+
+from .dataconfigs import Locale
+from .cashflow import CashFlow, CashFlowQuarterly
+from .balancesheet import BalanceSheet, BalanceSheetQuarterly
+from .incomestatement import IncomeStatement, IncomeStatementQuarterly
+from .assetprofile import AssetProfile, ProfileTable
+from .historicaldata import HistoricalPrices, HistoricalEvents
+
+# The classes a job can fetch, by name
+JOB_CLASSES = OrderedDict((cls.__name__, cls) for cls in (
+    CashFlow, CashFlowQuarterly, BalanceSheet, BalanceSheetQuarterly, IncomeStatement,
+    IncomeStatementQuarterly, AssetProfile, HistoricalPrices, HistoricalEvents,
+))
+
+
+class Job:
+    """A request to fetch one data object, e.g. the :class:`CashFlow` of `AAPL`.
+
+    :param kind: The class name, a key of :data:`JOB_CLASSES`.
+    :param stock: The stock code.
+    :param params: Other arguments of the class, e.g. `start_date` and `end_date` for
+        :class:`HistoricalPrices`. They must be JSON serialisable.
+
+    A claimed job also carries its queue `id`, its `attempts` and the `worker` holding the lease.
+    The worker and attempts identify the lease, so a worker whose lease was taken over cannot
+    acknowledge or fail the job.
+    """
+
+    def __init__(self, kind, stock, params=None, id=None, attempts=0, worker=None):
+        self.kind = kind
+        self.stock = stock
+        self.params = dict(params or {})
+        self.id = id
+        self.attempts = attempts
+        self.worker = worker
+
+    @property
+    def key(self):
+        """Identifies the result, so fetching a job again overwrites the same result."""
+        return json.dumps([self.kind, self.stock, self.params], sort_keys=True)
+
+    def fetch(self, locale=Locale.US):
+        """Creates the data object of the job."""
+        return JOB_CLASSES[self.kind](self.stock, locale=locale, **self.params)
+
+    def frames(self, locale=Locale.US):
+        """Fetches the job and generates its `to_dfs` frames.
+
+        An :class:`AssetProfile` has no frames of its own, so it gives the one row `Profiles`
+        frame of a :class:`ProfileTable`.
+        """
+        obj = self.fetch(locale)
+        if isinstance(obj, AssetProfile):
+            return ProfileTable([obj]).to_dfs()
+        return obj.to_dfs()
+
+    def __repr__(self):
+        return 'Job<{} {} {}>'.format(self.kind, self.stock, self.params or '')
+
+
+class IWorkQueue(ABC):
+    """This is the base interface for the queue of jobs shared by a :class:`Coordinator` and
+    :class:`FetchWorker` objects.
+
+    Delivery is at least once. A claimed job is leased to the worker for a number of seconds. If
+    it is not acknowledged by then, e.g. because the worker died, it can be claimed again, unless
+    it has run out of attempts: it is then marked failed by the next claim.
+
+    **This class is NOT instantiable.**
+    """
+
+    @abstractmethod
+    def put(self, jobs):
+        """Adds jobs to the queue.
+
+        :return: The number of jobs added.
+        :rtype: `int`
+        """
+        pass
+
+    @abstractmethod
+    def claim(self, worker, lease):
+        """Leases the oldest available job to a worker for `lease` seconds.
+
+        :return: The :class:`Job`, with its attempts counted, or `None` if no job is available.
+        :rtype: `Job`
+        """
+        pass
+
+    @abstractmethod
+    def ack(self, job):
+        """Marks a claimed job as done, if its lease is still held.
+
+        :return: `False` if the lease was lost, e.g. it ran out and another worker claimed the job.
+        :rtype: `bool`
+        """
+        pass
+
+    @abstractmethod
+    def fail(self, job, error):
+        """Returns a claimed job to the queue, or marks it failed once it runs out of attempts.
+
+        :return: `'retried'`, `'failed'`, or `'lost'` if the lease was lost and the job is left as it is.
+        :rtype: `str`
+        """
+        pass
+
+    @abstractmethod
+    def counts(self):
+        """Counts the jobs by state.
+
+        :return: A dictionary with `queued`, `leased`, `done` and `failed`.
+        :rtype: `dict`
+        """
+        pass
+
+    @abstractmethod
+    def failures(self):
+        """Lists the failed jobs.
+
+        :return: A list of `(job, error)` pairs, the error being the `repr` of the exception of
+            the last attempt.
+        :rtype: `list`
+        """
+        pass
+
+
+class IResultStore(ABC):
+    """This is the base interface for the store of fetched results shared by :class:`FetchWorker`
+    objects.
+
+    Results are keyed by :attr:`Job.key`, so writes are idempotent: a job fetched twice, e.g.
+    after a lease expired, replaces its first result.
+
+    **This class is NOT instantiable.**
+    """
+
+    @abstractmethod
+    def write(self, key, frames):
+        """Writes the `to_dfs` frames of a job, replacing any result with the same key."""
+        pass
+
+    @abstractmethod
+    def read(self, key):
+        """Reads the frames of a job.
+
+        :return: A dictionary of :class:`pandas.DataFrame`, or `None` if there is no result.
+        :rtype: `dict`
+        """
+        pass
+
+    @abstractmethod
+    def keys(self):
+        """Lists the keys of the stored results.
+
+        :rtype: `list`
+        """
+        pass
+
+
+class MemoryWorkQueue(IWorkQueue):
+    """An in-process :class:`IWorkQueue`, for workers in threads of one process and for tests.
+
+    :param max_attempts: The claims of a job before it is marked failed. Default: `3`.
+    """
+
+    def __init__(self, max_attempts=3):
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._ids = 0
+
+    def put(self, jobs):
+        with self._lock:
+            count = 0
+            for job in jobs:
+                self._ids += 1
+                self._jobs[self._ids] = {
+                    'job': Job(job.kind, job.stock, job.params, self._ids), 'state': 'queued',
+                    'lease_until': 0.0, 'worker': None, 'error': None,
+                }
+                count += 1
+            return count
+
+    def claim(self, worker, lease):
+        now = time.time()
+        with self._lock:
+            for entry in self._jobs.values():
+                if _available(entry['state'], entry['lease_until'], now):
+                    job = entry['job']
+                    if job.attempts >= self.max_attempts:
+                        entry['state'] = 'failed'
+                        entry['error'] = _expired(job.attempts)
+                        continue
+                    job.attempts += 1
+                    entry['state'] = 'leased'
+                    entry['lease_until'] = now + lease
+                    entry['worker'] = worker
+                    return Job(job.kind, job.stock, job.params, job.id, job.attempts, worker)
+        return None
+
+    def ack(self, job):
+        with self._lock:
+            entry = self._jobs[job.id]
+            if not self._holds(entry, job):
+                return False
+            entry['state'] = 'done'
+            return True
+
+    def fail(self, job, error):
+        with self._lock:
+            entry = self._jobs[job.id]
+            if not self._holds(entry, job):
+                return 'lost'
+            entry['error'] = repr(error)
+            entry['state'] = 'failed' if job.attempts >= self.max_attempts else 'queued'
+            return 'retried' if entry['state'] == 'queued' else 'failed'
+
+    def counts(self):
+        with self._lock:
+            return _count(entry['state'] for entry in self._jobs.values())
+
+    def failures(self):
+        with self._lock:
+            return [(entry['job'], entry['error']) for entry in self._jobs.values() if entry['state'] == 'failed']
+
+    @staticmethod
+    def _holds(entry, job):
+        return (entry['state'] == 'leased' and entry['worker'] == job.worker
+            and entry['job'].attempts == job.attempts)
+
+
+class MemoryResultStore(IResultStore):
+    """An in-process :class:`IResultStore`, for workers in threads of one process and for tests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+
+    def write(self, key, frames):
+        with self._lock:
+            self._results[key] = frames
+
+    def read(self, key):
+        with self._lock:
+            return self._results.get(key)
+
+    def keys(self):
+        with self._lock:
+            return list(self._results)
+
+
+class SQLiteWorkQueue(IWorkQueue):
+    """An :class:`IWorkQueue` in a SQLite file, shared by worker processes.
+
+    Jobs are claimed in an immediate transaction, so each claim is atomic across processes. The
+    file must be on a file system with working locks, i.e. local to the host; a queue spanning
+    several hosts implements :class:`IWorkQueue` over a network service instead.
+
+    :param path: The database file. It is created if it does not exist.
+    :param max_attempts: The claims of a job before it is marked failed. Default: `3`.
+    """
+
+    _schema = """CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        stock TEXT NOT NULL,
+        params TEXT NOT NULL,
+        state TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        lease_until REAL NOT NULL DEFAULT 0,
+        worker TEXT,
+        error TEXT
+    )"""
+
+    def __init__(self, path, max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        with closing(self._connect()) as connection, connection:
+            connection.execute(self._schema)
+
+    def put(self, jobs):
+        rows = [(job.kind, job.stock, json.dumps(job.params, sort_keys=True)) for job in jobs]
+        with closing(self._connect()) as connection, connection:
+            connection.executemany("INSERT INTO jobs (kind, stock, params, state) VALUES (?, ?, ?, 'queued')", rows)
+        return len(rows)
+
+    def claim(self, worker, lease):
+        now = time.time()
+        with closing(self._connect()) as connection:
+            # Takes the write lock before reading, so no other process can claim the same job
+            connection.isolation_level = None
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.execute(
+                    """UPDATE jobs SET state = 'failed', error = 'Lease expired after ' || attempts || ' attempts'
+                    WHERE state = 'leased' AND lease_until <= ? AND attempts >= ?""", (now, self.max_attempts))
+                row = connection.execute(
+                    """SELECT id, kind, stock, params, attempts FROM jobs
+                    WHERE state = 'queued' OR (state = 'leased' AND lease_until <= ?)
+                    ORDER BY id LIMIT 1""", (now,)).fetchone()
+                if row is not None:
+                    connection.execute(
+                        "UPDATE jobs SET state = 'leased', attempts = attempts + 1, lease_until = ?, worker = ? WHERE id = ?",
+                        (now + lease, worker, row[0]))
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+        if row is None:
+            return None
+        return Job(row[1], row[2], json.loads(row[3]), row[0], row[4] + 1, worker)
+
+    def ack(self, job):
+        return self._update(job, 'done')
+
+    def fail(self, job, error):
+        state = 'failed' if job.attempts >= self.max_attempts else 'queued'
+        if not self._update(job, state, repr(error)):
+            return 'lost'
+        return 'retried' if state == 'queued' else 'failed'
+
+    def counts(self):
+        with closing(self._connect()) as connection:
+            rows = connection.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+        counts = _count([])
+        counts.update(rows)
+        return counts
+
+    def failures(self):
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT id, kind, stock, params, attempts, error FROM jobs WHERE state = 'failed' ORDER BY id").fetchall()
+        return [(Job(kind, stock, json.loads(params), id, attempts), error)
+            for id, kind, stock, params, attempts, error in rows]
+
+    def _update(self, job, state, error=None):
+        # Only the worker holding the lease of this attempt can update the job
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute(
+                """UPDATE jobs SET state = ?, error = COALESCE(?, error)
+                WHERE id = ? AND state = 'leased' AND worker = ? AND attempts = ?""",
+                (state, error, job.id, job.worker, job.attempts))
+        return cursor.rowcount == 1
+
+    def _connect(self):
+        # Waits for the locks of other processes
+        return sqlite3.connect(self.path, timeout=30)
+
+
+class SQLiteResultStore(IResultStore):
+    """An :class:`IResultStore` in a SQLite file, shared by worker processes.
+
+    Each result is the `to_dfs` frames of a job as JSON, replaced in one statement when the job
+    is fetched again. Only data is stored, so reading a result never runs code written by another
+    process, and values read back are the same as written, floats included.
+
+    :param path: The database file. It is created if it does not exist.
+    """
+
+    _schema = """CREATE TABLE IF NOT EXISTS results (
+        key TEXT PRIMARY KEY,
+        frames TEXT NOT NULL,
+        written REAL NOT NULL
+    )"""
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as connection, connection:
+            connection.execute(self._schema)
+
+    def write(self, key, frames):
+        with closing(self._connect()) as connection, connection:
+            connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?)',
+                (key, json.dumps({name: _frame_to_dict(frame) for name, frame in frames.items()}, default=str),
+                time.time()))
+
+    def read(self, key):
+        with closing(self._connect()) as connection:
+            row = connection.execute('SELECT frames FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return OrderedDict((name, _dict_to_frame(data)) for name, data in json.loads(row[0]).items())
+
+    def keys(self):
+        with closing(self._connect()) as connection:
+            return [row[0] for row in connection.execute('SELECT key FROM results ORDER BY key')]
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+
+class Coordinator:
+    """Enqueues fetch jobs for :class:`FetchWorker` objects and follows their progress.
+
+    :param queue: The :class:`IWorkQueue` shared with the workers.
+
+    :return: :class:`Coordinator` object
+    :rtype: `Coordinator`
+
+    Usage::
+
+      >>> from yahoofinance import CashFlow, Coordinator, HistoricalPrices
+      >>> from yahoofinance.distributed import SQLiteWorkQueue
+      >>> coordinator = Coordinator(SQLiteWorkQueue('jobs.db'))
+      >>> coordinator.enqueue(CashFlow, ['AAPL', 'MSFT'])
+      >>> coordinator.enqueue(HistoricalPrices, ['AAPL'], start_date='2018-01-01', end_date='2018-12-31')
+      >>> coordinator.counts()
+      {'queued': 3, 'leased': 0, 'done': 0, 'failed': 0}
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def enqueue(self, cls, stocks, **params):
+        """Adds a job per stock.
+
+        :param cls: A class of :data:`JOB_CLASSES`, e.g. :class:`CashFlow`.
+        :param stocks: The stock codes.
+        :param params: Other arguments of `cls`, e.g. `start_date` and `end_date` for
+            :class:`HistoricalPrices`. Dates are given as strings.
+
+        :return: The number of jobs added.
+        :rtype: `int`
+        """
+        if JOB_CLASSES.get(cls.__name__) is not cls:
+            raise ValueError("{} cannot be fetched by workers".format(cls.__name__))
+        try:
+            json.dumps(params)
+        except TypeError as e:
+            raise ValueError("Job parameters must be JSON serialisable: {}".format(e))
+        return self.queue.put(Job(cls.__name__, stock, params) for stock in stocks)
+
+    def counts(self):
+        """Counts the jobs by state, see :meth:`IWorkQueue.counts`."""
+        return self.queue.counts()
+
+    def failures(self):
+        """Lists the failed jobs, see :meth:`IWorkQueue.failures`."""
+        return self.queue.failures()
+
+
+class FetchWorker:
+    """Claims jobs from a queue, fetches them and writes their frames to a result store.
+
+    Any number of workers on any number of hosts can share a queue and store, e.g. to spread a
+    refresh over hosts with separate network egress. A job is acknowledged only after its result
+    is written, so a worker dying mid-job leaves the job to be claimed again when its lease ends.
+
+    :param queue: The :class:`IWorkQueue` to claim jobs from.
+    :param store: The :class:`IResultStore` to write results to.
+    :param locale: A `Locale` constant or an :class:`ITransport`, e.g. a
+        :class:`YahooFinanceClient`, to fetch with. Default: `Locale.US`.
+    :param name: Identifies the worker in the queue. Default: the host name and process id.
+    :param lease: Seconds a job is leased for before it can be claimed again. Default: `300`.
+
+    :return: :class:`FetchWorker` object
+    :rtype: `FetchWorker`
+
+    Usage::
+
+      >>> from yahoofinance import FetchWorker
+      >>> from yahoofinance.distributed import SQLiteResultStore, SQLiteWorkQueue
+      >>> worker = FetchWorker(SQLiteWorkQueue('jobs.db'), SQLiteResultStore('results.db'))
+      >>> worker.run()
+      {'done': 2, 'retried': 1, 'failed': 0, 'lost': 0}
+    """
+
+    def __init__(self, queue, store, locale=Locale.US, name=None, lease=300):
+        self.queue = queue
+        self.store = store
+        self.locale = locale
+        self.name = name or '{}:{}'.format(socket.gethostname(), os.getpid())
+        self.lease = lease
+
+    def run(self, max_jobs=None, poll=1.0):
+        """Processes jobs until none are queued or leased, or `max_jobs` have been processed.
+
+        While other workers hold leases, the worker waits `poll` seconds between claims, in case
+        their jobs come back.
+
+        :return: A dictionary with the jobs `done`, `retried`, `failed` and `lost` by this worker.
+        :rtype: `dict`
+        """
+        stats = {'done': 0, 'retried': 0, 'failed': 0, 'lost': 0}
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            job = self.queue.claim(self.name, self.lease)
+            if job is None:
+                counts = self.queue.counts()
+                if not counts['queued'] and not counts['leased']:
+                    break
+                time.sleep(poll)
+                continue
+
+            processed += 1
+            stats[self.process(job)] += 1
+        return stats
+
+    def process(self, job):
+        """Fetches a claimed job, writes its result and acknowledges it.
+
+        :return: `'done'`, `'retried'` if the job went back to the queue, `'failed'`, or `'lost'`
+            if the lease ran out and another worker claimed the job meanwhile.
+        :rtype: `str`
+        """
+        try:
+            self.store.write(job.key, job.frames(self.locale))
+        except Exception as e:
+            return self.queue.fail(job, e)
+        return 'done' if self.queue.ack(job) else 'lost'
+
+
+def _available(state, lease_until, now):
+    return state == 'queued' or (state == 'leased' and lease_until <= now)
+
+
+def _frame_to_dict(frame):
+    return {
+        'index': frame.index.tolist(),
+        'index_names': list(frame.index.names),
+        'index_dtype': str(frame.index.dtype),
+        'columns': frame.columns.tolist(),
+        'columns_name': frame.columns.name,
+        'dtypes': [str(dtype) for dtype in frame.dtypes],
+        'values': [frame.iloc[:, i].tolist() for i in range(frame.shape[1])],
+    }
+
+
+def _dict_to_frame(data):
+    if len(data['index_names']) > 1:
+        index = pd.MultiIndex.from_tuples([tuple(x) for x in data['index']], names=data['index_names'])
+    else:
+        index = pd.Index(data['index'], name=data['index_names'][0], dtype=data['index_dtype'])
+    if not data['values']:
+        return pd.DataFrame(index=index, columns=pd.Index(data['columns'], name=data['columns_name']))
+    frame = pd.concat(
+        [pd.Series(values, index=index, dtype=dtype) for values, dtype in zip(data['values'], data['dtypes'])],
+        axis=1)
+    frame.columns = pd.Index(data['columns'], name=data['columns_name'])
+    return frame
+
+
+def _expired(attempts):
+    return 'Lease expired after {} attempts'.format(attempts)
+
+
+def _count(states):
+    counts = {'queued': 0, 'leased': 0, 'done': 0, 'failed': 0}
+    for state in states:
+        counts[state] += 1
+    return counts
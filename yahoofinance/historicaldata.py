@@ -4,12 +4,22 @@ import json
 import csv
 import requests
 import re
+import gzip
+import numpy as np
 import pandas as pd
-from io import StringIO
-from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from io import BytesIO, StringIO
+from datetime import date, datetime, timedelta
+
+from .dataconfigs import DataFormat, Locale, DataEvent, DataFrequency, DataSource
+from .interfaces import IYahooData, ITransport, _locale_get, _locale_request, _lean_frame, _check_engine, pl
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
-from .dataconfigs import DataFormat, Locale, DataEvent, DataFrequency
-from .interfaces import IYahooData
 
 class HistoricalPrices(IYahooData):
     """Retrieves historical data from Yahoo Finance.
@@ -21,7 +31,22 @@ class HistoricalPrices(IYahooData):
         the object passed in (string) will be parsed to the format string. Default: `%Y-%m-%d`.
     :param event: A `DataEvent` constant to determine what event to query for. Default: `DataEvent.HISTORICAL_PRICES`.
     :param frequency: A `DataFrequency` constant to determine the interval between records. Default: `DataFrequency.DAILY`.
-    :param locale: A `Locale` constant to determine which domain to query from. Default: `Locale.US`.
+    :param locale: A `Locale` constant to determine which domain to query from, or an `ITransport`
+        such as a `LocalePool` to send the requests through. Default: `Locale.US`.
+    :param source: A `DataSource` constant to determine which endpoint to query. The chart endpoint
+        supports intraday frequencies and does not need a cookie and crumb pair.
+        Default: `DataSource.DOWNLOAD`.
+    :param store: A :class:`PriceStore` to read the data from. Only the parts of the date range
+        that are not stored yet are downloaded and appended to the store. Weekly, monthly and
+        quarterly prices are resampled from stored daily prices when they cover the date range,
+        without any request. Default: `None`.
+    :param compression: `'gzip'` or `'zstd'` to keep the data compressed in memory, whether it
+        was downloaded or read from `store`. It is decompressed each time it is used. `'zstd'` requires the `zstandard` package.
+        Default: `None`.
+    :param chunk_days: Splits date ranges longer than this many days into chunks which are
+        downloaded concurrently over one cookie and crumb pair, then merged in date order.
+        Default: `None`, one request per date range.
+    :param download_workers: The number of chunks downloaded at once. Default: `4`.
 
     :return: :class:`HistoricalPrices` object
     :rtype: `HistoricalPrices`
@@ -36,38 +61,286 @@ class HistoricalPrices(IYahooData):
     """
     _min_date = date(1970,1,1)
 
+    _download_url = 'https://query1.finance.yahoo.com/v7/finance/download/{i}'
+    _chart_url = 'https://query1.finance.yahoo.com/v8/finance/chart/{i}'
+
     def __init__(
             self, instrument, start_date, end_date, date_format_string="%Y-%m-%d",
-            event=DataEvent.HISTORICAL_PRICES, frequency=DataFrequency.DAILY, locale=Locale.US):
+            event=DataEvent.HISTORICAL_PRICES, frequency=DataFrequency.DAILY, locale=Locale.US,
+            source=DataSource.DOWNLOAD, store=None, compression=None, chunk_days=None, download_workers=4):
+
+        start_date = _to_date(start_date, date_format_string)
+        end_date = _to_date(end_date, date_format_string)
+
+        self.instrument = instrument
+        self.start_date = start_date
+        self.end_date = end_date
+        self.event = event
+        self.frequency = frequency
+        self.locale = locale
+        self.source = source
+        self.compression = compression
+        self.chunk_days = chunk_days
+        self.download_workers = download_workers
+
+        # The CSV text, the decoded columns or the compressed CSV text is held,
+        # the others are derived on demand
+        self._text = None
+        self._columns = None
+        self._compressed = None
+
+        if source != DataSource.CHART and frequency not in DataFrequency._DOWNLOADABLE:
+            raise ValueError("Frequency {} requires DataSource.CHART".format(frequency))
+        if compression is not None and compression not in _codecs():
+            raise ValueError("Compression {} is not available".format(compression))
+        if chunk_days is not None and chunk_days < 1:
+            raise ValueError("chunk_days must be at least 1, got {}".format(chunk_days))
+
+        if store is None:
+            self._load_range(start_date, end_date)
+        else:
+            self._load_store(store)
+        if compression is not None and self._compressed is None:
+            self._compressed = _compress(compression, self.prices.encode())
+            self._text = None
+            self._columns = None
+
+    def _load_store(self, store):
+        instrument, start_date, end_date, frequency = self.instrument, self.start_date, self.end_date, self.frequency
+        event = self._dataset_event()
+        if (frequency in _resample_units and event == DataEvent.HISTORICAL_PRICES
+                and store.covers(instrument, start_date, end_date, event, DataFrequency.DAILY)):
+            self._columns = _resample(
+                store.read(instrument, start_date, end_date, event, DataFrequency.DAILY), frequency)
+            return
 
-        if not isinstance(start_date, date):
-            start_date = datetime.strptime(start_date, date_format_string).date()
+        for gap_start, gap_end in _missing_ranges(
+                store.ranges(instrument, event, frequency), start_date, end_date):
+            store.write(self._fetch_part(gap_start, gap_end))
+        self._columns = self._rebuild(store.read(instrument, start_date, end_date, event, frequency))
 
-        if not isinstance(end_date, date):
-            end_date = datetime.strptime(end_date, date_format_string).date()
+    def between(self, start_date, end_date, date_format_string="%Y-%m-%d"):
+        """Selects a date range of the data set.
+
+        Dates already held are found by binary search over the sorted dates. Only the
+        parts of the range outside of `start_date` and `end_date` of this object are downloaded.
+
+        :param start_date: The start date for the range (inclusive).
+        :param end_date: The end date for the range (inclusive).
+        :param date_format_string: If `start_date` or `end_date` is not a :class:`DateTime` object,
+            the object passed in (string) will be parsed to the format string. Default: `%Y-%m-%d`.
+
+        :return: A new object of the same type holding the date range.
+        :rtype: `HistoricalPrices`
+        """
+        start_date = _to_date(start_date, date_format_string)
+        end_date = _to_date(end_date, date_format_string)
+
+        columns = self.columns
+        parts = [
+            self._fetch_part(gap_start, gap_end).columns
+            for gap_start, gap_end in _missing_ranges([(self.start_date, self.end_date)], start_date, end_date)
+        ]
+        if parts:
+            columns = _unique_dates({
+                name: np.concatenate([values] + [part[name] for part in parts])
+                for name, values in columns.items()
+            })
+
+        return self._derive(start_date, end_date, _slice_dates(columns, start_date, end_date))
+
+    def resample(self, frequency):
+        """Builds weekly, monthly or quarterly prices from daily prices without any request.
+
+        Bars follow Yahoo's boundaries: weeks start on Monday, months on the 1st and quarters in
+        January, April, July and October, and each bar is dated at its start. `Open` is the first
+        value of the bar, `High` the highest, `Low` the lowest, `Close` and `Adj Close` the last
+        and `Volume` the sum. Missing values are skipped.
+
+        :param frequency: `DataFrequency.WEEKLY`, `DataFrequency.MONTHLY` or `DataFrequency.QUARTERLY`.
+
+        :return: A new object holding the resampled prices.
+        :rtype: `HistoricalPrices`
+        """
+        if frequency not in _resample_units:
+            raise ValueError("Cannot resample to frequency {}".format(frequency))
+        if self.frequency != DataFrequency.DAILY or self._dataset_event() != DataEvent.HISTORICAL_PRICES:
+            raise ValueError("Only daily prices can be resampled")
 
-        start_period = int((start_date - self._min_date).total_seconds())
-        end_period = int((end_date - self._min_date).total_seconds())
+        derived = self._derive(self.start_date, self.end_date)
+        derived.frequency = frequency
+        derived._columns = _resample(self.columns, frequency)
+        return derived
 
-        cookie, crumb = self._find_cookie_crumb_pair(locale)
+    def to_polars(self):
+        """Generates the data set as a :class:`polars.DataFrame` with a `Date` column.
+
+        Downloaded CSV text is parsed by the multithreaded Polars CSV reader, other data is
+        built from the decoded columns. Missing values are null. Requires the `polars` package.
+
+        :rtype: `polars.DataFrame`
+        """
+        _check_engine('polars')
+        if self._columns is None and self._compressed is None:
+            return pl.read_csv(self.prices.encode(), null_values='null', try_parse_dates=True)
+        return _columns_to_polars(self.columns, self._intraday)
+
+    @classmethod
+    def _from_columns(cls, instrument, start_date, end_date, columns=None, event=DataEvent.HISTORICAL_PRICES,
+            frequency=DataFrequency.DAILY, locale=Locale.US, source=DataSource.DOWNLOAD, compression=None,
+            chunk_days=None, download_workers=4):
+        """Creates an object holding already decoded columns, or nothing yet, without downloading."""
+        prices = object.__new__(cls)
+        prices.instrument = instrument
+        prices.start_date = start_date
+        prices.end_date = end_date
+        prices.event = event
+        prices.frequency = frequency
+        prices.locale = locale
+        prices.source = source
+        prices.compression = compression
+        prices.chunk_days = chunk_days
+        prices.download_workers = download_workers
+        prices._text = None
+        prices._compressed = None
+        prices._columns = None if columns is None else prices._rebuild(columns)
+        return prices
+
+    def _derive(self, start_date, end_date, columns=None):
+        """Creates an object with the same query settings over another date range."""
+        return self._from_columns(
+            self.instrument, start_date, end_date, columns, self.event, self.frequency, self.locale,
+            self.source, self.compression, self.chunk_days, self.download_workers)
+
+    def _fetch_part(self, start_date, end_date):
+        part = self._derive(start_date, end_date)
+        part._load_range(start_date, end_date)
+        return part
+
+    def _load_range(self, start_date, end_date):
+        chunks = _split_range(start_date, end_date, self.chunk_days)
+        if len(chunks) == 1:
+            self._load(self._period(start_date), self._period(end_date))
+            return
+
+        cookie_crumb = None if self.source == DataSource.CHART else self._find_cookie_crumb_pair(self.locale)
+        parts = [self._derive(lo, hi) for lo, hi in chunks]
+        with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+            list(executor.map(
+                lambda part: part._load(self._period(part.start_date), self._period(part.end_date), cookie_crumb),
+                parts))
+
+        # Neighbouring chunks share their boundary date, the duplicates are dropped here
+        columns = [part.columns for part in parts]
+        self._columns = self._rebuild(_unique_dates({
+            name: np.concatenate([part[name] for part in columns]) for name in columns[0]
+        }))
+
+    def _rebuild(self, columns):
+        """Recomputes any columns that depend on the whole date range."""
+        return columns
+
+    def _dataset_event(self):
+        return self.event
+
+    def _period(self, value):
+        return int((value - self._min_date).total_seconds())
+
+    def _load(self, start_period, end_period, cookie_crumb=None):
+        if self.source == DataSource.CHART:
+            payload = self._fetch_chart(start_period, end_period, _chart_events.get(self.event))
+            self._columns = _decode_chart(payload, self.event, self._intraday)
+        elif self.compression is not None:
+            cookie, crumb = cookie_crumb or self._find_cookie_crumb_pair(self.locale)
+            r = self._download(start_period, end_period, cookie, crumb, self.event, self.compression)
+            self._compressed = _compressed_content(r, self.compression)
+        else:
+            cookie, crumb = cookie_crumb or self._find_cookie_crumb_pair(self.locale)
+            self._text = self._fetch_download(start_period, end_period, cookie, crumb, self.event)
+
+    @property
+    def _intraday(self):
+        return self.frequency in DataFrequency._INTRADAY
+
+    @property
+    def prices(self):
+        """The data set as CSV text, in the same layout as the Yahoo download endpoint."""
+        if self._compressed is not None:
+            return _decompress(self.compression, self._compressed).decode()
+        if self._text is None:
+            self._text = _columns_to_csv(self._columns, self._intraday)
+        return self._text
+
+    @prices.setter
+    def prices(self, text):
+        self._text = text
+        self._columns = None
+        self._compressed = None
+
+    @property
+    def columns(self):
+        """The data set as a dictionary of :class:`numpy.ndarray` columns, sorted by `Date`.
+
+        Dates are `datetime64[s]` values in the exchange's local time.
+
+        When the data is held compressed (see `compression`), the columns are not kept: every
+        access decompresses and parses the whole CSV text again. Keep the returned dictionary
+        rather than reading this property repeatedly.
+        """
+        if self._columns is not None:
+            return self._columns
 
-        url = 'https://query1.finance.yahoo.com/v7/finance/download/{i}'
-        r= requests.get(url.format(i=instrument),
+        columns = _csv_to_columns(self.prices)
+        # Compressed data sets are decoded each time, so they stay small while held
+        if self._compressed is None:
+            self._columns = columns
+        return columns
+
+    def _fetch_download(self, start_period, end_period, cookie, crumb, event):
+        return self._download(start_period, end_period, cookie, crumb, event).text
+
+    def _download(self, start_period, end_period, cookie, crumb, event, compression=None):
+        kwargs = {}
+        if compression is not None:
+            # Ask for the preferred encoding so the body can be kept without recompressing it
+            encodings = [compression] + [x for x in ('gzip', 'deflate') if x != compression]
+            kwargs['headers'] = {'Accept-Encoding': ', '.join(encodings)}
+            kwargs['stream'] = True
+
+        return _locale_request(self.locale, self._download_url.format(i=self.instrument),
             cookies={'B': cookie},
             params={
                 "period1": start_period,
                 "period2": end_period,
-                "interval": frequency,
+                "interval": self.frequency,
                 "event": event,
                 "crumb": crumb
-            }
+            },
+            **kwargs
         )
 
-        self.prices = r.text
+    def _fetch_chart(self, start_period, end_period, events=None):
+        params = {
+            "period1": start_period,
+            "period2": end_period,
+            "interval": self.frequency,
+        }
+        if events:
+            params["events"] = events
+
+        r = _locale_request(self.locale, self._chart_url.format(i=self.instrument), params=params)
+        return r.json()
 
     def _find_cookie_crumb_pair(self, locale):
-        url = Locale.locale_url(locale) + '/AAPL/history'
-        res = requests.get(url)
+        if isinstance(locale, ITransport):
+            # One pair serves every request sent through the transport
+            return locale.cached(('cookie_crumb',), lambda: self._request_cookie_crumb_pair(locale))
+        return self._request_cookie_crumb_pair(locale)
+
+    @staticmethod
+    def _request_cookie_crumb_pair(locale):
+        base_url = '' if isinstance(locale, ITransport) else Locale.locale_url(locale)
+        res = _locale_get(locale, base_url + '/AAPL/history')
         try:
             cookie = res.cookies['B']
         except KeyError:
@@ -86,7 +359,7 @@ class HistoricalPrices(IYahooData):
 
         return cookie, crumb
 
-    def to_csv(self, path=None, sep=',', data_format=DataFormat.RAW, csv_dialect='excel'):
+    def to_csv(self, path=None, sep=',', data_format=DataFormat.RAW, csv_dialect='excel', compression=None):
         """Generates a CSV file.
 
         :param path: The path to a file location. If it is `None`, this method returns the
@@ -95,30 +368,67 @@ class HistoricalPrices(IYahooData):
         :param data_format: A :class:`DataFormat` constant to determine how the data is
             exported. NOT USED
         :param csv_dialect: The dialect to write the CSV file. See Python in-built :class:`csv`.
+        :param compression: `'gzip'` or `'zstd'` to compress the output. If it is the same as
+            the compression the data is held in, the compressed data is written as is.
+            Default: `None`.
 
-        :return: `None` or :class:`string`
-        :rtype: `None` or `string`
+        :return: `None`, :class:`string` or :class:`bytes` when compressed
+        :rtype: `None`, `string` or `bytes`
 
         """
+        if compression is not None:
+            held = compression == self.compression and self._compressed is not None
+            if path is None:
+                return self._compressed if held else _compress(compression, self.prices.encode())
+            if held:
+                with open(path, 'wb') as file_handle:
+                    file_handle.write(self._compressed)
+                return
+            # Compresses as it writes, without the whole CSV text in memory
+            with _open_compressed(compression, path) as file_handle:
+                for chunk in self._csv_chunks():
+                    file_handle.write(chunk)
+            return
+
         csv_data = self.prices
         # HACK: To reverse the new line encoding provided. Find a better way to handle this
         if csv_dialect == 'excel':
             csv_data.replace('\n', '\r\n')
 
         if path is None:
-            return self.prices
+            return csv_data
 
         with open(path, 'w') as file_handle:
             file_handle.write(csv_data)
 
-    def to_dfs(self, data_format=DataFormat.RAW):
+    def _csv_chunks(self):
+        """Yields the CSV text as encoded chunks, decompressing or rendering it as it goes."""
+        if self._compressed is not None:
+            with _open_decompressed(self.compression, self._compressed) as file_handle:
+                yield from iter(lambda: file_handle.read(_WRITE_CHUNK), b'')
+        elif self._text is not None:
+            for i in range(0, len(self._text), _WRITE_CHUNK):
+                yield self._text[i:i + _WRITE_CHUNK].encode()
+        else:
+            for block in _csv_blocks(self._columns, self._intraday):
+                yield block.encode()
+
+    def to_dfs(self, data_format=DataFormat.RAW, float_dtype=None, dtype_backend=None, parse_dates=False,
+            engine='pandas'):
         """Generates a dictionary containing :class:`pandas.DataFrame`.
 
         :param data_format: A :class:`DataFormat` constant to determine how the data is exported.
             NOT USED
+        :param float_dtype: The dtype of the price columns, e.g. `'float32'`. `Volume` is not
+            changed. Default: `None`.
+        :param dtype_backend: `'numpy_nullable'` or `'pyarrow'` to use pandas nullable dtypes,
+            which makes `Volume` a nullable integer. Default: `None`.
+        :param parse_dates: Index the rows by `datetime64` dates instead of strings. Default: `False`.
+        :param engine: `'pandas'` or `'polars'`, see :meth:`to_polars`. The dtype options are
+            only used by pandas. Default: `'pandas'`.
 
-        :return: :class:`pandas.DataFrame`
-        :rtype: `pandas.DataFrame`
+        :return: :class:`pandas.DataFrame` or :class:`polars.DataFrame`
+        :rtype: `pandas.DataFrame` or `polars.DataFrame`
 
         Dictionary keys ::
 
@@ -126,4 +436,477 @@ class HistoricalPrices(IYahooData):
         """
 
         # This is not affected by the data format
-        return {'Historical Prices': pd.read_csv(StringIO(self.prices), index_col=['Date'])}
+        if _check_engine(engine) == 'polars':
+            return {'Historical Prices': self.to_polars()}
+        if float_dtype is not None or dtype_backend is not None or parse_dates:
+            df = _columns_to_frame(self.columns, self._intraday, parse_dates)
+            return {'Historical Prices': _lean_frame(df, float_dtype, dtype_backend, exclude=('Volume',))}
+        if self._columns is None:
+            return {'Historical Prices': pd.read_csv(StringIO(self.prices), index_col=['Date'])}
+        return {'Historical Prices': _columns_to_frame(self._columns, self._intraday)}
+
+
+class HistoricalEvents(HistoricalPrices):
+    """Retrieves historical prices, dividends and stock splits from Yahoo Finance in one call.
+
+    The three data sets are fetched concurrently over a single cookie and crumb pair, or with a
+    single request when using `DataSource.CHART`, and are aligned on one date index.
+    Dates without a dividend hold `0` under `Dividends` and dates without a split hold `1`
+    under `Stock Splits`.
+
+    Two adjustment factors are added, each is multiplied with a price to adjust it for all
+    events after that date:
+
+    * `Split Factor` for stock splits.
+    * `Dividend Factor` for dividends, using the previous close on each ex-dividend date.
+
+    :param instrument: The a stock instrument code to query.
+    :param start_date: The start date for the query (inclusive).
+    :param end_date: The end date for the query (inclusive).
+    :param date_format_string: If `start_date` or `end_date` is not a :class:`DateTime` object,
+        the object passed in (string) will be parsed to the format string. Default: `%Y-%m-%d`.
+    :param frequency: A `DataFrequency` constant to determine the interval between records. Default: `DataFrequency.DAILY`.
+    :param locale: A `Locale` constant to determine which domain to query from. Default: `Locale.US`.
+    :param source: A `DataSource` constant to determine which endpoint to query. Default: `DataSource.DOWNLOAD`.
+    :param store: A :class:`PriceStore` to read the data from when it covers the date range. Default: `None`.
+    :param compression: `'gzip'` or `'zstd'` to keep the data compressed in memory. Default: `None`.
+    :param chunk_days: Splits long date ranges into chunks downloaded concurrently. Default: `None`.
+    :param download_workers: The number of chunks downloaded at once. Default: `4`.
+
+    :return: :class:`HistoricalEvents` object
+    :rtype: `HistoricalEvents`
+
+    Usage::
+
+      >>> from yahoofinance import HistoricalEvents
+      >>> req = HistoricalEvents('AAPL', '2018-01-01', '2018-12-31')
+      Object<HistoricalEvents>
+    """
+
+    _events = (DataEvent.HISTORICAL_PRICES, DataEvent.DIVIDENDS, DataEvent.SPLITS)
+
+    def __init__(
+            self, instrument, start_date, end_date, date_format_string="%Y-%m-%d",
+            frequency=DataFrequency.DAILY, locale=Locale.US, source=DataSource.DOWNLOAD, store=None,
+            compression=None, chunk_days=None, download_workers=4):
+        super().__init__(
+            instrument, start_date, end_date, date_format_string,
+            DataEvent.HISTORICAL_PRICES, frequency, locale, source, store, compression,
+            chunk_days, download_workers)
+
+    def _dataset_event(self):
+        return 'events'
+
+    def _rebuild(self, columns):
+        columns = dict(columns)
+        columns['Split Factor'], columns['Dividend Factor'] = _adjustment_factors(
+            columns['Close'], columns['Dividends'], columns['Stock Splits'])
+        return columns
+
+    def _load(self, start_period, end_period, cookie_crumb=None):
+        if self.source == DataSource.CHART:
+            payload = self._fetch_chart(start_period, end_period, 'div,split')
+            data_sets = [_decode_chart(payload, event, self._intraday) for event in self._events]
+        else:
+            cookie, crumb = cookie_crumb or self._find_cookie_crumb_pair(self.locale)
+            with ThreadPoolExecutor(max_workers=len(self._events)) as executor:
+                texts = list(executor.map(
+                    lambda event: self._fetch_download(start_period, end_period, cookie, crumb, event),
+                    self._events))
+            data_sets = [_csv_to_columns(text) for text in texts]
+
+        self._columns = _align_events(*data_sets)
+
+    def to_dfs(self, data_format=DataFormat.RAW, float_dtype=None, dtype_backend=None, parse_dates=False,
+            engine='pandas'):
+        """Generates a dictionary containing :class:`pandas.DataFrame`.
+
+        :param data_format: A :class:`DataFormat` constant to determine how the data is exported.
+            NOT USED
+        :param float_dtype: The dtype of every column but `Volume`, e.g. `'float32'`. Default: `None`.
+        :param dtype_backend: `'numpy_nullable'` or `'pyarrow'` to use pandas nullable dtypes.
+            Default: `None`.
+        :param parse_dates: Index the rows by `datetime64` dates instead of strings. Default: `False`.
+        :param engine: `'pandas'` or `'polars'`, see :meth:`to_polars`. Default: `'pandas'`.
+
+        :return: :class:`pandas.DataFrame` or :class:`polars.DataFrame`
+        :rtype: `pandas.DataFrame` or `polars.DataFrame`
+
+        Dictionary keys ::
+
+            Historical Events
+        """
+        if _check_engine(engine) == 'polars':
+            return {'Historical Events': self.to_polars()}
+        columns = self.columns
+        if parse_dates:
+            index = pd.DatetimeIndex(columns['Date'], name='Date')
+        else:
+            index = pd.Index(_format_dates(columns['Date'], self._intraday), name='Date')
+        data = {k: v for k, v in columns.items() if k != 'Date'}
+        df = pd.DataFrame(data, index=index, columns=list(data))
+        return {'Historical Events': _lean_frame(df, float_dtype, dtype_backend, exclude=('Volume',))}
+
+
+# Maps a DataEvent to the name used by the chart endpoint
+_chart_events = {
+    DataEvent.DIVIDENDS: 'div',
+    DataEvent.SPLITS: 'split',
+}
+
+_quote_fields = (
+    ('Open', 'open'),
+    ('High', 'high'),
+    ('Low', 'low'),
+    ('Close', 'close'),
+)
+
+
+def _codecs():
+    codecs = {
+        'gzip': (
+            lambda data: gzip.compress(data, compresslevel=6),
+            gzip.decompress,
+            lambda path: gzip.open(path, 'wb', compresslevel=6),
+            lambda data: gzip.GzipFile(fileobj=BytesIO(data))),
+    }
+    if zstandard is not None:
+        codecs['zstd'] = (
+            lambda data: zstandard.ZstdCompressor().compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data),
+            lambda path: zstandard.ZstdCompressor().stream_writer(open(path, 'wb')),
+            lambda data: zstandard.ZstdDecompressor().stream_reader(BytesIO(data)))
+    return codecs
+
+
+# Characters of CSV text encoded and compressed at a time when writing a file
+_WRITE_CHUNK = 1 << 20
+
+# Rows rendered at a time when writing decoded columns as CSV text
+_WRITE_ROWS = 1 << 14
+
+
+def _compress(compression, data):
+    return _codecs()[compression][0](data)
+
+
+def _decompress(compression, data):
+    return _codecs()[compression][1](data)
+
+
+def _open_compressed(compression, path):
+    """Opens a binary file which compresses what is written to it."""
+    return _codecs()[compression][2](path)
+
+
+def _open_decompressed(compression, data):
+    """Opens compressed bytes as a binary file which decompresses as it is read."""
+    return _codecs()[compression][3](data)
+
+
+def _compressed_content(response, compression):
+    """The response body compressed with `compression`, reusing the transfer encoding if it matches."""
+    headers = getattr(response, 'headers', {})
+    if headers.get('Content-Encoding', '').strip().lower() == compression:
+        return response.raw.read(decode_content=False)
+    return _compress(compression, response.content)
+
+
+def _decode_chart(payload, event, intraday):
+    """Decodes a chart endpoint response into :class:`numpy.ndarray` columns.
+
+    The OHLCV arrays are converted in one step each, `null` entries become `NaN`.
+    """
+    chart = payload['chart']
+    if chart.get('error'):
+        raise ValueError(chart['error'].get('description', 'Chart request failed'))
+
+    result = chart['result'][0]
+    offset = result['meta'].get('gmtoffset', 0)
+
+    if event == DataEvent.HISTORICAL_PRICES:
+        stamps = np.asarray(result.get('timestamp', ()), dtype=np.int64)
+        quote = result['indicators']['quote'][0]
+        columns = {'Date': _to_dates(stamps, offset, intraday)}
+        for name, key in _quote_fields:
+            columns[name] = np.asarray(quote.get(key) or (), dtype=np.float64)
+        adjclose = result['indicators'].get('adjclose')
+        if adjclose:
+            columns['Adj Close'] = np.asarray(adjclose[0]['adjclose'], dtype=np.float64)
+        columns['Volume'] = np.asarray(quote.get('volume') or (), dtype=np.float64)
+        return columns
+
+    # Events are sparse, so these are small
+    if event == DataEvent.DIVIDENDS:
+        records = sorted(result.get('events', {}).get('dividends', {}).values(), key=lambda x: x['date'])
+        values = np.array([x['amount'] for x in records], dtype=np.float64)
+        name = 'Dividends'
+    else:
+        records = sorted(result.get('events', {}).get('splits', {}).values(), key=lambda x: x['date'])
+        values = np.array([x['numerator'] / x['denominator'] for x in records], dtype=np.float64)
+        name = 'Stock Splits'
+
+    stamps = np.array([x['date'] for x in records], dtype=np.int64)
+    return {'Date': _to_dates(stamps, offset, intraday), name: values}
+
+
+def _later_product(values):
+    """The product of all values after each position, excluding the position itself."""
+    product = np.ones_like(values)
+    product[:-1] = np.cumprod(values[::-1])[::-1][1:]
+    return product
+
+
+def _adjustment_factors(close, dividends, splits):
+    split_factor = 1.0 / _later_product(splits)
+
+    # Forward fill the close so events on non-trading days use the last known close
+    last_valid = np.maximum.accumulate(np.where(np.isnan(close), 0, np.arange(len(close))))
+    previous_close = np.empty_like(close)
+    previous_close[:1] = np.nan
+    previous_close[1:] = close[last_valid][:-1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        multiplier = np.where(
+            (dividends > 0) & (previous_close > 0), 1.0 - dividends / previous_close, 1.0)
+    dividend_factor = _later_product(multiplier)
+
+    return split_factor, dividend_factor
+
+
+def _align_events(prices, dividends, splits):
+    """Aligns price, dividend and split columns on the union of their dates."""
+    dates = np.union1d(np.union1d(prices['Date'], dividends['Date']), splits['Date'])
+    columns = {'Date': dates}
+
+    rows = np.searchsorted(dates, prices['Date'])
+    for name, values in prices.items():
+        if name != 'Date':
+            columns[name] = np.full(len(dates), np.nan)
+            columns[name][rows] = values
+
+    amounts = np.zeros(len(dates))
+    np.add.at(amounts, np.searchsorted(dates, dividends['Date']), dividends['Dividends'])
+    ratios = np.ones(len(dates))
+    np.multiply.at(ratios, np.searchsorted(dates, splits['Date']), splits['Stock Splits'])
+    columns['Dividends'] = amounts
+    columns['Stock Splits'] = ratios
+
+    columns['Split Factor'], columns['Dividend Factor'] = _adjustment_factors(
+        columns['Close'], amounts, ratios)
+    return columns
+
+
+def _to_date(value, date_format_string):
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, date_format_string).date()
+
+
+def _missing_ranges(ranges, start_date, end_date):
+    """Lists the parts of `start_date` to `end_date` not within the sorted `ranges`."""
+    missing = []
+    for lo, hi in ranges:
+        if hi < start_date:
+            continue
+        if lo > end_date:
+            break
+        if lo > start_date:
+            missing.append((start_date, lo - timedelta(days=1)))
+        start_date = hi + timedelta(days=1)
+    if start_date <= end_date:
+        missing.append((start_date, end_date))
+    return missing
+
+
+def _split_range(start_date, end_date, chunk_days):
+    """Splits a date range into chunks of `chunk_days`, each sharing its first date with the
+    last date of the chunk before, so no date is lost between two requests."""
+    if chunk_days is None:
+        return [(start_date, end_date)]
+    chunks = []
+    lo = start_date
+    while True:
+        hi = min(lo + timedelta(days=chunk_days), end_date)
+        chunks.append((lo, hi))
+        if hi >= end_date:
+            return chunks
+        lo = hi
+
+
+def _slice_dates(columns, start_date, end_date):
+    """Selects a date range from sorted columns with a binary search."""
+    dates = columns['Date']
+    lo = np.searchsorted(dates, np.datetime64(start_date, 's'), 'left')
+    hi = np.searchsorted(dates, np.datetime64(end_date + timedelta(days=1), 's'), 'left')
+    return {name: values[lo:hi] for name, values in columns.items()}
+
+
+def _unique_dates(columns):
+    """Sorts columns by date, keeping the last row of each date."""
+    stamps = columns['Date'].view(np.int64)
+    # Reverse first so the stable sort puts the last row first within each date
+    order = len(stamps) - 1 - np.argsort(stamps[::-1], kind='mergesort')
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = stamps[order][1:] != stamps[order][:-1]
+    order = order[keep]
+    return {name: np.asarray(values)[order] for name, values in columns.items()}
+
+
+# The numpy unit each bar is truncated to and the number of units in a bar
+_resample_units = {
+    DataFrequency.WEEKLY: ('W', 1),
+    DataFrequency.MONTHLY: ('M', 1),
+    DataFrequency.QUARTERLY: ('M', 3),
+}
+
+_resample_reducers = {
+    'Open': 'first',
+    'High': np.fmax,
+    'Low': np.fmin,
+    'Close': 'last',
+    'Adj Close': 'last',
+    'Volume': np.add,
+}
+
+
+def _bar_starts(dates, frequency):
+    """The start date of the bar each date belongs to."""
+    unit, size = _resample_units[frequency]
+    days = dates.astype('datetime64[D]')
+    if unit == 'W':
+        # 1970-01-01 was a Thursday, so Mondays are 3 days after a multiple of 7
+        return days - (days.view(np.int64) + 3) % 7
+    months = days.astype('datetime64[M]').view(np.int64)
+    return (months - months % size).astype('datetime64[M]').astype('datetime64[D]')
+
+
+def _resample(columns, frequency):
+    """Aggregates sorted daily columns into bars, with one `reduceat` per column."""
+    starts = _bar_starts(columns['Date'], frequency)
+    if not len(starts):
+        return {name: values[:0] for name, values in columns.items()}
+
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    rows = np.arange(len(starts))
+
+    resampled = {'Date': starts[first].astype('datetime64[s]')}
+    for name, values in columns.items():
+        if name == 'Date':
+            continue
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        reducer = _resample_reducers.get(name, 'last')
+        if reducer in ('first', 'last'):
+            # The first or last row of each bar with a value, out of range when there is none
+            if reducer == 'first':
+                picked = np.minimum.reduceat(np.where(valid, rows, len(rows)), first)
+            else:
+                picked = np.maximum.reduceat(np.where(valid, rows, -1), first)
+            found = (picked >= 0) & (picked < len(rows))
+            resampled[name] = np.where(found, values[np.clip(picked, 0, len(rows) - 1)], np.nan)
+        elif reducer is np.add:
+            resampled[name] = np.add.reduceat(np.where(np.isnan(values), 0.0, values), first)
+        else:
+            resampled[name] = reducer.reduceat(values, first)
+    return resampled
+
+
+def _to_dates(stamps, offset, intraday):
+    local = (stamps + offset).astype('datetime64[s]')
+    if intraday:
+        return local
+    return local.astype('datetime64[D]').astype('datetime64[s]')
+
+
+def _parse_split(text):
+    numerator, denominator = re.split(r'[/:]', text)
+    return float(numerator) / float(denominator)
+
+
+def _csv_to_columns(text):
+    """Parses CSV text from the download endpoint into :class:`numpy.ndarray` columns."""
+    frame = pd.read_csv(StringIO(text), na_values=['null'])
+    frame['Date'] = pd.to_datetime(frame['Date'])
+    frame = frame.sort_values('Date', kind='mergesort')
+
+    columns = {'Date': frame['Date'].values.astype('datetime64[s]')}
+    for name in frame.columns[1:]:
+        if name == 'Stock Splits':
+            columns[name] = np.array([_parse_split(x) for x in frame[name]], dtype=np.float64)
+        else:
+            columns[name] = frame[name].values.astype(np.float64)
+    return columns
+
+
+def _format_column(values, fmt):
+    missing = np.isnan(values)
+    text = np.char.mod(fmt, np.where(missing, 0, values))
+    return np.where(missing, 'null', text)
+
+
+def _format_dates(values, intraday):
+    if intraday:
+        return np.char.replace(np.datetime_as_string(values, unit='s'), 'T', ' ')
+    return np.datetime_as_string(values, unit='D')
+
+
+def _format_split(value):
+    ratio = Fraction(value).limit_denominator(1000)
+    return '{}/{}'.format(ratio.numerator, ratio.denominator)
+
+
+def _columns_to_csv(columns, intraday=False):
+    """Renders :class:`numpy.ndarray` columns as CSV text in the download endpoint layout."""
+    return ''.join(_csv_blocks(columns, intraday))
+
+
+def _csv_blocks(columns, intraday=False):
+    """Renders the columns as CSV text in blocks of `_WRITE_ROWS` rows, after the header."""
+    yield ','.join(columns) + '\n'
+    for start in range(0, len(columns['Date']), _WRITE_ROWS):
+        fields = []
+        for name, values in columns.items():
+            values = values[start:start + _WRITE_ROWS]
+            if name == 'Date':
+                fields.append(_format_dates(values, intraday))
+            elif name == 'Volume':
+                fields.append(_format_column(values, '%d'))
+            elif name == 'Stock Splits':
+                fields.append([_format_split(x) for x in values])
+            else:
+                fields.append(_format_column(values, '%.6f'))
+        yield ''.join(','.join(row) + '\n' for row in zip(*fields))
+
+
+def _columns_to_polars(columns, intraday=False):
+    """Builds a :class:`polars.DataFrame` from the columns, in the layout of reading the CSV text."""
+    data = {}
+    for name, values in columns.items():
+        if name == 'Date':
+            data[name] = pl.Series(values if intraday else values.astype('datetime64[D]'))
+        elif name == 'Stock Splits' and 'Split Factor' not in columns:
+            data[name] = pl.Series([_format_split(x) for x in values], dtype=pl.Utf8)
+        elif name == 'Volume':
+            data[name] = pl.Series(values, nan_to_null=True).cast(pl.Int64)
+        else:
+            data[name] = pl.Series(values, nan_to_null=True)
+    return pl.DataFrame(data)
+
+
+def _columns_to_frame(columns, intraday=False, parse_dates=False):
+    """Builds the same :class:`pandas.DataFrame` as reading the CSV text would."""
+    data = {}
+    for name, values in columns.items():
+        if name == 'Date':
+            continue
+        if name == 'Volume' and not np.isnan(values).any():
+            values = values.astype(np.int64)
+        elif name == 'Stock Splits':
+            values = [_format_split(x) for x in values]
+        data[name] = values
+    if parse_dates:
+        index = pd.DatetimeIndex(columns['Date'], name='Date')
+    else:
+        index = pd.Index(_format_dates(columns['Date'], intraday), name='Date')
+    return pd.DataFrame(data, index=index, columns=list(data))
@@ -1,11 +1,45 @@
 from abc import ABC, abstractmethod
 from bs4 import BeautifulSoup
 import json
+import csv
 import requests
 import re
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from io import StringIO
 
 from .dataconfigs import Locale, DataEvent, DataFormat, DataFrequency
 
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+
+class ITransport(ABC):
+    """This is the base interface for objects which send requests for :class:`IYahooData`
+    implementations.
+
+    A transport is passed in place of a `Locale` constant. Requests for quote pages are then
+    given as paths after the quote url, e.g. `/AAPL/financials`, and the transport picks the domain.
+
+    **This class is NOT instantiable.**
+    """
+
+    @abstractmethod
+    def get(self, path, **kwargs):
+        """Requests a path after the quote url of a domain."""
+        pass
+
+    def request(self, url, **kwargs):
+        """Requests a full url, e.g. on the `query1` endpoints."""
+        return requests.get(url, **kwargs)
+
+    def cached(self, key, load):
+        """Returns the value for `key`, calling `load` to create it if it is not held."""
+        return load()
+
 
 class IYahooData(ABC):
     """This is the base interface.
@@ -14,7 +48,9 @@ class IYahooData(ABC):
 
     **This class is NOT instantiable.**
 
-    :param locale: a :class:`yahoofinance.Locale` constant to determine which domain to query from.
+    :param locale: a :class:`yahoofinance.Locale` constant to determine which domain to query from,
+        or an :class:`ITransport`, e.g. a :class:`yahoofinance.LocalePool` to spread requests over
+        several domains.
     """
 
     # This is the default row
@@ -23,7 +59,18 @@ class IYahooData(ABC):
     }
 
     def __init__(self, locale):
-        self._base_url = Locale.locale_url(locale)
+        self._locale = locale
+        # A transport picks the domain per request, so urls are only paths
+        self._base_url = '' if isinstance(locale, ITransport) else Locale.locale_url(locale)
+
+    @classmethod
+    def _from_quote_summary(cls, stock, fin_data, locale=Locale.US):
+        """Creates an object from an already fetched `QuoteSummaryStore` without any requests."""
+        obj = cls.__new__(cls)
+        IYahooData.__init__(obj, locale)
+        obj.stock = stock
+        obj._load(fin_data)
+        return obj
 
     @abstractmethod
     def to_csv(self):
@@ -45,12 +92,422 @@ class IYahooData(ABC):
     def _df_row(dataset, index, data_fmt):
         return [(data[index] if data.get(index) else IYahooData._default_row)[data_fmt] for data in dataset]
 
+    def _fetch_quote_summary(self, url):
+        if isinstance(self._locale, ITransport):
+            # Statements on the same page share one download and parse, so the data is only read
+            return self._locale.cached(('quote_summary', url), lambda: self._parse_quote_summary(self._get(url).text))
+        return self._parse_quote_summary(self._get(url).text)
+
+    def _get(self, url, **kwargs):
+        return _locale_get(self._locale, url, **kwargs)
+
     @staticmethod
-    def _fetch_quote_summary(url):
-        html = requests.get(url).text
+    def _parse_quote_summary(html):
         soup = BeautifulSoup(html,'html.parser')
 
         soup_script = soup.find("script",text=re.compile("root.App.main")).text
         json_script = json.loads(re.search(r"root.App.main\s+=\s+(\{.*\})",soup_script)[1])
         # return json_script
         return json_script['context']['dispatcher']['stores']['QuoteSummaryStore']
+
+
+#: A statement mapping compiled for exports
+#:
+#: * `index`: the :class:`pandas.MultiIndex` of (section, heading) rows.
+#: * `sections`: a tuple of (section, rows) where each row is (heading, key). The key is `None`
+#:   for items which are not known to Yahoo.
+#: * `keys`: the key of each row, `None` where unknown.
+#: * `known`: a read only boolean mask of the rows with a known key.
+StatementLayout = namedtuple('StatementLayout', ['index', 'sections', 'keys', 'known'])
+
+# Placeholder key for items without a known Yahoo key
+_UNKNOWN_KEY = '???'
+
+
+def _compile_mapping(df_mapping):
+    sections = tuple(
+        (section, tuple((name, None if key == _UNKNOWN_KEY else key) for name, key in rows))
+        for section, rows in df_mapping.items()
+    )
+    keys = tuple(key for _, rows in sections for _, key in rows)
+    known = np.array([key is not None for key in keys], dtype=bool)
+    known.setflags(write=False)
+    index = pd.MultiIndex.from_tuples(
+        [(section, name) for section, rows in sections for name, _ in rows], names=('Subject', 'Item'))
+    return StatementLayout(index, sections, keys, known)
+
+
+def _project_layout(layout, fields=None, sections=None):
+    """Selects the rows of a layout whose key is in `fields` or whose section is in `sections`."""
+    if fields is None and sections is None:
+        return layout
+
+    fields = set(fields or ())
+    sections = set(sections or ())
+    unknown = (fields - set(layout.keys)) | (sections - {section for section, _ in layout.sections})
+    if unknown:
+        raise ValueError("Unknown fields or sections: {}".format(', '.join(sorted(unknown))))
+
+    projected = tuple(
+        (section, tuple(row for row in rows if section in sections or row[1] in fields))
+        for section, rows in layout.sections
+    )
+    projected = tuple((section, rows) for section, rows in projected if rows)
+    mask = np.array([
+        section in sections or key in fields
+        for section, rows in layout.sections for _, key in rows
+    ], dtype=bool)
+
+    keys = tuple(key for key, keep in zip(layout.keys, mask) if keep)
+    known = layout.known[mask]
+    known.setflags(write=False)
+    return StatementLayout(layout.index[mask], projected, keys, known)
+
+
+def _check_engine(engine):
+    """Validates a `to_dfs` engine, `'polars'` requires the `polars` package."""
+    if engine not in ('pandas', 'polars'):
+        raise ValueError("Unknown engine {}".format(engine))
+    if engine == 'polars' and pl is None:
+        raise ValueError("The polars engine requires the polars package")
+    return engine
+
+
+def _lean_frame(df, float_dtype=None, dtype_backend=None, exclude=()):
+    """Casts the float columns of a frame to `float_dtype`, then converts it to a pandas dtype
+    backend (pandas 2.0 or later), where integral float columns become nullable integers."""
+    if float_dtype is not None:
+        floats = [name for name in df.select_dtypes(include='floating').columns if name not in exclude]
+        df = df.astype({name: float_dtype for name in floats})
+    if dtype_backend is not None:
+        if dtype_backend not in ('numpy_nullable', 'pyarrow'):
+            raise ValueError("Unknown dtype backend {}".format(dtype_backend))
+        df = df.convert_dtypes(dtype_backend=dtype_backend)
+    return df
+
+
+def _locale_get(locale, url, **kwargs):
+    """Requests a url built from :meth:`Locale.locale_url`, or a path from an :class:`ITransport`."""
+    if isinstance(locale, ITransport):
+        return locale.get(url, **kwargs)
+    return requests.get(url, **kwargs)
+
+
+def _locale_request(locale, url, **kwargs):
+    """Requests a full url, through the :class:`ITransport` if there is one."""
+    if isinstance(locale, ITransport):
+        return locale.request(url, **kwargs)
+    return requests.get(url, **kwargs)
+
+
+class IFinancialStatement(IYahooData):
+    """This is the base interface for financial statements.
+
+    Implementations provide `_df_mapping` and keep their list of periods under the attribute
+    named by `_statement_attr`. The mapping is compiled once into `_layout` when the class
+    is defined.
+
+    `fields` (Yahoo keys, e.g. `capitalExpenditures`) and `sections` (e.g. `Operating activities`)
+    select a subset of the rows. Only the selected items are kept when given on construction, and
+    only the selected rows are exported when given to an export method.
+
+    **This class is NOT instantiable.**
+
+    :param locale: a :class:`yahoofinance.Locale` constant to determine which domain to query from.
+    """
+
+    _page = 'financials'
+
+    #: Maps each section of the statement to a list of (heading, key) pairs
+    _df_mapping = {}
+
+    #: The name of the attribute holding the periods of the statement
+    _statement_attr = None
+
+    #: `'annual'` or `'quarterly'`
+    _frequency = 'annual'
+
+    _layout = _compile_mapping({})
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Subclasses which only change the extraction reuse the layout they inherit
+        if '_df_mapping' in cls.__dict__:
+            cls._layout = _compile_mapping(cls._df_mapping)
+
+    @property
+    def _statements(self):
+        return getattr(self, self._statement_attr)
+
+    def _project(self, fields=None, sections=None):
+        return _project_layout(self._layout, fields, sections)
+
+    def _retain(self, statements):
+        """Copies the periods, keeping only the items of the layout."""
+        if self._layout is type(self)._layout:
+            return list(statements)
+        keys = [key for key in self._layout.keys if key is not None] + ['endDate']
+        return [{key: period[key] for key in keys if key in period} for period in statements]
+
+    def to_csv(self, path=None, sep=',', data_format=DataFormat.RAW, csv_dialect='excel',
+            fields=None, sections=None):
+        """Generates a CSV file.
+
+        :param path: The path to a file location or a writable text stream, e.g. an open file
+            or :func:`gzip.open` in text mode. If it is `None`, this method returns the
+            CSV as a string.
+        :param sep: The separator between elements in the new line.
+        :param data_format: A :class:`DataFormat` constant to determine how the data is
+            exported.
+        :param csv_dialect: The dialect to write the CSV file. See Python in-built :class:`csv`.
+        :param fields: The Yahoo keys of the items to export. Default: `None`.
+        :param sections: The sections to export. Default: `None`, all items are exported when
+            neither `fields` nor `sections` is given.
+
+        :return: `None` or :class:`string`
+        :rtype: `None` or `string`
+        """
+
+        if path is None:
+            file_handle = StringIO()
+            self._write_csv(file_handle, csv_dialect, sep, data_format, fields, sections)
+            return file_handle.getvalue()
+
+        if hasattr(path, 'write'):
+            self._write_csv(path, csv_dialect, sep, data_format, fields, sections)
+            return
+
+        # Path provided
+        with open(path, 'w') as file_handle:
+            self._write_csv(file_handle, csv_dialect, sep, data_format, fields, sections)
+
+    def csv_rows(self, data_format=DataFormat.RAW, fields=None, sections=None):
+        """Generates the rows of the CSV export one at a time.
+
+        :param data_format: A :class:`DataFormat` constant to determine how the data is
+            exported.
+        :param fields: The Yahoo keys of the items to export. Default: `None`.
+        :param sections: The sections to export. Default: `None`.
+
+        :return: A generator of lists, as accepted by :meth:`csv.writer.writerows`.
+        :rtype: `generator`
+        """
+        layout = self._project(fields, sections)
+        statements = self._statements
+        missing = [self._default_row[data_format]] * len(statements)
+        yield self._csv_row(statements, 'Period ending', 'endDate', 'fmt')
+        for section, rows in layout.sections:
+            yield []
+            yield [section]
+            for name, key in rows:
+                if key is None:
+                    yield [name, ''] + missing
+                else:
+                    yield self._csv_row(statements, name, key, data_format)
+
+    def _frame(self, data_format, fields=None, sections=None, float_dtype=None, dtype_backend=None,
+            categorical=False):
+        """Builds the statement as a :class:`pandas.DataFrame` indexed by (section, heading).
+
+        Missing items are `'-'`, unless any of the dtype options is given, then they are `NaN`
+        and columns of raw values are numeric.
+        """
+        layout = self._project(fields, sections)
+        statements = self._statements
+        lean = float_dtype is not None or dtype_backend is not None or categorical
+        missing = np.nan if lean else self._default_row[data_format]
+        default = {data_format: missing}
+
+        # Gather one column per period, rows without a known key are not looked up
+        columns = [
+            [(period.get(key) or default)[data_format] if key is not None else missing for key in layout.keys]
+            for period in statements
+        ]
+        df = pd.DataFrame(dict(enumerate(columns)), index=layout.index, columns=range(len(columns)))
+        df.columns = [i['endDate']['fmt'] for i in statements]
+        if not lean:
+            return df
+
+        df = _lean_frame(df, float_dtype, dtype_backend)
+        if categorical:
+            df.index = df.index.set_levels([pd.CategoricalIndex(level) for level in df.index.levels])
+        return df
+
+    def to_polars(self, data_format=DataFormat.RAW, fields=None, sections=None):
+        """Generates the statement as a :class:`polars.DataFrame`.
+
+        The frame has a categorical `Subject` and `Item` column and one column per period,
+        built straight from the periods without going through pandas. Missing items are null.
+        Requires the `polars` package.
+
+        :param data_format: A :class:`DataFormat` constant to determine how the data is exported.
+        :param fields: The Yahoo keys of the items to export. Default: `None`.
+        :param sections: The sections to export. Default: `None`.
+
+        :rtype: `polars.DataFrame`
+        """
+        _check_engine('polars')
+        layout = self._project(fields, sections)
+        statements = self._statements
+        subjects = [section for section, rows in layout.sections for _ in rows]
+        items = [name for _, rows in layout.sections for name, _ in rows]
+
+        data = {'Subject': pl.Series(subjects, dtype=pl.Categorical), 'Item': pl.Series(items, dtype=pl.Categorical)}
+        dtype = pl.Float64 if data_format == DataFormat.RAW else pl.Utf8
+        for period in statements:
+            data[period['endDate']['fmt']] = pl.Series([
+                (period.get(key) or {}).get(data_format) if key is not None else None for key in layout.keys
+            ], dtype=dtype, strict=False)
+        return pl.DataFrame(data)
+
+    def _polars_dfs(self, name, data_format, fields=None, sections=None):
+        df = self.to_polars(data_format, fields, sections)
+        df_dict = {
+            subject: part.drop('Subject')
+            for subject, part in zip(
+                df['Subject'].unique(maintain_order=True),
+                df.partition_by('Subject', maintain_order=True))
+        }
+        df_dict[name] = df
+        return df_dict
+
+    def _write_csv(self, file_handle, dialect, sep, data_format, fields=None, sections=None):
+        csv_handle = csv.writer(file_handle, dialect=dialect, delimiter=sep)
+        csv_handle.writerows(self.csv_rows(data_format, fields, sections))
+
+
+class ITrailingTwelveMonths:
+    """This is the mixin for quarterly statements of flows, e.g. cash flows and income, which adds
+    trailing twelve month (TTM) sums.
+
+    The sum for a quarter covers it and the three quarters before it. Sums are only given where
+    the four quarters are contiguous, i.e. each `endDate` is 75 to 105 days after the one before,
+    and where the item is known for all four, otherwise they are `NaN`. All windows of all items
+    are summed at once with cumulative sums over the period axis, and the result is cached on
+    the object.
+
+    **This class is NOT instantiable.**
+    """
+
+    #: The shortest and longest gap in days between the end dates of two contiguous quarters
+    _quarter_days = (75, 105)
+
+    def ttm(self):
+        """Generates the trailing twelve month sums as a :class:`pandas.DataFrame`.
+
+        :return: A frame in the same layout as the full statement of :meth:`to_dfs`, with one
+            column per quarter, newest first.
+        :rtype: `pandas.DataFrame`
+        """
+        end_dates, sums = self._ttm_table()
+        keys = self._layout.keys
+        rows = np.array([i for i, key in enumerate(keys) if key is not None], dtype=np.intp)
+
+        values = np.full((len(keys), len(end_dates)), np.nan)
+        values[rows] = sums[::-1].T
+        df = pd.DataFrame(values, index=self._layout.index)
+        fmts = {period['endDate']['raw']: period['endDate']['fmt'] for period in self._statements}
+        df.columns = [fmts[x] for x in end_dates[::-1]]
+        return df
+
+    def _ttm_table(self):
+        """The end dates, oldest first, and the sums of the known items, one row per end date."""
+        cached = getattr(self, '_ttm_cache', None)
+        if cached is not None:
+            return cached
+
+        periods = sorted(self._statements, key=lambda x: x['endDate']['raw'])
+        keys = [key for key in self._layout.keys if key is not None]
+        end_dates = np.array([period['endDate']['raw'] for period in periods], dtype=np.int64)
+        values = np.array([
+            [(period.get(key) or {}).get(DataFormat.RAW, np.nan) for key in keys] for period in periods
+        ], dtype=np.float64).reshape(len(periods), len(keys))
+
+        self._ttm_cache = (end_dates, _rolling_year(end_dates, values, self._quarter_days))
+        return self._ttm_cache
+
+
+def _rolling_year(end_dates, values, quarter_days):
+    """Sums each window of four contiguous quarters with cumulative sums over the period axis."""
+    sums = np.full(values.shape, np.nan)
+    if len(end_dates) < 4:
+        return sums
+
+    missing = np.isnan(values)
+    totals = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(np.where(missing, 0.0, values), axis=0)])
+    gaps = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(missing, axis=0)])
+    window_totals = totals[4:] - totals[:-4]
+    window_gaps = gaps[4:] - gaps[:-4]
+
+    days = np.diff(end_dates) / 86400.0
+    broken = np.r_[0, np.cumsum((days < quarter_days[0]) | (days > quarter_days[1]))]
+    # A window ending at quarter i holds the gaps before quarters i - 2 to i
+    contiguous = (broken[3:] - broken[:-3]) == 0
+
+    sums[3:] = np.where((window_gaps == 0) & contiguous[:, None], window_totals, np.nan)
+    return sums
+
+
+def trailing_twelve_months(statements, fields=None):
+    """Stacks the trailing twelve month sums of many quarterly statements into one frame.
+
+    The sums cached on each statement are reused, so calling this again for a screen only
+    gathers the results.
+
+    :param statements: An iterable of :class:`ITrailingTwelveMonths` statements, e.g.
+        :class:`CashFlowQuarterly` or :class:`IncomeStatementQuarterly` objects.
+    :param fields: The Yahoo keys to include. Default: `None`, every item of the statements.
+
+    :return: A frame indexed by (Stock, End Date) with one column per Yahoo key. Only the
+        quarters ending a full window of four contiguous quarters are included.
+    :rtype: `pandas.DataFrame`
+
+    Usage::
+
+      >>> from yahoofinance import IncomeStatementQuarterly, trailing_twelve_months
+      >>> statements = [IncomeStatementQuarterly(x) for x in ['AAPL', 'MSFT']]
+      >>> trailing_twelve_months(statements, ['totalRevenue', 'netIncome'])
+    """
+    frames = []
+    for statement in statements:
+        end_dates, sums = statement._ttm_table()
+        keys = [key for key in statement._layout.keys if key is not None]
+        full = ~np.isnan(sums).all(axis=1)
+        index = pd.MultiIndex.from_arrays([
+            [statement.stock] * int(full.sum()), pd.to_datetime(end_dates[full], unit='s'),
+        ], names=('Stock', 'End Date'))
+        frames.append(pd.DataFrame(sums[full], index=index, columns=keys))
+
+    if not frames:
+        return pd.DataFrame(index=pd.MultiIndex.from_arrays([[], []], names=('Stock', 'End Date')))
+    df = pd.concat(frames, sort=False)
+    if fields is not None:
+        df = df.reindex(columns=list(fields))
+    return df.sort_index()
+
+
+def write_csv(statements, file_handle, sep=',', data_format=DataFormat.RAW, csv_dialect='excel'):
+    """Writes many financial statements into one CSV stream.
+
+    Each statement is preceded by a row holding its stock code and followed by an empty row.
+    Rows are written as they are generated, so memory use does not grow with the number of
+    statements when they are passed in as a generator.
+
+    :param statements: An iterable of :class:`IFinancialStatement` objects.
+    :param file_handle: A writable text stream, e.g. an open file or :func:`gzip.open` in text mode.
+    :param sep: The separator between elements in the new line.
+    :param data_format: A :class:`DataFormat` constant to determine how the data is exported.
+    :param csv_dialect: The dialect to write the CSV file. See Python in-built :class:`csv`.
+
+    Usage::
+
+      >>> import gzip
+      >>> from yahoofinance import CashFlow, write_csv
+      >>> with gzip.open('cashflow.csv.gz', 'wt', newline='') as file_handle:
+      ...     write_csv((CashFlow(x) for x in ['AAPL', 'MSFT']), file_handle)
+    """
+    csv_handle = csv.writer(file_handle, dialect=csv_dialect, delimiter=sep)
+    for statement in statements:
+        csv_handle.writerow([statement.stock])
+        csv_handle.writerows(statement.csv_rows(data_format))
+        csv_handle.writerow([])
@@ -0,0 +1,139 @@
+import threading
+import time
+import requests
+
+from .dataconfigs import Locale
+from .interfaces import ITransport
+
+
+class LocalePool(ITransport):
+    """Spreads requests over several regional Yahoo Finance domains.
+
+    A pool can be passed as the `locale` of any :class:`IYahooData` implementation. The latency
+    and error rate of every domain is tracked as an exponentially weighted average, and each
+    request goes to the healthiest domain. When a request fails (a connection error, a timeout
+    or a `429` / `5xx` response), it is retried on the next domain. A domain which fails
+    `max_failures` times in a row is skipped for `cooldown` seconds.
+
+    :param locales: The `Locale` constants to use. Default: US, AU and CA.
+    :param urls: A dictionary of name to base url, used instead of `locales`, e.g. to add a
+        proxy mirror. Default: `None`.
+    :param timeout: Seconds to wait for a domain before failing over. Default: `10`.
+    :param smoothing: The weight of the latest request in the averages. Default: `0.3`.
+    :param max_failures: Consecutive failures before a domain is skipped. Default: `3`.
+    :param cooldown: Seconds to skip a failing domain for. Default: `30`.
+
+    :return: :class:`LocalePool` object
+    :rtype: `LocalePool`
+
+    Usage::
+
+      >>> from yahoofinance import CashFlow, LocalePool
+      >>> pool = LocalePool()
+      >>> req = CashFlow('AAPL', locale=pool)
+      Object<CashFlow>
+    """
+
+    def __init__(self, locales=(Locale.US, Locale.AU, Locale.CA), urls=None, timeout=10,
+            smoothing=0.3, max_failures=3, cooldown=30):
+        if urls is None:
+            urls = {locale or 'us': Locale.locale_url(locale) for locale in locales}
+        if not urls:
+            raise ValueError("A locale pool needs at least one domain")
+
+        self.timeout = timeout
+        self.smoothing = smoothing
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self._mirrors = [_Mirror(name, url) for name, url in urls.items()]
+        self._lock = threading.Lock()
+
+    def get(self, path, **kwargs):
+        """Requests a path from the healthiest domain, failing over to the others.
+
+        :param path: The path after the domain's quote url, e.g. `/AAPL/financials`.
+        :param kwargs: Passed on to :func:`requests.get`.
+
+        :return: :class:`requests.Response` object
+        :rtype: `requests.Response`
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        error = None
+        for mirror in self._ranked():
+            start = time.perf_counter()
+            try:
+                response = requests.get(mirror.url + path, **kwargs)
+            except requests.RequestException as e:
+                self._record(mirror, time.perf_counter() - start, False)
+                error = e
+                continue
+
+            status = getattr(response, 'status_code', 200)
+            if status == 429 or status >= 500:
+                self._record(mirror, time.perf_counter() - start, False)
+                error = requests.HTTPError('{} from {}'.format(status, mirror.name), response=response)
+                continue
+
+            self._record(mirror, time.perf_counter() - start, True)
+            return response
+
+        raise error
+
+    def stats(self):
+        """Reports the health of each domain.
+
+        :return: A dictionary of name to a dictionary with `latency` (seconds), `error_rate`,
+            `requests` and `failures`.
+        :rtype: `dict`
+        """
+        with self._lock:
+            return {
+                mirror.name: {
+                    'latency': mirror.latency,
+                    'error_rate': mirror.error_rate,
+                    'requests': mirror.requests,
+                    'failures': mirror.failures,
+                }
+                for mirror in self._mirrors
+            }
+
+    def _ranked(self):
+        now = time.monotonic()
+        with self._lock:
+            # Domains without a measurement yet are tried first so every domain gets measured
+            return sorted(self._mirrors, key=lambda mirror: (
+                mirror.skip_until > now,
+                mirror.latency is not None,
+                (mirror.latency or 0.0) * (1.0 + 10.0 * mirror.error_rate),
+            ))
+
+    def _record(self, mirror, elapsed, success):
+        with self._lock:
+            mirror.requests += 1
+            if mirror.latency is None:
+                mirror.latency = elapsed
+            else:
+                mirror.latency += self.smoothing * (elapsed - mirror.latency)
+            mirror.error_rate += self.smoothing * ((0.0 if success else 1.0) - mirror.error_rate)
+
+            if success:
+                mirror.consecutive_failures = 0
+                return
+            mirror.failures += 1
+            mirror.consecutive_failures += 1
+            if mirror.consecutive_failures >= self.max_failures:
+                mirror.skip_until = time.monotonic() + self.cooldown
+                mirror.consecutive_failures = 0
+
+
+class _Mirror:
+
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url
+        self.latency = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.skip_until = 0.0
@@ -0,0 +1,186 @@
+import ast
+import operator
+import numpy as np
+import pandas as pd
+
+from .dataconfigs import DataFormat
+
+
+class MetricsEngine:
+    """Evaluates financial metrics over the statements of many stocks at once.
+
+    The periods of every statement passed in are aligned on (stock, `endDate`), so a cash flow,
+    balance sheet and income statement of the same stock and period share a row. Every item
+    becomes one :class:`numpy.ndarray` column over all rows, with `NaN` where it is missing,
+    and each formula is evaluated once over the whole column. Evaluated metrics are cached,
+    so metrics built on other metrics reuse them.
+
+    Formulas are arithmetic expressions over Yahoo keys and other metric names, using `+`, `-`,
+    `*`, `/`, `**`, parentheses, numbers and the functions `abs`, `sqrt`, `log`, `minimum`
+    and `maximum`. Division by zero gives `NaN`.
+
+    Pass either annual or quarterly statements, as periods are only matched by date.
+
+    :param statements: An iterable of :class:`IFinancialStatement` objects, in any mix of
+        stocks and statement types.
+    :param formulas: A dictionary of metric name to formula, added to (or replacing)
+        :attr:`FORMULAS`. Default: `None`.
+
+    :return: :class:`MetricsEngine` object
+    :rtype: `MetricsEngine`
+
+    Usage::
+
+      >>> from yahoofinance import BalanceSheet, CashFlow, MetricsEngine
+      >>> statements = [CashFlow('AAPL'), BalanceSheet('AAPL'), CashFlow('MSFT'), BalanceSheet('MSFT')]
+      >>> engine = MetricsEngine(statements, {'fcfToAssets': 'freeCashFlow / totalAssets'})
+      >>> engine.to_df(['freeCashFlow', 'fcfToAssets'])
+    """
+
+    #: The metrics available by default
+    FORMULAS = {
+        'freeCashFlow': 'totalCashFromOperatingActivities + capitalExpenditures',
+        'currentRatio': 'totalCurrentAssets / totalCurrentLiabilities',
+        'quickRatio': '(cash + shortTermInvestments + netReceivables) / totalCurrentLiabilities',
+        'totalDebt': 'shortLongTermDebt + longTermDebt',
+        'debtToEquity': 'totalDebt / totalStockholderEquity',
+        'grossMargin': 'grossProfit / totalRevenue',
+        'operatingMargin': 'operatingIncome / totalRevenue',
+        'netMargin': 'netIncome / totalRevenue',
+        'freeCashFlowMargin': 'freeCashFlow / totalRevenue',
+        'returnOnEquity': 'netIncome / totalStockholderEquity',
+        'returnOnAssets': 'netIncome / totalAssets',
+    }
+
+    def __init__(self, statements, formulas=None):
+        self.formulas = dict(self.FORMULAS)
+        if formulas:
+            self.formulas.update(formulas)
+
+        self._items, self.index = _align(statements)
+        self._cache = {}
+        self._compiled = {}
+
+    def __getitem__(self, name):
+        """The values of an item or metric, aligned with :attr:`index`.
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        return self._evaluate(name, ())
+
+    def __contains__(self, name):
+        return name in self._items or name in self.formulas
+
+    def to_df(self, names=None):
+        """Generates a :class:`pandas.DataFrame` of metrics, indexed by (Stock, End Date).
+
+        :param names: The items or metrics to include. Default: `None`, all formulas.
+
+        :rtype: :class:`pandas.DataFrame`
+        """
+        names = list(self.formulas) if names is None else list(names)
+        return pd.DataFrame({name: self[name] for name in names}, index=self.index, columns=names)
+
+    def _evaluate(self, name, stack):
+        if name in self._cache:
+            return self._cache[name]
+        if name in stack:
+            raise ValueError("Circular formula: {}".format(' -> '.join(stack + (name,))))
+
+        if name in self.formulas:
+            if name not in self._compiled:
+                self._compiled[name] = ast.parse(self.formulas[name], mode='eval').body
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = self._eval_node(self._compiled[name], stack + (name,))
+            values = np.broadcast_to(np.asarray(values, dtype=np.float64), (len(self.index),))
+            values = np.where(np.isinf(values), np.nan, values)
+        elif name in self._items:
+            values = self._items[name]
+        else:
+            # An item missing from every statement
+            values = np.full(len(self.index), np.nan)
+
+        values.setflags(write=False)
+        self._cache[name] = values
+        return values
+
+    def _eval_node(self, node, stack):
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            return _BINARY[type(node.op)](self._eval_node(node.left, stack), self._eval_node(node.right, stack))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+            return _UNARY[type(node.op)](self._eval_node(node.operand, stack))
+        if isinstance(node, ast.Name):
+            return self._evaluate(node.id, stack)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS:
+            return _FUNCTIONS[node.func.id](*[self._eval_node(x, stack) for x in node.args])
+        if (isinstance(node, ast.Constant) and isinstance(node.value, (int, float))
+                and not isinstance(node.value, bool)):
+            return float(node.value)
+        raise ValueError("Unsupported expression in formula: {}".format(ast.dump(node)))
+
+
+def _power(base, exponent):
+    # Constants are floats, so a huge power raises OverflowError instead of building a huge int
+    try:
+        return operator.pow(base, exponent)
+    except OverflowError:
+        raise ValueError("Power overflows in formula: {} ** {}".format(base, exponent))
+
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: _power,
+}
+
+_UNARY = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+_FUNCTIONS = {
+    'abs': np.abs,
+    'sqrt': np.sqrt,
+    'log': np.log,
+    'minimum': np.minimum,
+    'maximum': np.maximum,
+}
+
+
+def _align(statements):
+    """Gathers the raw values of every statement into columns over (stock, endDate) rows."""
+    rows = {}
+    gathered = []
+    for statement in statements:
+        periods = statement._statements
+        positions = np.array([
+            rows.setdefault((statement.stock, period['endDate']['raw']), len(rows)) for period in periods
+        ], dtype=np.intp)
+        keys = [key for key in statement._layout.keys if key is not None]
+        values = np.array([
+            [(period.get(key) or {}).get(DataFormat.RAW, np.nan) for key in keys] for period in periods
+        ], dtype=np.float64).reshape(len(periods), len(keys))
+        gathered.append((positions, keys, values))
+
+    # Sort the rows by stock, then by date
+    pairs = list(rows)
+    order = sorted(range(len(pairs)), key=lambda i: pairs[i])
+    rank = np.empty(len(pairs), dtype=np.intp)
+    rank[order] = np.arange(len(pairs))
+
+    items = {}
+    for positions, keys, values in gathered:
+        positions = rank[positions]
+        for column, key in enumerate(keys):
+            target = items.setdefault(key, np.full(len(pairs), np.nan))
+            # The same item can be in more than one statement, e.g. netIncome
+            missing = np.isnan(target[positions])
+            target[positions[missing]] = values[missing, column]
+
+    index = pd.MultiIndex.from_arrays([
+        [pairs[i][0] for i in order],
+        pd.to_datetime([pairs[i][1] for i in order], unit='s'),
+    ], names=('Stock', 'End Date'))
+    return items, index
@@ -0,0 +1,263 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import closing
+import pandas as pd
+
+from .dataconfigs import Locale
+from .interfaces import IFinancialStatement
+from .batch import _download_page, _parse_page
+from .statementstore import StatementStore
+
+
+class Pipeline:
+    """Streams stocks through a chain of stages, e.g. fetch, transform and write.
+
+    Every stage runs in its own pool of threads and the stages are connected by bounded queues.
+    When a stage falls behind, the queue in front of it fills up and the stages before it wait,
+    down to reading the stocks, so memory use is bounded by the queue sizes however many
+    stocks are run.
+
+    A stage is a function of `(stock, value)` returning the value passed to the next stage.
+    The first stage is given the stock code as its value. A stock whose stage raises is dropped
+    and the exception is kept in :attr:`errors`. An exception raised reading `stocks` stops the
+    feed; the stocks already read finish and it is then raised to the caller. A stage raising
+    e.g. `KeyboardInterrupt` or `SystemExit` stops every stage and it is raised to the caller.
+    Stage functions are made by :func:`fetch`, :func:`download`, :func:`extract`,
+    :func:`transform` and the sinks :func:`csv_sink`, :func:`parquet_sink` and :func:`sqlite_sink`.
+
+    :param stocks: An iterable of stock codes. It is read lazily, so it can be a generator.
+    :param queue_size: The most items waiting in front of each stage. Default: `64`.
+
+    :return: :class:`Pipeline` object
+    :rtype: `Pipeline`
+
+    Usage::
+
+      >>> from yahoofinance import CashFlow, pipeline
+      >>> run = (pipeline.Pipeline(open('tickers.txt').read().split(), queue_size=32)
+      ...     .stage(pipeline.fetch(CashFlow), workers=16)
+      ...     .stage(pipeline.transform(lambda x: x.to_dfs()['Cash Flow']), workers=2)
+      ...     .stage(pipeline.parquet_sink('cashflow'), workers=2))
+      >>> completed, errors = run.run()
+    """
+
+    def __init__(self, stocks, queue_size=64):
+        self.stocks = stocks
+        self.queue_size = queue_size
+        self.errors = {}
+        self.processed = {}
+        self._stages = []
+        self._lock = threading.Lock()
+        self._error = None
+
+    def stage(self, fn, workers=1, name=None):
+        """Appends a stage.
+
+        :param fn: A function of `(stock, value)` returning the next value.
+        :param workers: The number of threads running the stage. Default: `1`.
+        :param name: The name of the stage in :attr:`processed`. Default: the function name.
+
+        :return: The pipeline, so stages can be chained.
+        :rtype: `Pipeline`
+        """
+        if workers < 1:
+            raise ValueError("A stage needs at least one worker, got {}".format(workers))
+        name = name or getattr(fn, '__name__', 'stage{}'.format(len(self._stages)))
+        self._stages.append((name, fn, workers))
+        self.processed[name] = 0
+        return self
+
+    def run(self):
+        """Runs every stock through the stages, discarding the values of the last stage.
+
+        :return: The number of stocks completed and a dictionary of stock code to the exception
+            raised for the stocks that failed.
+        :rtype: `tuple`
+        """
+        completed = sum(1 for _ in self)
+        return completed, self.errors
+
+    def __iter__(self):
+        """Runs the pipeline, yielding `(stock, value)` from the last stage as they complete.
+
+        :attr:`errors` and :attr:`processed` are reset, so they describe the latest run.
+        """
+        self.errors = {}
+        self.processed = {name: 0 for name, _, _ in self._stages}
+        self._error = None
+        stop = threading.Event()
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self._stages) + 1)]
+        workers = [workers for _, _, workers in self._stages] + [1]
+
+        threads = [threading.Thread(target=self._feed, args=(queues[0], workers[0], stop), daemon=True)]
+        for i, (name, fn, count) in enumerate(self._stages):
+            remaining = [count]
+            for _ in range(count):
+                threads.append(threading.Thread(
+                    target=self._work, args=(name, fn, queues[i], queues[i + 1], remaining, workers[i + 1], stop),
+                    daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                try:
+                    item = queues[-1].get(timeout=_POLL)
+                except queue.Empty:
+                    # A stage stopped the run
+                    if stop.is_set():
+                        break
+                    continue
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Stops the stages when the consumer leaves early
+            stop.set()
+            for thread in threads:
+                thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _feed(self, output, consumers, stop):
+        try:
+            for stock in self.stocks:
+                if not _put(output, (stock, stock), stop):
+                    return
+        except Exception as e:
+            self._error = e
+        for _ in range(consumers):
+            _put(output, _DONE, stop)
+
+    def _work(self, name, fn, source, output, remaining, consumers, stop):
+        try:
+            while not stop.is_set():
+                try:
+                    item = source.get(timeout=_POLL)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+
+                stock, value = item
+                try:
+                    value = fn(stock, value)
+                except Exception as e:
+                    with self._lock:
+                        self.errors[stock] = e
+                    continue
+                except BaseException as e:
+                    self._error = e
+                    stop.set()
+                    return
+                with self._lock:
+                    self.processed[name] += 1
+                if not _put(output, (stock, value), stop):
+                    return
+        finally:
+            # The last worker of a stage tells every worker of the next stage to finish
+            with self._lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                for _ in range(consumers):
+                    _put(output, _DONE, stop)
+
+
+_DONE = object()
+
+# Seconds between checks for a stopped pipeline while waiting on a queue
+_POLL = 0.1
+
+
+def _put(output, item, stop):
+    while not stop.is_set():
+        try:
+            output.put(item, timeout=_POLL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def fetch(cls, locale=Locale.US, **kwargs):
+    """Makes a stage which creates an :class:`IYahooData` object for each stock.
+
+    :param cls: Any :class:`IYahooData` implementation, e.g. :class:`CashFlow` or :class:`HistoricalPrices`.
+    :param locale: A `Locale` constant or an :class:`ITransport`. Default: `Locale.US`.
+    :param kwargs: Passed on to `cls`, e.g. `start_date` and `end_date` for :class:`HistoricalPrices`.
+    """
+    def fetch_stage(stock, _):
+        return cls(stock, locale=locale, **kwargs)
+    fetch_stage.__name__ = 'fetch_{}'.format(cls.__name__)
+    return fetch_stage
+
+
+def download(cls, locale=Locale.US):
+    """Makes a stage which downloads the quote page of `cls` for each stock, to be parsed by :func:`extract`."""
+    def download_stage(stock, _):
+        return _download_page(cls, stock, locale)
+    return download_stage
+
+
+def extract(cls, locale=Locale.US):
+    """Makes a stage which parses a page from :func:`download` into a `cls` object."""
+    def extract_stage(stock, html):
+        return _parse_page(cls, stock, html, locale)
+    return extract_stage
+
+
+def transform(fn):
+    """Makes a stage from a function of the value only, e.g. `lambda x: x.to_dfs()['Cash Flow']`."""
+    def transform_stage(stock, value):
+        return fn(value)
+    transform_stage.__name__ = getattr(fn, '__name__', 'transform')
+    return transform_stage
+
+
+def csv_sink(directory, **kwargs):
+    """Makes a stage which writes each value to `<directory>/<stock>.csv`.
+
+    Values can be :class:`IYahooData` objects, written by their `to_csv`, or :class:`pandas.DataFrame`.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    def csv_stage(stock, value):
+        path = os.path.join(directory, '{}.csv'.format(stock))
+        value.to_csv(path, **kwargs)
+    return csv_stage
+
+
+def parquet_sink(directory, **kwargs):
+    """Makes a stage which writes each :class:`pandas.DataFrame` to `<directory>/<stock>.parquet`.
+
+    Requires `pyarrow` or `fastparquet`.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    def parquet_stage(stock, value):
+        value.to_parquet(os.path.join(directory, '{}.parquet'.format(stock)), **kwargs)
+    return parquet_stage
+
+
+def sqlite_sink(path, table='data'):
+    """Makes a stage which writes each value to a SQLite database.
+
+    Financial statements are written to a :class:`StatementStore`. A :class:`pandas.DataFrame`
+    is appended to `table` with its index and a `Stock` column. Writes are serialised, as SQLite
+    has a single writer.
+    """
+    store = StatementStore(path)
+    lock = threading.Lock()
+
+    def sqlite_stage(stock, value):
+        with lock:
+            if isinstance(value, IFinancialStatement):
+                store.write([value])
+                return
+            frame = pd.DataFrame(value).assign(Stock=stock)
+            with closing(sqlite3.connect(path)) as connection, connection:
+                frame.to_sql(table, connection, if_exists='append')
+    return sqlite_stage
@@ -0,0 +1,186 @@
+import json
+import os
+import numpy as np
+from datetime import date
+
+from .dataconfigs import DataEvent, DataFrequency
+from .historicaldata import _slice_dates, _unique_dates
+
+
+class PriceStore:
+    """A local store for :class:`HistoricalPrices` data.
+
+    Each (instrument, event, frequency) data set is kept in its own directory with one
+    fixed-width binary file per column. The `Date` column is sorted and doubles as the
+    date index, so date range reads are a binary search followed by a :class:`numpy.memmap`
+    slice, without copying or parsing any data.
+
+    New rows are appended to the column files. Rows that overlap data already stored
+    (e.g. a refresh of the last few days) are appended as well and the data set is marked
+    as unsorted until :meth:`compact` rewrites it, keeping the latest version of each date.
+
+    :param path: The directory to keep the data in. It is created if it does not exist.
+
+    :return: :class:`PriceStore` object
+    :rtype: `PriceStore`
+
+    Usage::
+
+      >>> from yahoofinance import HistoricalPrices, PriceStore
+      >>> store = PriceStore('prices')
+      >>> req = HistoricalPrices('AAPL', '2018-01-01', '2018-12-31', store=store)
+      Object<HistoricalPrices>
+    """
+
+    _meta_file = 'meta.json'
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def covers(self, instrument, start_date, end_date,
+            event=DataEvent.HISTORICAL_PRICES, frequency=DataFrequency.DAILY):
+        """Checks whether a date range has been stored.
+
+        :return: `True` if a single stored range contains `start_date` to `end_date`.
+        :rtype: `bool`
+        """
+        meta = self._read_meta(self._dataset_path(instrument, event, frequency))
+        if meta is None:
+            return False
+        start, end = start_date.toordinal(), end_date.toordinal()
+        return any(lo <= start and end <= hi for lo, hi in meta['ranges'])
+
+    def ranges(self, instrument, event=DataEvent.HISTORICAL_PRICES, frequency=DataFrequency.DAILY):
+        """Lists the date ranges that have been stored.
+
+        :return: A sorted list of non-overlapping `(start_date, end_date)` pairs.
+        :rtype: `list`
+        """
+        meta = self._read_meta(self._dataset_path(instrument, event, frequency))
+        if meta is None:
+            return []
+        return [(date.fromordinal(lo), date.fromordinal(hi)) for lo, hi in meta['ranges']]
+
+    def read(self, instrument, start_date, end_date,
+            event=DataEvent.HISTORICAL_PRICES, frequency=DataFrequency.DAILY):
+        """Reads a date range of a stored data set.
+
+        The columns returned are read only :class:`numpy.memmap` views. If the data set has
+        unsorted appends, the rows are sorted in memory first (call :meth:`compact` to avoid it).
+
+        :return: A dictionary of columns in the same layout as :attr:`HistoricalPrices.columns`,
+            or `None` if nothing has been stored.
+        :rtype: `dict`
+        """
+        dataset = self._dataset_path(instrument, event, frequency)
+        meta = self._read_meta(dataset)
+        if meta is None:
+            return None
+
+        columns = self._map_columns(dataset, meta)
+        if not meta['sorted']:
+            columns = _unique_dates(columns)
+
+        return _slice_dates(columns, start_date, end_date)
+
+    def write(self, prices):
+        """Appends the rows of a :class:`HistoricalPrices` object to the store.
+
+        :param prices: A :class:`HistoricalPrices` object.
+        """
+        dataset = self._dataset_path(prices.instrument, prices._dataset_event(), prices.frequency)
+        meta = self._read_meta(dataset)
+        columns = prices.columns
+        stamps = columns['Date'].astype('datetime64[s]').view(np.int64)
+
+        if meta is None:
+            os.makedirs(dataset, exist_ok=True)
+            meta = {'columns': list(columns), 'rows': 0, 'sorted': True, 'last': None, 'ranges': []}
+            self._truncate(dataset, meta)
+        elif list(columns) != meta['columns']:
+            raise ValueError("Columns {} do not match the stored columns {}".format(
+                list(columns), meta['columns']))
+
+        if len(stamps):
+            if meta['last'] is not None and stamps[0] <= meta['last']:
+                meta['sorted'] = False
+            meta['last'] = int(stamps[-1]) if meta['last'] is None else max(meta['last'], int(stamps[-1]))
+
+        for name in meta['columns']:
+            values = stamps if name == 'Date' else np.asarray(columns[name], dtype=np.float64)
+            with open(self._column_path(dataset, name), 'ab') as file_handle:
+                # Drops the bytes of an append which failed before its rows were committed
+                file_handle.truncate(meta['rows'] * values.itemsize)
+                file_handle.write(values.tobytes())
+
+        meta['rows'] += len(stamps)
+        meta['ranges'] = _merge_ranges(
+            meta['ranges'] + [[prices.start_date.toordinal(), prices.end_date.toordinal()]])
+        self._write_meta(dataset, meta)
+
+    def compact(self, instrument, event=DataEvent.HISTORICAL_PRICES, frequency=DataFrequency.DAILY):
+        """Rewrites a data set sorted by date, keeping only the latest row for each date."""
+        dataset = self._dataset_path(instrument, event, frequency)
+        meta = self._read_meta(dataset)
+        if meta is None or meta['sorted']:
+            return
+
+        columns = _unique_dates(self._map_columns(dataset, meta))
+        for name, values in columns.items():
+            temp_path = self._column_path(dataset, name) + '.tmp'
+            with open(temp_path, 'wb') as file_handle:
+                file_handle.write(np.ascontiguousarray(values).tobytes())
+            os.replace(temp_path, self._column_path(dataset, name))
+
+        meta['rows'] = len(columns['Date'])
+        meta['sorted'] = True
+        self._write_meta(dataset, meta)
+
+    def _dataset_path(self, instrument, event, frequency):
+        return os.path.join(self.path, instrument, '{}-{}'.format(event, frequency))
+
+    @staticmethod
+    def _column_path(dataset, name):
+        return os.path.join(dataset, name.replace(' ', '_') + '.bin')
+
+    def _map_columns(self, dataset, meta):
+        columns = {}
+        for name in meta['columns']:
+            dtype = np.int64 if name == 'Date' else np.float64
+            if meta['rows']:
+                # Only the committed rows are mapped, a partially written append is ignored
+                values = np.memmap(self._column_path(dataset, name), dtype=dtype, mode='r',
+                    shape=(meta['rows'],))
+            else:
+                values = np.empty(0, dtype=dtype)
+            columns[name] = values.view('datetime64[s]') if name == 'Date' else values
+        return columns
+
+    def _truncate(self, dataset, meta):
+        for name in meta['columns']:
+            open(self._column_path(dataset, name), 'wb').close()
+
+    def _read_meta(self, dataset):
+        try:
+            with open(os.path.join(dataset, self._meta_file)) as file_handle:
+                return json.load(file_handle)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, dataset, meta):
+        # Readers only see rows once the row count is committed here
+        temp_path = os.path.join(dataset, self._meta_file + '.tmp')
+        with open(temp_path, 'w') as file_handle:
+            json.dump(meta, file_handle)
+        os.replace(temp_path, os.path.join(dataset, self._meta_file))
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return merged
@@ -0,0 +1,190 @@
+import heapq
+import itertools
+import threading
+import time
+import requests
+
+from .dataconfigs import Locale, Priority
+from .interfaces import ITransport
+
+
+class RequestExpired(ValueError):
+    """Raised for a request dropped by a :class:`RequestScheduler` because its deadline passed
+    while it was queued."""
+    pass
+
+
+class RequestScheduler(ITransport):
+    """Queues requests by priority class so interactive lookups are not starved by batch work.
+
+    At most `max_concurrent` requests are sent at once. Waiting requests are served by priority,
+    then in arrival order, so an :attr:`Priority.INTERACTIVE` request jumps ahead of any number of
+    queued :attr:`Priority.BATCH` requests. A request still queued when its deadline passes is
+    dropped and raises :class:`RequestExpired` instead of being sent late.
+
+    Data objects pick their priority through a view made by :meth:`priority`, passed as their
+    `locale`. Every view shares the scheduler's queue.
+
+    :param transport: A `Locale` constant or an :class:`ITransport`, e.g. a
+        :class:`YahooFinanceClient`, which sends the requests. Default: `Locale.US`.
+    :param max_concurrent: The most requests sent at once. Default: `4`.
+    :param deadlines: A dictionary of priority to the default seconds a request may wait in the
+        queue. Default: `None`, requests wait until they are sent.
+
+    :return: :class:`RequestScheduler` object
+    :rtype: `RequestScheduler`
+
+    Usage::
+
+      >>> from yahoofinance import AssetProfile, HistoricalPrices, Priority, RequestScheduler, YahooFinanceClient
+      >>> scheduler = RequestScheduler(YahooFinanceClient(), max_concurrent=8)
+      >>> batch = scheduler.priority(Priority.BATCH)
+      >>> prices = HistoricalPrices('AAPL', '2018-01-01', '2018-12-31', locale=batch)
+      >>> profile = AssetProfile('XYZ', locale=scheduler.priority(Priority.INTERACTIVE, deadline=2))
+    """
+
+    def __init__(self, transport=Locale.US, max_concurrent=4, deadlines=None):
+        if max_concurrent < 1:
+            raise ValueError("A scheduler needs at least one concurrent request, got {}".format(max_concurrent))
+        self.transport = transport
+        self.max_concurrent = max_concurrent
+        self.deadlines = dict(deadlines or {})
+
+        self._condition = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._active = 0
+        self._stats = {}
+
+    def priority(self, priority, deadline=None):
+        """Makes a transport sending requests through the scheduler at a priority.
+
+        :param priority: A :class:`Priority` constant.
+        :param deadline: Seconds a request may wait in the queue. Default: `None`, the scheduler's
+            default for the priority.
+
+        :return: An :class:`ITransport` to pass as the `locale` of data objects.
+        :rtype: `ITransport`
+        """
+        return _ScheduledTransport(self, priority, deadline)
+
+    def get(self, path, **kwargs):
+        """Requests a path at :attr:`Priority.NORMAL`.
+
+        :return: :class:`requests.Response` object
+        :rtype: `requests.Response`
+        """
+        return self._get(path, Priority.NORMAL, None, **kwargs)
+
+    def request(self, url, **kwargs):
+        """Requests a full url at :attr:`Priority.NORMAL`.
+
+        :return: :class:`requests.Response` object
+        :rtype: `requests.Response`
+        """
+        return self._request(url, Priority.NORMAL, None, **kwargs)
+
+    def cached(self, key, load):
+        """Uses the cache of the underlying transport, if it has one."""
+        if isinstance(self.transport, ITransport):
+            return self.transport.cached(key, load)
+        return load()
+
+    def stats(self):
+        """Reports the queue use of each priority.
+
+        :return: A dictionary of priority to a dictionary with `requests` (sent), `dropped`,
+            `queued` (waiting now), `mean_wait` and `max_wait` (seconds queued before sending).
+        :rtype: `dict`
+        """
+        with self._condition:
+            queued = {}
+            for entry in self._queue:
+                queued[entry[0]] = queued.get(entry[0], 0) + 1
+            return {
+                priority: {
+                    'requests': stats['requests'],
+                    'dropped': stats['dropped'],
+                    'queued': queued.get(priority, 0),
+                    'mean_wait': stats['wait'] / stats['requests'] if stats['requests'] else 0.0,
+                    'max_wait': stats['max_wait'],
+                }
+                for priority, stats in sorted(self._stats.items())
+            }
+
+    def _get(self, path, priority, deadline, **kwargs):
+        if isinstance(self.transport, ITransport):
+            send = lambda: self.transport.get(path, **kwargs)
+        else:
+            send = lambda: requests.get(Locale.locale_url(self.transport) + path, **kwargs)
+        return self._send(send, priority, deadline)
+
+    def _request(self, url, priority, deadline, **kwargs):
+        if isinstance(self.transport, ITransport):
+            send = lambda: self.transport.request(url, **kwargs)
+        else:
+            send = lambda: requests.get(url, **kwargs)
+        return self._send(send, priority, deadline)
+
+    def _send(self, send, priority, deadline):
+        self._acquire(priority, deadline)
+        try:
+            return send()
+        finally:
+            self._release()
+
+    def _acquire(self, priority, deadline):
+        if deadline is None:
+            deadline = self.deadlines.get(priority)
+        queued = time.monotonic()
+        expires = None if deadline is None else queued + deadline
+        entry = (priority, next(self._sequence))
+
+        with self._condition:
+            stats = self._stats.setdefault(priority, {'requests': 0, 'dropped': 0, 'wait': 0.0, 'max_wait': 0.0})
+            heapq.heappush(self._queue, entry)
+            try:
+                while self._active >= self.max_concurrent or self._queue[0] != entry:
+                    now = time.monotonic()
+                    if expires is not None and now >= expires:
+                        stats['dropped'] += 1
+                        raise RequestExpired("Request expired after waiting {:.3f}s in the queue".format(now - queued))
+                    self._condition.wait(None if expires is None else expires - now)
+            except BaseException:
+                # Also on an interrupt while waiting, so the entry does not block the queue
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                # The request may have been next in line
+                self._condition.notify_all()
+                raise
+
+            heapq.heappop(self._queue)
+            self._active += 1
+            waited = time.monotonic() - queued
+            stats['requests'] += 1
+            stats['wait'] += waited
+            stats['max_wait'] = max(stats['max_wait'], waited)
+            # The next request may be able to start too
+            self._condition.notify_all()
+
+    def _release(self):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+
+class _ScheduledTransport(ITransport):
+
+    def __init__(self, scheduler, priority, deadline):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.deadline = deadline
+
+    def get(self, path, **kwargs):
+        return self.scheduler._get(path, self.priority, self.deadline, **kwargs)
+
+    def request(self, url, **kwargs):
+        return self.scheduler._request(url, self.priority, self.deadline, **kwargs)
+
+    def cached(self, key, load):
+        return self.scheduler.cached(key, load)
@@ -0,0 +1,298 @@
+import os
+import sqlite3
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from contextlib import closing
+from datetime import date
+
+from .dataconfigs import DataEvent, DataFrequency
+from .historicaldata import HistoricalPrices, HistoricalEvents, _slice_dates, _to_date
+
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:
+    shared_memory = None
+
+
+class SharedPriceRegistry:
+    """Publishes decoded :class:`HistoricalPrices` columns in shared memory for other processes.
+
+    A published data set is copied once into a :mod:`multiprocessing.shared_memory` block: the
+    `Date` column followed by the other columns as one column-major `float64` array. Processes on
+    the same host attach to the block and read the columns as read only :class:`numpy.ndarray`
+    views, without downloading or parsing the data themselves or holding their own copy.
+
+    The registry is a SQLite file listing the published instrument, data set, frequency and date
+    range of each block, so any process opening the same file can find them. Blocks belong to
+    the publishing process. They are removed by :meth:`unpublish` or :meth:`close`, or when that
+    process exits, and entries whose block has gone are dropped when they are next attached.
+
+    The arrays returned by :meth:`attach` and :meth:`frame` map blocks held by the registry, so
+    the registry must be kept until they are no longer in use, and then closed.
+
+    Requires Python 3.8 or later.
+
+    :param path: The registry file. It is created if it does not exist.
+
+    :return: :class:`SharedPriceRegistry` object
+    :rtype: `SharedPriceRegistry`
+
+    Usage::
+
+      >>> from yahoofinance import HistoricalPrices, SharedPriceRegistry
+      >>> registry = SharedPriceRegistry('/dev/shm/prices.db')
+      >>> registry.publish(HistoricalPrices('AAPL', '2000-01-01', '2018-12-31'))
+
+      In another process:
+
+      >>> registry = SharedPriceRegistry('/dev/shm/prices.db')
+      >>> prices = registry.attach(HistoricalPrices, 'AAPL', '2010-01-01', '2018-12-31')
+      >>> prices.columns['Close']
+    """
+
+    _schema = """CREATE TABLE IF NOT EXISTS published (
+        block TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        instrument TEXT NOT NULL,
+        event TEXT NOT NULL,
+        frequency TEXT NOT NULL,
+        start_date INTEGER NOT NULL,
+        end_date INTEGER NOT NULL,
+        rows INTEGER NOT NULL,
+        columns TEXT NOT NULL,
+        pid INTEGER NOT NULL,
+        published REAL NOT NULL
+    )"""
+
+    _kinds = {cls.__name__: cls for cls in (HistoricalPrices, HistoricalEvents)}
+
+    def __init__(self, path):
+        if shared_memory is None:
+            raise ValueError("SharedPriceRegistry requires multiprocessing.shared_memory (Python 3.8+)")
+        self.path = path
+        self._owned = {}
+        self._attached = {}
+        with closing(self._connect()) as connection, connection:
+            connection.execute(self._schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def publish(self, prices):
+        """Copies the columns of a data set into a new shared memory block and registers it.
+
+        A data set published before with the same instrument, frequency and date range by this
+        registry is replaced.
+
+        :param prices: A :class:`HistoricalPrices` or :class:`HistoricalEvents` object.
+
+        :return: The name of the shared memory block.
+        :rtype: `str`
+        """
+        columns = prices.columns
+        names = [name for name in columns if name != 'Date']
+        rows = len(columns['Date'])
+
+        # Names are kept short for platforms limiting them to 30 characters
+        name = 'yf_{}'.format(uuid.uuid4().hex[:16])
+        block = shared_memory.SharedMemory(name=name, create=True, size=max(1, 8 * rows * (len(names) + 1)))
+        dates, values = _views(block, rows, len(names))
+        dates[:] = columns['Date'].view(np.int64)
+        for i, column in enumerate(names):
+            values[:, i] = columns[column]
+        del dates, values
+
+        key = (type(prices).__name__, prices.instrument, prices._dataset_event(), prices.frequency,
+            prices.start_date.toordinal(), prices.end_date.toordinal())
+        with closing(self._connect()) as connection, connection:
+            replaced = [row[0] for row in connection.execute(
+                """SELECT block FROM published WHERE kind = ? AND instrument = ? AND event = ?
+                AND frequency = ? AND start_date = ? AND end_date = ?""", key)]
+            connection.execute(
+                'INSERT INTO published VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (name,) + key + (rows, ','.join(names), os.getpid(), time.time()))
+        self._owned[name] = block
+        for old in replaced:
+            if old in self._owned:
+                self._remove(old)
+        return name
+
+    def attach(self, cls, instrument, start_date, end_date, event=DataEvent.HISTORICAL_PRICES,
+            frequency=DataFrequency.DAILY, date_format_string="%Y-%m-%d"):
+        """Attaches to a published data set covering a date range.
+
+        :param cls: :class:`HistoricalPrices` or :class:`HistoricalEvents`.
+        :param instrument: The stock instrument code.
+        :param start_date: The start date for the range (inclusive).
+        :param end_date: The end date for the range (inclusive).
+        :param event: A `DataEvent` constant, for :class:`HistoricalPrices`. Default: `DataEvent.HISTORICAL_PRICES`.
+        :param frequency: A `DataFrequency` constant. Default: `DataFrequency.DAILY`.
+        :param date_format_string: The format of `start_date` and `end_date` if they are strings.
+            Default: `%Y-%m-%d`.
+
+        :return: A `cls` object whose columns are read only views of the shared memory, or `None`
+            if no published data set covers the range. It can be used like a downloaded object,
+            e.g. :meth:`HistoricalPrices.to_dfs` or :meth:`HistoricalPrices.between`.
+        :rtype: `HistoricalPrices`
+        """
+        start_date = _to_date(start_date, date_format_string)
+        end_date = _to_date(end_date, date_format_string)
+        found = self._find(cls, instrument, start_date, end_date, event, frequency)
+        if found is None:
+            return None
+
+        entry, dates, values, names = found
+        columns = {'Date': dates}
+        columns.update(zip(names, values.T))
+        return self._kinds[entry['kind']]._from_columns(
+            instrument, start_date, end_date, _slice_dates(columns, start_date, end_date),
+            DataEvent.HISTORICAL_PRICES if entry['event'] == 'events' else entry['event'], frequency)
+
+    def frame(self, cls, instrument, start_date, end_date, event=DataEvent.HISTORICAL_PRICES,
+            frequency=DataFrequency.DAILY, date_format_string="%Y-%m-%d"):
+        """Attaches to a published data set as a :class:`pandas.DataFrame`.
+
+        The values of the frame are a read only view of the shared memory, indexed by a
+        :class:`pandas.DatetimeIndex`. The arguments are the same as :meth:`attach`.
+
+        :return: A frame of the date range, or `None` if no published data set covers it.
+        :rtype: `pandas.DataFrame`
+        """
+        start_date = _to_date(start_date, date_format_string)
+        end_date = _to_date(end_date, date_format_string)
+        found = self._find(cls, instrument, start_date, end_date, event, frequency)
+        if found is None:
+            return None
+
+        _, dates, values, names = found
+        # Slicing the rows of the column-major array keeps a single view of the block
+        sliced = _slice_dates({'Date': dates, 'Values': values}, start_date, end_date)
+        return pd.DataFrame(sliced['Values'], index=pd.DatetimeIndex(sliced['Date'], name='Date'),
+            columns=names, copy=False)
+
+    def published(self):
+        """Lists the published data sets.
+
+        :return: A frame with one row per block.
+        :rtype: `pandas.DataFrame`
+        """
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                """SELECT block, kind, instrument, event, frequency, start_date, end_date, rows, pid
+                FROM published ORDER BY instrument, event, frequency, start_date""").fetchall()
+        df = pd.DataFrame(rows, columns=[
+            'Block', 'Kind', 'Instrument', 'Event', 'Frequency', 'Start Date', 'End Date', 'Rows', 'Process'])
+        for name in ('Start Date', 'End Date'):
+            df[name] = [date.fromordinal(x) for x in df[name]]
+        return df
+
+    def unpublish(self, instrument=None):
+        """Removes the blocks published by this registry.
+
+        Processes attached to a block keep their views, the memory is freed once they are done.
+        This registry keeps its own mapping of the block until it is closed.
+
+        :param instrument: Only remove the blocks of this instrument. Default: `None`, all blocks.
+
+        :return: The number of blocks removed.
+        :rtype: `int`
+        """
+        names = list(self._owned)
+        if instrument is not None:
+            with closing(self._connect()) as connection:
+                matching = {row[0] for row in connection.execute(
+                    'SELECT block FROM published WHERE instrument = ?', (instrument,))}
+            names = [name for name in names if name in matching]
+        for name in names:
+            self._remove(name)
+        return len(names)
+
+    def close(self):
+        """Removes the published blocks and detaches from every block.
+
+        A `ValueError` is raised if arrays from :meth:`attach` or :meth:`frame` are still in use.
+        The blocks they map stay attached until `close` is called again.
+        """
+        self.unpublish()
+        in_use = {}
+        for name, block in self._attached.items():
+            try:
+                block.close()
+            except BufferError:
+                in_use[name] = block
+        self._attached = in_use
+        if in_use:
+            raise ValueError("Arrays of {} shared blocks are still in use".format(len(in_use)))
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def _find(self, cls, instrument, start_date, end_date, event, frequency):
+        dataset = 'events' if issubclass(cls, HistoricalEvents) else event
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                """SELECT block, kind, event, rows, columns FROM published
+                WHERE instrument = ? AND event = ? AND frequency = ? AND start_date <= ? AND end_date >= ?
+                ORDER BY rows""",
+                (instrument, dataset, frequency, start_date.toordinal(), end_date.toordinal())).fetchall()
+
+        for name, kind, event, count, names in rows:
+            block = self._open(name)
+            if block is None:
+                continue
+            names = names.split(',') if names else []
+            dates, values = _views(block, count, len(names))
+            dates.flags.writeable = False
+            values.flags.writeable = False
+            return {'kind': kind, 'event': event}, dates.view('datetime64[s]'), values, names
+        return None
+
+    def _open(self, name):
+        block = self._attached.get(name) or self._owned.get(name)
+        if block is not None:
+            return block
+        try:
+            block = _attach_block(name)
+        except FileNotFoundError:
+            # The publishing process has gone
+            with closing(self._connect()) as connection, connection:
+                connection.execute('DELETE FROM published WHERE block = ?', (name,))
+            return None
+        self._attached[name] = block
+        return block
+
+    def _remove(self, name):
+        block = self._owned.pop(name)
+        with closing(self._connect()) as connection, connection:
+            connection.execute('DELETE FROM published WHERE block = ?', (name,))
+        block.unlink()
+        # Views of the block may be in use, it is detached by close
+        self._attached[name] = block
+
+
+def _views(block, rows, width):
+    """Maps the `Date` column and the column-major array of the other columns of a block.
+
+    The arrays hold the block's buffer, so the block cannot be closed while they are in use.
+    """
+    dates = np.frombuffer(block.buf, dtype=np.int64, count=rows)
+    values = np.frombuffer(block.buf, dtype=np.float64, count=rows * width, offset=8 * rows)
+    return dates, values.reshape((rows, width), order='F')
+
+
+def _attach_block(name):
+    try:
+        block = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        block = shared_memory.SharedMemory(name=name)
+        # Before Python 3.13 attaching registers a POSIX block to be removed when this process
+        # exits. The tracker knows it by its full name, which has a leading slash.
+        if os.name == 'posix':
+            resource_tracker.unregister('/' + block.name.lstrip('/'), 'shared_memory')
+    return block
+
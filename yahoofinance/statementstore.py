@@ -0,0 +1,165 @@
+import sqlite3
+from contextlib import closing
+import pandas as pd
+
+from .dataconfigs import DataFormat
+
+
+class StatementStore:
+    """A local SQLite store for financial statements.
+
+    Statements are flattened into one row per (stock, statement, frequency, end date, item)
+    holding the raw value. Statements are `cashflow`, `balancesheet` or `incomestatement` and
+    frequencies are `annual` or `quarterly`. Rows are inserted in bulk in one transaction per
+    write, and writing a period again replaces it.
+
+    Rows are indexed by item, so cross-sectional queries such as the latest `totalAssets` of
+    every stock read only the matching rows, without any request or HTML parsing.
+
+    Each call opens its own connection, so a store can be used from any thread.
+
+    :param path: The SQLite database file. It is created if it does not exist.
+
+    :return: :class:`StatementStore` object
+    :rtype: `StatementStore`
+
+    Usage::
+
+      >>> from yahoofinance import BalanceSheet, StatementStore
+      >>> store = StatementStore('statements.db')
+      >>> store.write(BalanceSheet(x) for x in ['AAPL', 'MSFT'])
+      >>> store.latest('totalAssets')
+    """
+
+    _schema = (
+        """CREATE TABLE IF NOT EXISTS statements (
+            stock TEXT NOT NULL,
+            statement TEXT NOT NULL,
+            frequency TEXT NOT NULL,
+            end_date INTEGER NOT NULL,
+            item TEXT NOT NULL,
+            value REAL,
+            PRIMARY KEY (stock, statement, frequency, end_date, item)
+        ) WITHOUT ROWID""",
+        """CREATE INDEX IF NOT EXISTS statements_item
+            ON statements (item, frequency, stock, end_date)""",
+    )
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as connection, connection:
+            for statement in self._schema:
+                connection.execute(statement)
+
+    def write(self, statements):
+        """Writes the periods of financial statements to the store in one transaction.
+
+        :param statements: An iterable of :class:`IFinancialStatement` objects.
+
+        :return: The number of rows written.
+        :rtype: `int`
+        """
+        rows = []
+        for statement in statements:
+            name = statement._statement_attr.lower()
+            keys = [key for key in statement._layout.keys if key is not None]
+            for period in statement._statements:
+                end_date = period['endDate'][DataFormat.RAW]
+                rows.extend(
+                    (statement.stock, name, statement._frequency, end_date, key, period[key].get(DataFormat.RAW))
+                    for key in keys if period.get(key)
+                )
+
+        with closing(self._connect()) as connection, connection:
+            connection.executemany('INSERT OR REPLACE INTO statements VALUES (?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def latest(self, item, frequency='annual', stocks=None, statement=None):
+        """Reads the latest value of an item for every stock.
+
+        :param item: The Yahoo key of the item, e.g. `totalAssets`.
+        :param frequency: `'annual'` or `'quarterly'`. Default: `'annual'`.
+        :param stocks: Only read these stocks. Default: `None`, all stocks.
+        :param statement: Only read this statement, e.g. `'balancesheet'`. It must be given for
+            items found in several statements, such as `netIncome`. Default: `None`, any statement.
+
+        :return: A frame indexed by `Stock` with the `End Date` and `Value`.
+        :rtype: `pandas.DataFrame`
+        """
+        sql = """
+            SELECT s.stock, s.end_date, s.value FROM statements AS s
+            WHERE s.item = ? AND s.frequency = ? {0} {1}
+            AND s.end_date = (
+                SELECT MAX(end_date) FROM statements
+                WHERE stock = s.stock AND item = s.item AND frequency = s.frequency AND statement = s.statement
+            )
+            ORDER BY s.stock
+        """
+        params, stock_filter = self._stock_filter(stocks)
+        statement_params, statement_filter = self._statement_filter(statement)
+        rows = self._fetch(sql.format(stock_filter, statement_filter), [item, frequency] + params + statement_params)
+        df = self._frame(rows, ['Stock', 'End Date', 'Value'], 'Stock')
+        if df.index.has_duplicates:
+            raise ValueError("Item {} is in several statements, pass a statement".format(item))
+        return df
+
+    def history(self, stock, frequency='annual', items=None, statement=None):
+        """Reads every stored period of a stock.
+
+        :param stock: The stock code.
+        :param frequency: `'annual'` or `'quarterly'`. Default: `'annual'`.
+        :param items: Only read these Yahoo keys. Default: `None`, all items.
+        :param statement: Only read this statement, e.g. `'cashflow'`. It must be given when the
+            items read are found in several statements, such as `netIncome`. Default: `None`,
+            every statement.
+
+        :return: A frame indexed by Yahoo key with one column per end date, newest first.
+        :rtype: `pandas.DataFrame`
+        """
+        sql = 'SELECT item, end_date, value FROM statements WHERE stock = ? AND frequency = ?'
+        params = [stock, frequency]
+        if items is not None:
+            items = list(items)
+            sql += ' AND item IN ({})'.format(', '.join('?' * len(items)))
+            params += items
+        statement_params, statement_filter = self._statement_filter(statement)
+
+        df = self._frame(self._fetch(sql + statement_filter, params + statement_params), ['Item', 'End Date', 'Value'])
+        try:
+            df = df.pivot(index='Item', columns='End Date', values='Value')
+        except ValueError:
+            raise ValueError("Items of {} are in several statements, pass a statement".format(stock))
+        return df[sorted(df.columns, reverse=True)]
+
+    def stocks(self):
+        """Lists the stocks with stored statements.
+
+        :rtype: `list`
+        """
+        return [row[0] for row in self._fetch('SELECT DISTINCT stock FROM statements ORDER BY stock', [])]
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def _fetch(self, sql, params):
+        with closing(self._connect()) as connection:
+            return connection.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _stock_filter(stocks):
+        if stocks is None:
+            return [], ''
+        stocks = list(stocks)
+        return stocks, 'AND stock IN ({})'.format(', '.join('?' * len(stocks)))
+
+    @staticmethod
+    def _statement_filter(statement):
+        if statement is None:
+            return [], ''
+        return [statement], ' AND statement = ?'
+
+    @staticmethod
+    def _frame(rows, columns, index=None):
+        df = pd.DataFrame(rows, columns=columns)
+        df['End Date'] = pd.to_datetime(df['End Date'], unit='s')
+        return df.set_index(index) if index else df
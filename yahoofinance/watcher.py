@@ -0,0 +1,201 @@
+import hashlib
+import re
+from collections import Counter
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .dataconfigs import Locale
+from .interfaces import IYahooData, ITransport, _locale_get
+from .cashflow import CashFlowQuarterly
+from .balancesheet import BalanceSheetQuarterly
+from .incomestatement import IncomeStatementQuarterly
+
+# Matches every period end date on a page without parsing it
+_END_DATE = re.compile(rb'"endDate":\{"raw":(\d+)')
+
+
+class FilingWatcher:
+    """Polls many stocks for new financial statement periods.
+
+    A fingerprint is kept for every stock: the `ETag` / `Last-Modified` validators of its page,
+    a hash of the page and how many periods end on each `endDate` on it. Each poll sends a
+    conditional request, so an unchanged page costs a `304` without a body where Yahoo supports
+    it. A page that did change is only hashed and scanned for its `endDate` values, and the page
+    is only fully parsed when some date ends more periods than before, i.e. a statement may have
+    a new period even if it ends on a date already seen on another statement. The callback is
+    then called for each statement with new periods.
+
+    The statements watched must share a page, which all statements on `/financials` do, so
+    each stock costs one request per poll. Each poll checks at most `budget` stocks, picking
+    the ones checked least recently, so a large watch list is covered in turns.
+
+    The first poll of a stock only records its fingerprint. A stock whose check fails keeps its
+    old fingerprint and the exception is kept in :attr:`errors` until a check succeeds.
+
+    :param stocks: An iterable of stock codes to watch.
+    :param statements: The statement classes to check for new periods. Default: the
+        quarterly cash flow, balance sheet and income statement.
+    :param callback: Called with `(stock, statement, end_dates)` for each statement with new
+        periods, where `end_dates` is a list of the new raw end dates. If the callback raises,
+        it is still called for the other changes of the poll, then the first exception is raised
+        from :meth:`poll`. The periods are already recorded, so they are not reported again.
+        Default: `None`.
+    :param locale: A `Locale` constant or an :class:`ITransport`, e.g. a :class:`LocalePool`. Default: `Locale.US`.
+    :param budget: The most requests sent by each poll. Default: `None`, every stock.
+    :param workers: The number of concurrent requests. Default: `8`.
+    :param fingerprints: Fingerprints from :attr:`fingerprints` of an earlier watcher, to resume
+        without re-checking every stock. Default: `None`.
+
+    :return: :class:`FilingWatcher` object
+    :rtype: `FilingWatcher`
+
+    Usage::
+
+      >>> from yahoofinance import FilingWatcher
+      >>> def notify(stock, statement, end_dates):
+      ...     print(stock, type(statement).__name__, end_dates)
+      >>> watcher = FilingWatcher(['AAPL', 'MSFT'], callback=notify, budget=1000)
+      >>> watcher.run(interval=600)
+    """
+
+    def __init__(self, stocks, statements=(CashFlowQuarterly, BalanceSheetQuarterly, IncomeStatementQuarterly),
+            callback=None, locale=Locale.US, budget=None, workers=8, fingerprints=None):
+        pages = {cls._page for cls in statements}
+        if len(pages) != 1:
+            raise ValueError("Statements must share a page, got: {}".format(', '.join(sorted(pages))))
+
+        self.statements = tuple(statements)
+        self.callback = callback
+        self.locale = locale
+        self.budget = budget
+        self.workers = workers
+        self.fingerprints = dict(fingerprints or {})
+        self._page = pages.pop()
+        # Stocks are checked in the order they were last checked, oldest first
+        self._checked = {stock: self.fingerprints.get(stock, {}).get('checked', 0.0) for stock in stocks}
+        self._lock = threading.Lock()
+        self.errors = {}
+        self.stats = {'requests': 0, 'not_modified': 0, 'unchanged': 0, 'scanned': 0, 'parsed': 0, 'errors': 0}
+
+    def poll(self, budget=None):
+        """Checks the stocks due for a check once.
+
+        :param budget: The most requests to send. Default: the watcher's `budget`.
+
+        :return: A list of `(stock, statement, end_dates)` for each statement with new periods.
+        :rtype: `list`
+        """
+        budget = self.budget if budget is None else budget
+        due = sorted(self._checked, key=self._checked.get)
+        if budget is not None:
+            due = due[:budget]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            checks = list(executor.map(self._check, due))
+
+        changes = []
+        for stock, result in zip(due, checks):
+            self._checked[stock] = self.fingerprints[stock]['checked']
+            changes.extend((stock, statement, end_dates) for statement, end_dates in result)
+        if self.callback is not None:
+            error = None
+            for change in changes:
+                try:
+                    self.callback(*change)
+                except Exception as e:
+                    error = error or e
+            if error is not None:
+                raise error
+        return changes
+
+    def run(self, interval, polls=None):
+        """Polls repeatedly, waiting `interval` seconds from the start of one poll to the next.
+
+        :param interval: Seconds between polls.
+        :param polls: The number of polls to run. Default: `None`, run until interrupted.
+        """
+        count = 0
+        while polls is None or count < polls:
+            start = time.monotonic()
+            self.poll()
+            count += 1
+            if polls is None or count < polls:
+                time.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+    def _check(self, stock):
+        fingerprint = self.fingerprints.get(stock) or {}
+        headers = {}
+        if fingerprint.get('etag'):
+            headers['If-None-Match'] = fingerprint['etag']
+        if fingerprint.get('last_modified'):
+            headers['If-Modified-Since'] = fingerprint['last_modified']
+
+        updated = dict(fingerprint, checked=time.time())
+        self.fingerprints[stock] = updated
+        self._count('requests')
+        try:
+            result = self._compare(stock, fingerprint, updated, headers)
+        except Exception as e:
+            self._count('errors')
+            with self._lock:
+                self.errors[stock] = e
+            # Keep the old fingerprint so the page is checked in full next time
+            self.fingerprints[stock] = dict(fingerprint, checked=updated['checked'])
+            return []
+        with self._lock:
+            self.errors.pop(stock, None)
+        return result
+
+    def _compare(self, stock, fingerprint, updated, headers):
+        base_url = '' if isinstance(self.locale, ITransport) else Locale.locale_url(self.locale)
+        response = _locale_get(self.locale, base_url + '/{}/{}'.format(stock, self._page), headers=headers)
+        if getattr(response, 'status_code', 200) == 304:
+            self._count('not_modified')
+            return []
+
+        content = response.content
+        response_headers = getattr(response, 'headers', None) or {}
+        updated['etag'] = response_headers.get('ETag')
+        updated['last_modified'] = response_headers.get('Last-Modified')
+
+        digest = hashlib.sha1(content).hexdigest()
+        if digest == fingerprint.get('digest'):
+            self._count('unchanged')
+            return []
+        updated['digest'] = digest
+
+        # Counted per date, as periods of different statements can end on the same date
+        end_dates = {x.decode(): count for x, count in Counter(_END_DATE.findall(content)).items()}
+        updated['end_dates'] = end_dates
+        seen = fingerprint.get('end_dates')
+        if 'periods' in fingerprint and seen is not None and all(
+                count <= seen.get(x, 0) for x, count in end_dates.items()):
+            self._count('scanned')
+            return []
+
+        self._count('parsed')
+        return self._parse(stock, content, fingerprint, updated)
+
+    def _parse(self, stock, content, fingerprint, updated):
+        fin_data = IYahooData._parse_quote_summary(content)
+        known = fingerprint.get('periods')
+        periods = {}
+        result = []
+        for cls in self.statements:
+            statement = cls._from_quote_summary(stock, fin_data, self.locale)
+            end_dates = [period['endDate']['raw'] for period in statement._statements]
+            periods[cls.__name__] = sorted(set(end_dates) | set((known or {}).get(cls.__name__, ())))
+
+            if known is not None:
+                seen = set(known.get(cls.__name__, ()))
+                new = sorted(x for x in end_dates if x not in seen)
+                if new:
+                    result.append((statement, new))
+
+        updated['periods'] = periods
+        return result
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1